@@ -0,0 +1,194 @@
+import numpy as np
+import base64
+import hmac
+import os
+import threading
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, UploadFile
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+from jobs import COMPUTATIONS, solve_job, integral_job, fft_plot_job
+from utils import (
+    ExpressionEvaluator, normalize_expression, normalize_equations, compute_statistics,
+    compute_table_statistics, create_fitting_plot, create_visualization_plot,
+    save_upload, read_table, TABLE_SUFFIXES, MAX_UPLOAD_BYTES, DEFAULT_BINS
+)
+
+# 与各面板相同计算的HTTP接口，供脚本调用和负载测试（loadtest.py）使用。
+# 接口为同步函数，由FastAPI在线程池中执行；符号计算与FFT与界面共享SingleFlight。
+# 设置环境变量SCICALC_API_TOKEN后，请求须带 Authorization: Bearer <token>。
+
+API_TOKEN = os.environ.get('SCICALC_API_TOKEN')
+
+def check_token(authorization: Optional[str] = Header(None)):
+    """校验接口令牌（未设置令牌时不校验）"""
+    if API_TOKEN and not hmac.compare_digest(authorization or '', f'Bearer {API_TOKEN}'):
+        raise HTTPException(status_code=401, detail='未授权')
+
+router = APIRouter(prefix='/api', dependencies=[Depends(check_token)])
+_evaluator = ExpressionEvaluator()
+
+class ExpressionRequest(BaseModel):
+    expr: str
+
+class SolveRequest(BaseModel):
+    equation: str
+    variables: str
+
+class IntegralRequest(BaseModel):
+    function: str
+    variable: str = 'x'
+    lower: Optional[str] = None
+    upper: Optional[str] = None
+
+class FFTRequest(BaseModel):
+    freq: float = 5
+    duration: float = 1
+    sample_rate: float = 100
+    noise_level: float = 0.1
+    seed: Optional[int] = None
+    waveform: str = 'sine'
+    noise_color: int = 0
+
+class StatisticsRequest(BaseModel):
+    data: str
+
+class FitRequest(BaseModel):
+    x: str
+    y: str
+    degree: int = 1
+
+class PlotRequest(BaseModel):
+    x: List[float]
+    y: List[float]
+    chart_type: str = '直方图'
+    bins: int = DEFAULT_BINS
+
+def _png(img_base64):
+    """base64图像转为PNG响应"""
+    return Response(base64.b64decode(img_base64), media_type='image/png')
+
+def _bad_request(e):
+    return HTTPException(status_code=400, detail=str(e))
+
+def memory_usage():
+    """当前进程的常驻内存与峰值（MB），无法取得时为None
+
+    Linux读取/proc与getrusage；其他平台需要psutil。
+    """
+    rss = peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if rss is None and psutil is not None:
+        info = psutil.Process().memory_info()
+        rss = info.rss / 2**20
+        # Windows提供峰值工作集
+        if peak is None and hasattr(info, 'peak_wset'):
+            peak = info.peak_wset / 2**20
+    return rss, peak
+
+@router.get('/health')
+def health():
+    """服务状态：内存、线程数与进行中的计算数"""
+    rss, peak = memory_usage()
+    return {'rss_mb': rss, 'peak_rss_mb': peak, 'threads': threading.active_count(),
+            'inflight': COMPUTATIONS.inflight()}
+
+@router.post('/expression')
+def expression(request: ExpressionRequest):
+    try:
+        return {'result': str(_evaluator.evaluate(request.expr))}
+    except ValueError as e:
+        raise _bad_request(e)
+
+@router.post('/solve')
+def solve(request: SolveRequest):
+    key = ('solve', normalize_equations(request.equation), request.variables.replace(' ', ''))
+    try:
+        simplified = COMPUTATIONS.submit(key, solve_job, request.equation, request.variables).result()
+    except ValueError as e:
+        raise _bad_request(e)
+    return {'result': str(simplified['result'])}
+
+@router.post('/integral')
+def integral(request: IntegralRequest):
+    bounds = (request.lower, request.upper) if request.lower and request.upper else ()
+    try:
+        key = ('integral', normalize_expression(request.function), request.variable.strip(),
+               *map(normalize_expression, bounds))
+        simplified = COMPUTATIONS.submit(key, integral_job, request.function, request.variable, *bounds).result()
+    except ValueError as e:
+        raise _bad_request(e)
+    return {'result': str(simplified['result'])}
+
+@router.post('/fft')
+def fft(request: FFTRequest):
+    args = (request.freq, request.duration, request.sample_rate, request.noise_level, request.seed,
+            request.waveform, request.noise_color)
+    try:
+        img_base64, _ = COMPUTATIONS.submit(('fft',) + args, fft_plot_job, *args).result()
+    except ValueError as e:
+        raise _bad_request(e)
+    return _png(img_base64)
+
+@router.post('/statistics')
+def statistics(request: StatisticsRequest):
+    try:
+        return {name: float(value) for name, value in compute_statistics(request.data).items()}
+    except ValueError as e:
+        raise _bad_request(e)
+
+@router.post('/fit')
+def fit(request: FitRequest):
+    try:
+        _, model, r_squared = create_fitting_plot(request.x, request.y, request.degree)
+    except ValueError as e:
+        raise _bad_request(e)
+    return {'model': str(model), 'r_squared': float(r_squared)}
+
+@router.post('/table')
+def table(file: UploadFile):
+    """上传表格文件，返回行列数与各数值列的统计量"""
+    suffix = os.path.splitext(file.filename or '')[1].lower()
+    if suffix not in TABLE_SUFFIXES:
+        raise _bad_request(f'不支持的文件类型: {suffix}')
+    # 与界面上传相同的大小上限，超限时不解析
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f'文件超过大小上限 {MAX_UPLOAD_BYTES // 2**20}MB')
+    try:
+        path = save_upload(file.file, suffix, max_bytes=MAX_UPLOAD_BYTES)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    try:
+        df = read_table(path)
+        summary = compute_table_statistics(df)
+    except ValueError as e:
+        raise _bad_request(e)
+    finally:
+        os.remove(path)
+    return {'rows': len(df), 'columns': list(map(str, df.columns)),
+            'statistics': summary.astype(float).replace({np.nan: None}).to_dict(orient='index')}
+
+@router.post('/plot')
+def plot(request: PlotRequest):
+    try:
+        return _png(create_visualization_plot(request.x, request.y, request.chart_type, request.bins))
+    except ValueError as e:
+        raise _bad_request(e)
@@ -1,16 +1,119 @@
-from nicegui import ui
+from nicegui import ui, app, run, background_tasks
+from export import (
+    capture_exports, ExportCapture, save_figure, save_table, export_path, export_url,
+    FIGURE_FORMATS, DATA_FORMATS, EXPORT_DPI
+)
+from images import IMAGES
+from jobs import (
+    COMPUTATIONS, solve_job, system_job, derivative_job, integral_job, fft_plot_job, fft_sweep_job, captured_job,
+    filter_file_job, bootstrap_statistics_job, bootstrap_fit_job, fft_replot_job
+)
 from utils import (
-    safe_eval, solve_equation, compute_derivative, 
-    compute_integral, compute_statistics,
-    create_fft_plot, create_fitting_plot, create_visualization_plot
+    ExpressionEvaluator, normalize_expression, normalize_equations, split_equations,
+    compute_statistics, compute_table_statistics,
+    create_function_plot, compile_kernel,
+    SWEEP_PARAMS, SWEEP_METRICS,
+    WAVEFORMS, NOISE_COLORS,
+    replot_fft, create_comparison_plot, create_fitting_plot, create_visualization_plot,
+    create_model_selection_plot, create_online_fitting_plot,
+    INTERPOLATION_METHODS, create_interpolation_plot, create_resample_plot,
+    CORRELATION_METHODS, create_correlation_plot, create_lag_correlation_plot,
+    OnlinePolyFit, ORTHOGONAL_DEGREE, parse_data, FIT_FAMILIES,
+    save_upload, read_table, TABLE_SUFFIXES, MAX_UPLOAD_BYTES, ColumnStore, BINNED_CHARTS, DEFAULT_BINS,
+    LINALG_OPERATIONS, MATRIX_SUFFIXES, parse_matrix, load_matrix, matrix_operation, matrix_table,
+    ODE_METHODS, ODE_POINTS, compile_ode, solve_ode, create_ode_plot,
+    create_filter_plot
 )
+from signals import FILTER_FAMILIES, FILTER_BANDS
 
+import numpy as np
 import pandas as pd
-import io
+import asyncio
+import threading
+import time
+import os
+import html
+import sympy as sp
+import uuid
+
+# 待滤波的.npy信号按块处理，内存占用与文件大小无关，上限只受临时目录空间限制（约5×10^8个float64采样点）
+MAX_SIGNAL_UPLOAD_BYTES = 4 * 2**30
+# 实时预览的防抖间隔与求值超时（秒）
+LIVE_DEBOUNCE = 0.3
+LIVE_TIMEOUT = 2.0
+
+# 微分方程求解中的进度刷新与部分结果绘图间隔（秒）
+ODE_REFRESH = 0.5
+ODE_PREVIEW = 1.5
+
+# 计算历史中各操作的显示名称
+HISTORY_OPERATIONS = {
+    'expression': '四则运算', 'solve': '方程求解', 'derivative': '导数',
+    'integral': '积分', 'fft': '傅里叶变换'
+}
+
+def update_html(element, content):
+    """更新HTML元素，内容未变化时不重新发送"""
+    if element.content != content:
+        element.set_content(content)
+
+class PlotView:
+    """图表结果区域：标题、摘要、图像与附加内容分别更新
+    
+    图像通过URL引用，只有发生变化的部分会重新发送到浏览器；
+    给content赋值时隐藏图像，只显示提示或错误信息。
+    """
+    
+    def __init__(self, placeholder):
+        with ui.column().classes('w-full items-center gap-2'):
+            self.title = ui.label().classes('text-lg font-bold')
+            self.summary = ui.html().classes('w-full')
+            self.image = ui.image().classes('w-full rounded-lg shadow-lg')
+            self.details = ui.html().classes('w-full')
+        self.content = placeholder
+    
+    def show(self, image, title, summary='', details=''):
+        """显示图像（PNG字节或base64）及说明"""
+        self.title.set_text(title)
+        self._set_html(self.summary, summary)
+        self.image.set_source(IMAGES.url(image))
+        self._set_html(self.details, details)
+        self.title.visible = self.image.visible = True
+    
+    @property
+    def content(self):
+        return self.summary.content
+    
+    @content.setter
+    def content(self, message):
+        self.title.visible = self.image.visible = False
+        self._set_html(self.summary, message)
+        self._set_html(self.details, '')
+    
+    @staticmethod
+    def _set_html(element, content):
+        update_html(element, content)
+        element.visible = bool(content)
 
 class ScientificCalculator:
-    def __init__(self):
+    def __init__(self, history):
+        self.history = history  # 计算历史（HistoryStore），由main.py打开并在所有页面间共享
         self.excel_data = None  # 存储Excel数据
+        self.data_store = None  # Excel数据的列式缓存（ColumnStore）
+        self.fit_stream = None  # 在线拟合状态（数据追加时增量更新）
+        self.last_solution = None  # 最近一次方程求解结果 (解, 变量)
+        self.last_calculus = None  # 最近一次微积分结果 (表达式, 变量)
+        self.system_text = None  # 上传的方程组文件内容
+        self.exports = {}  # 各面板最近一次结果的可导出内容 (ExportCapture)
+        self.export_tables = {}  # 各面板导出数据表的选择框
+        self.evaluator = ExpressionEvaluator()  # 四则运算面板的增量求值器（缓存子表达式）
+        self.preview_task = None  # 正在进行的实时预览
+        self.pending_tabs = {}  # 各客户端进行中的计算 {(客户端id, 面板): 计算key}
+        # 历史记录按用户（浏览器）和会话（页面连接）区分
+        self.user = app.storage.browser['id']
+        self.session = ui.context.client.id
+        self.matrix_files = {}  # 上传的矩阵文件 {'A'/'B': (文件名, 数组, 临时文件路径)}
+        self.signal_file = None  # 上传的待滤波信号文件 (文件名, 临时文件路径)
         self.setup_styles()
         self.create_ui()
     
@@ -72,18 +175,24 @@ class ScientificCalculator:
                 equation_tab = ui.tab('⚖️ 方程求解')
                 fourier_tab = ui.tab('📊 傅里叶变换')
                 calculus_tab = ui.tab('∫ 微积分')
+                ode_tab = ui.tab('📐 微分方程')
                 stats_tab = ui.tab('📈 统计分析')
                 fitting_tab = ui.tab('📉 曲线拟合')
                 visualization_tab = ui.tab('🎨 数据可视化')
+                linalg_tab = ui.tab('🧮 线性代数')
+                history_tab = ui.tab('🕘 历史记录')
             
             with ui.tab_panels(tabs, value=basic_tab).classes('w-full'):
                 self.create_basic_tab(basic_tab)
                 self.create_equation_tab(equation_tab)
                 self.create_fourier_tab(fourier_tab)
                 self.create_calculus_tab(calculus_tab)
+                self.create_ode_tab(ode_tab)
                 self.create_stats_tab(stats_tab)
                 self.create_fitting_tab(fitting_tab)
                 self.create_visualization_tab(visualization_tab)
+                self.create_linalg_tab(linalg_tab)
+                self.create_history_tab(history_tab)
         
         # 页脚
         with ui.footer().style('background: #343a40; color: white;'):
@@ -96,7 +205,10 @@ class ScientificCalculator:
                 ui.label('🔢 基本四则运算').classes('text-h5 mb-4')
                 
                 self.expr_input = ui.input('输入表达式', 
-                                         placeholder='例如: (2+3)*4/2 - 5**2 + sin(π/2)').classes('w-full mb-4')
+                                         placeholder='例如: (2+3)*4/2 - 5**2 + sin(π/2)',
+                                         on_change=self.schedule_live_preview).classes('w-full')
+                # 输入时实时预览结果
+                self.live_preview = ui.label('').classes('text-sm text-gray-600 mb-4')
                 
                 with ui.row().classes('w-full gap-2 mb-4'):
                     ui.button('🧮 计算', on_click=self.calculate_expression).classes('bg-blue-500 text-white')
@@ -128,14 +240,77 @@ class ScientificCalculator:
             return
         
         try:
-            result = safe_eval(expr)
-            if isinstance(result, (int, float)):
-                self.result_label.text = f'✅ 结果: {result:.6f}' if isinstance(result, float) else f'✅ 结果: {result}'
-            else:
-                self.result_label.text = f'✅ 结果: {result}'
+            result = self.evaluator.evaluate(expr)
+            self.result_label.text = f'✅ 结果: {self.format_result(result)}'
+            self.remember('expression', ('expression', expr.strip()), {'result': result}, self.format_result(result), expr)
         except Exception as e:
             self.result_label.text = f'❌ {str(e)}'
     
+    async def run_job(self, tab, key, func, *args):
+        """在后台线程执行计算并等待结果
+        
+        相同key的并发请求（包括其他会话）共享同一次计算；
+        本客户端该面板已有不同的计算进行时忽略本次点击并返回None。
+        """
+        slot = self.pending_slot(tab)
+        joined = slot in self.pending_tabs
+        if joined and self.pending_tabs[slot] != key:
+            ui.notify('⏳ 上一次计算尚未完成', type='info')
+            return None
+        self.pending_tabs[slot] = key
+        try:
+            return await asyncio.wrap_future(COMPUTATIONS.submit(key, func, *args))
+        finally:
+            if not joined:
+                self.pending_tabs.pop(slot, None)
+    
+    def pending_slot(self, tab):
+        """进行中的计算按客户端和面板区分，不同用户互不阻塞"""
+        return ui.context.client.id, tab
+    
+    def recall(self, operation, key):
+        """查找相同输入的历史结果，命中时无需重新计算"""
+        try:
+            stored = self.history.lookup(self.user, operation, key)
+        except Exception:
+            return None
+        if stored is not None:
+            ui.notify('♻️ 已从历史记录中取得结果', type='info')
+        return stored
+    
+    def remember(self, operation, key, result, summary, label):
+        """保存计算结果到历史记录，失败时不影响计算本身"""
+        try:
+            self.history.record(self.user, self.session, operation, key, result, summary[:200], label)
+            self.refresh_history()
+        except Exception as e:
+            ui.notify(f'⚠️ 历史记录保存失败: {str(e)}', type='warning')
+    
+    def format_result(self, result):
+        """格式化计算结果，浮点数保留6位小数"""
+        return f'{result:.6f}' if isinstance(result, float) else f'{result}'
+    
+    def schedule_live_preview(self, e):
+        """输入变化时重新安排预览，尚未完成的旧预览直接取消"""
+        if self.preview_task is not None and not self.preview_task.done():
+            self.preview_task.cancel()
+        self.preview_task = background_tasks.create(self.update_live_preview(e.value or ''), name='live_preview')
+    
+    async def update_live_preview(self, expr):
+        """防抖后在后台线程求值，超时或被新输入取代的结果不显示"""
+        await asyncio.sleep(LIVE_DEBOUNCE)
+        if not expr.strip():
+            self.live_preview.text = ''
+            return
+        try:
+            result = await asyncio.wait_for(run.io_bound(self.evaluator.evaluate, expr), LIVE_TIMEOUT)
+            self.live_preview.text = f'= {self.format_result(result)}'
+        except asyncio.TimeoutError:
+            self.live_preview.text = '⏳ 计算耗时较长，请点击计算'
+        except ValueError:
+            # 输入尚未完成时常见，不打断输入
+            self.live_preview.text = '…'
+    
     def create_equation_tab(self, tab):
         """创建方程求解面板"""
         with ui.tab_panel(tab):
@@ -147,16 +322,29 @@ class ScientificCalculator:
                                            placeholder='例如: x**2 - 4 = 0').classes('flex-grow')
                     self.var_input = ui.input('变量', 
                                             placeholder='例如: x').classes('w-32')
+                    self.eq_mode = ui.select(['符号求解', '数值求解'], value='符号求解', label='求解方式').classes('w-32')
+                
+                # 大型方程组：从文本文件读取，每行一个方程
+                with ui.expansion('📄 大型方程组文件', icon='upload_file').classes('w-full mb-4'):
+                    with ui.row().classes('w-full gap-4 items-center'):
+                        ui.upload(
+                            on_upload=self.handle_system_upload,
+                            max_file_size=5_000_000,
+                            multiple=False
+                        ).props('accept=".txt"').classes('flex-1')
+                        ui.label('.txt 文件，每行一个方程，# 开头为注释；变量留空时自动识别，使用数值求解').classes('text-sm text-gray-600')
                 
                 with ui.row().classes('w-full gap-2 mb-4'):
                     ui.button('🔍 求解', on_click=self.solve_equation).classes('bg-green-500 text-white')
+                    ui.button('⚙️ 数值内核', on_click=lambda: self.show_numeric_kernel(self.last_solution)).classes('bg-blue-500 text-white')
                     ui.button('🗑️ 清除', on_click=lambda: [
                         self.eq_input.set_value(''), 
-                        self.var_input.set_value('')
+                        self.var_input.set_value(''),
+                        setattr(self, 'system_text', None)
                     ]).classes('bg-gray-500 text-white')
                 
                 with ui.card().classes('result-card w-full'):
-                    self.eq_result = ui.label('🎯 方程解将显示在这里').classes('text-h6')
+                    self.eq_result = ui.label('🎯 方程解将显示在这里').classes('text-h6 whitespace-pre-line')
                 
                 # 示例方程
                 ui.label('📝 示例方程:').classes('text-subtitle1 font-weight-bold mt-4')
@@ -165,7 +353,8 @@ class ScientificCalculator:
                         ('一元二次', 'x**2 - 4 = 0', 'x'),
                         ('二元线性', 'x + 2*y = 10, 3*x - y = 5', 'x,y'),
                         ('指数方程', 'exp(x) - 2 = 0', 'x'),
-                        ('三角方程', 'sin(x) = 0.5', 'x')
+                        ('三角方程', 'sin(x) = 0.5', 'x'),
+                        ('非线性方程组', 'x**2 + y**2 = 4, x*y = 1', 'x,y')
                     ]
                     for label, eq, var in examples:
                         ui.button(label, on_click=lambda e=eq, v=var: [
@@ -173,18 +362,66 @@ class ScientificCalculator:
                             self.var_input.set_value(v)
                         ]).classes('example-button')
     
-    def solve_equation(self):
+    def handle_system_upload(self, e):
+        """读取方程组文本文件，切换到数值求解"""
+        try:
+            self.system_text = e.content.read().decode('utf-8')
+            count = len(split_equations(self.system_text))
+            self.eq_input.set_value(f'[文件 {e.name}: {count}个方程]')
+            self.eq_mode.set_value('数值求解')
+            ui.notify(f'✅ 方程组文件读取成功，共{count}个方程', type='positive')
+        except Exception as ex:
+            ui.notify(f'❌ 方程组文件读取失败: {str(ex)}', type='negative')
+    
+    async def solve_equation(self):
         """求解方程"""
         eq_str = self.eq_input.value
         var_str = self.var_input.value
         
+        if self.eq_mode.value == '数值求解':
+            # 输入框仍显示文件占位文本时使用上传的方程组
+            if self.system_text and eq_str.startswith('[文件'):
+                eq_str = self.system_text
+            await self.solve_system_numeric(eq_str, var_str)
+            return
+        
         if not eq_str or not var_str:
             self.eq_result.text = '❌ 请输入方程和变量'
             return
         
         try:
-            solution = solve_equation(eq_str, var_str)
-            self.eq_result.text = f'✅ 解: {solution}'
+            key = ('solve', normalize_equations(eq_str), var_str.replace(' ', ''))
+            simplified = self.recall('solve', key)
+            if simplified is None:
+                simplified = await self.run_job('equation', key, solve_job, eq_str, var_str)
+                if simplified is None:
+                    return
+                self.remember('solve', key, simplified, str(simplified['result']), f'{eq_str}（{var_str}）')
+            solution = simplified['result']
+            self.last_solution = (solution, None)
+            self.eq_result.text = self.format_simplified('✅ 解', simplified)
+        except Exception as e:
+            self.eq_result.text = f'❌ 错误: {str(e)}'
+    
+    async def solve_system_numeric(self, eq_str, var_str):
+        """数值求解（大型）方程组，只显示前若干个变量的值"""
+        if not eq_str:
+            self.eq_result.text = '❌ 请输入方程或上传方程组文件'
+            return
+        
+        try:
+            # 大型方程组不逐个解析规范化，只去除空白作为键
+            key = ('system', ''.join(eq_str.split()), ''.join((var_str or '').split()))
+            job = await self.run_job('equation', key, system_job, eq_str, var_str)
+            if job is None:
+                return
+            result, elapsed = job
+            solution = result['solution']
+            shown = ', '.join(f'{v} = {value:.6g}' for v, value in list(solution.items())[:20])
+            more = f' …（共{len(solution)}个变量）' if len(solution) > 20 else ''
+            self.last_solution = None
+            self.eq_result.text = (f'✅ {result["method"]}，残差 {result["residual"]:.3g}，'
+                                   f'用时 {elapsed:.2f}s\n{shown}{more}')
         except Exception as e:
             self.eq_result.text = f'❌ 错误: {str(e)}'
     
@@ -199,16 +436,58 @@ class ScientificCalculator:
                     self.duration_input = ui.number('持续时间 (秒)', value=1, min=0.1, max=10, step=0.1).classes('flex-1')
                     self.sample_rate_input = ui.number('采样率 (Hz)', value=100, min=10, max=1000, step=10).classes('flex-1')
                 
+                with ui.row().classes('w-full gap-4 mb-4'):
+                    self.waveform_select = ui.select(WAVEFORMS, value='sine', label='波形').classes('flex-1')
+                    self.noise_color = ui.select(NOISE_COLORS, value=0, label='噪声类型').classes('flex-1')
+                    self.fft_seed = ui.number('随机种子 (留空则随机)', value=None, min=0, step=1, format='%d').classes('flex-1')
+                
                 with ui.row().classes('w-full gap-4 mb-4'):
                     ui.label('噪声水平').classes('w-full')
                     self.noise_level = ui.slider(min=0, max=1, value=0.1, step=0.01).props('label-always').classes('flex-grow')
                     ui.button('📈 计算并绘制', on_click=self.compute_fft_and_plot).classes('bg-purple-500 text-white')
                 
+                # 参数扫描功能
+                with ui.expansion('🔁 参数扫描', icon='grid_on').classes('w-full mb-4'):
+                    ui.label('每个参数填写 起点:终点:步长 或逗号分隔的数值').classes('text-sm text-gray-600')
+                    with ui.row().classes('w-full gap-4 mb-4'):
+                        self.sweep_freq = ui.input('信号频率 (Hz)', value='1:50:1').classes('flex-1')
+                        self.sweep_duration = ui.input('持续时间 (秒)', value='1').classes('flex-1')
+                        self.sweep_sample_rate = ui.input('采样率 (Hz)', value='100, 200').classes('flex-1')
+                        self.sweep_noise = ui.input('噪声水平', value='0:1:0.1').classes('flex-1')
+                    with ui.row().classes('w-full gap-4'):
+                        self.sweep_x = ui.select(list(SWEEP_PARAMS), value='频率', label='横轴').classes('w-32')
+                        self.sweep_y = ui.select(list(SWEEP_PARAMS), value='噪声水平', label='纵轴').classes('w-32')
+                        self.sweep_metric = ui.select(list(SWEEP_METRICS), value='SNR(dB)', label='指标').classes('w-32')
+                        ui.button('🔁 执行扫描', on_click=self.compute_fft_sweep).classes('bg-purple-500 text-white')
+                
+                # 数字滤波：FIR按块FFT卷积，IIR为二阶节；长信号文件逐块处理
+                with ui.expansion('🎛️ 滤波', icon='tune').classes('w-full mb-4'):
+                    with ui.row().classes('w-full gap-4 mb-4'):
+                        self.filter_family = ui.select(FILTER_FAMILIES, value='butter', label='滤波器').classes('flex-1')
+                        self.filter_band = ui.select(FILTER_BANDS, value='lowpass', label='类型').classes('flex-1')
+                        self.filter_cutoff = ui.input('截止频率 (Hz)', value='10',
+                                                      placeholder='带通/带阻填写两个，如 10, 40').classes('flex-1')
+                        self.filter_order = ui.number('阶数 (FIR为抽头数)', value=4, min=1, max=4097, step=1, format='%d').classes('flex-1')
+                    with ui.row().classes('w-full gap-4 mb-4 items-center'):
+                        self.filter_zero_phase = ui.checkbox('零相位（正反向滤波）', value=True)
+                        self.filter_method = ui.select(['overlap-add', 'overlap-save'], value='overlap-add',
+                                                       label='FIR卷积方式').classes('w-40')
+                        ui.button('🎛️ 滤波并绘制', on_click=self.compute_filter).classes('bg-purple-500 text-white')
+                    with ui.row().classes('w-full gap-4 items-center'):
+                        ui.upload(
+                            on_upload=self.handle_signal_upload,
+                            max_file_size=MAX_SIGNAL_UPLOAD_BYTES,
+                            multiple=False
+                        ).props('accept=".npy"').classes('flex-1')
+                        ui.label(f'一维 .npy 信号（最大{MAX_SIGNAL_UPLOAD_BYTES // 2**30}GB），按上方采样率与滤波器逐块处理'
+                                 ).classes('text-sm text-gray-600')
+                        ui.button('💾 滤波文件并下载', on_click=self.filter_signal_file).classes('bg-gray-700 text-white')
+                
                 with ui.card().classes('w-full'):
-                    self.fft_result = ui.html().classes('w-full')
-                    self.fft_result.content = '<div class="text-center text-gray-500 p-8">📊 FFT图表将显示在这里</div>'
+                    self.fft_result = PlotView('<div class="text-center text-gray-500 p-8">📊 FFT图表将显示在这里</div>')
+                self.create_export_row('fourier')
     
-    def compute_fft_and_plot(self):
+    async def compute_fft_and_plot(self):
         """计算并绘制傅里叶变换结果"""
         freq = self.freq_input.value
         duration = self.duration_input.value
@@ -216,13 +495,107 @@ class ScientificCalculator:
         noise_level = self.noise_level.value
         
         try:
-            img_base64 = create_fft_plot(freq, duration, sample_rate, noise_level)
-            self.fft_result.content = f'''
-            <div class="text-center">
-                <h3 class="text-lg font-bold mb-4">傅里叶变换结果</h3>
-                <img src="data:image/png;base64,{img_base64}" class="w-full h-auto rounded-lg shadow-lg">
-            </div>
-            '''
+            seed = None if self.fft_seed.value is None else int(self.fft_seed.value)
+            args = (float(freq), float(duration), float(sample_rate), float(noise_level), seed,
+                    self.waveform_select.value, self.noise_color.value)
+            key = ('fft',) + args
+            # 未指定随机种子时结果不可复现，只记录不复用
+            stored = self.recall('fft', key) if seed is not None else None
+            if stored is not None:
+                result = await run.io_bound(fft_replot_job, stored)
+            else:
+                result = await self.run_job('fourier', key, fft_plot_job, *args)
+                if result is None:
+                    return
+                self.remember('fft', key, result[1].tables, f'峰值 {result[1].tables["FFT频谱"]["幅度"].max():.3g}',
+                              f'{WAVEFORMS[args[5]]} {args[0]:g}Hz，{args[1]:g}s，{args[2]:g}Hz采样，噪声{args[3]:g}，种子{seed}')
+            img_base64, captured = result
+            self.set_exports('fourier', captured)
+            self.fft_result.show(img_base64, '傅里叶变换结果')
+        except Exception as e:
+            self.fft_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    def filter_args(self):
+        """读取滤波器参数 (类型, 频带, 截止频率, 阶数, 零相位, 卷积方式)"""
+        try:
+            cutoff = tuple(float(v) for v in self.filter_cutoff.value.split(',') if v.strip())
+        except ValueError:
+            raise ValueError(f'截止频率格式错误: {self.filter_cutoff.value}')
+        return (self.filter_family.value, self.filter_band.value, cutoff, int(self.filter_order.value or 1),
+                bool(self.filter_zero_phase.value), self.filter_method.value)
+    
+    async def compute_filter(self):
+        """对FFT面板的信号滤波，绘制滤波前后的信号与频谱"""
+        try:
+            seed = None if self.fft_seed.value is None else int(self.fft_seed.value)
+            args = (float(self.freq_input.value), float(self.duration_input.value), float(self.sample_rate_input.value),
+                    float(self.noise_level.value), seed, self.waveform_select.value, self.noise_color.value,
+                    *self.filter_args())
+            key = ('filter',) + args if seed is not None else ('filter', uuid.uuid4().hex)
+            result = await self.run_job('fourier', key, captured_job, create_filter_plot, *args)
+            if result is None:
+                return
+            img_base64, captured = result
+            self.set_exports('fourier', captured)
+            self.fft_result.show(img_base64, f'{FILTER_FAMILIES[args[7]]} {FILTER_BANDS[args[8]]}滤波结果')
+        except Exception as e:
+            self.fft_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    async def handle_signal_upload(self, e):
+        """保存上传的信号文件（流式写入临时文件）"""
+        try:
+            path = await run.io_bound(save_upload, e.content, '.npy')
+        except Exception as ex:
+            ui.notify(f'❌ 信号文件保存失败: {str(ex)}', type='negative')
+            return
+        self.release_signal_file()
+        self.signal_file = (e.name, path)
+        ui.notify(f'✅ 信号文件已上传: {e.name}', type='positive')
+    
+    def release_signal_file(self):
+        """删除之前上传的信号临时文件"""
+        if self.signal_file is not None:
+            try:
+                os.remove(self.signal_file[1])
+            except OSError:
+                pass
+            self.signal_file = None
+    
+    async def filter_signal_file(self):
+        """逐块滤波上传的信号文件，结果以.npy文件下载"""
+        if self.signal_file is None:
+            ui.notify('❌ 请先上传 .npy 信号文件', type='negative')
+            return
+        try:
+            family, band, cutoff, order, zero_phase, method = self.filter_args()
+        except ValueError as e:
+            ui.notify(f'❌ 错误: {str(e)}', type='negative')
+            return
+        name, path = self.signal_file
+        ui.notify('⏳ 正在滤波信号文件…', type='info')
+        await self.send_export(filter_file_job, path, f'{os.path.splitext(name)[0]}_filtered.npy', 'npy',
+                               float(self.sample_rate_input.value), family, band, cutoff, order, zero_phase, method)
+    
+    async def compute_fft_sweep(self):
+        """执行傅里叶变换参数扫描"""
+        try:
+            args = (self.sweep_freq.value, self.sweep_duration.value, self.sweep_sample_rate.value,
+                    self.sweep_noise.value, 0 if self.fft_seed.value is None else int(self.fft_seed.value),
+                    self.sweep_x.value, self.sweep_y.value, self.sweep_metric.value)
+            job = await self.run_job('fourier', ('sweep',) + args, fft_sweep_job, *args)
+            if job is None:
+                return
+            (img_base64, table), captured = job
+            self.set_exports('fourier', captured)
+            # 表格只显示前200行，避免页面过大
+            table_html = table.head(200).to_html(
+                index=False,
+                float_format=lambda v: f'{v:.4g}',
+                classes='w-full border-collapse border border-gray-300 text-sm'
+            )
+            
+            self.fft_result.show(img_base64, f'参数扫描结果 (共{len(table)}组配置)',
+                                 details=f'<div class="overflow-x-auto mt-4" style="max-height: 400px">{table_html}</div>')
         except Exception as e:
             self.fft_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
     
@@ -243,9 +616,15 @@ class ScientificCalculator:
                     self.upper_input = ui.input('上限', placeholder='例如: pi').classes('flex-1')
                     ui.button('d/dx 求导', on_click=self.compute_derivative).classes('bg-blue-500 text-white')
                     ui.button('∫ 积分', on_click=self.compute_integral).classes('bg-green-500 text-white')
+                    ui.button('📈 绘制函数', on_click=self.plot_function).classes('bg-purple-500 text-white')
+                    ui.button('⚙️ 数值内核', on_click=lambda: self.show_numeric_kernel(self.last_calculus)).classes('bg-gray-700 text-white')
                 
                 with ui.card().classes('result-card w-full'):
-                    self.calc_result = ui.label('🎯 计算结果将显示在这里').classes('text-h6')
+                    self.calc_result = ui.label('🎯 计算结果将显示在这里').classes('text-h6 whitespace-pre-line')
+                
+                with ui.card().classes('w-full'):
+                    self.calc_plot = PlotView('<div class="text-center text-gray-500 p-8">📈 函数图像将显示在这里（上下限为空时绘制 [-10, 10]）</div>')
+                self.create_export_row('calculus')
                 
                 # 示例函数
                 ui.label('📝 示例函数:').classes('text-subtitle1 font-weight-bold mt-4')
@@ -262,7 +641,7 @@ class ScientificCalculator:
                             self.var_integral.set_value(v)
                         ]).classes('example-button')
     
-    def compute_derivative(self):
+    async def compute_derivative(self):
         """计算导数"""
         func_str = self.func_input.value
         var_str = self.var_integral.value
@@ -272,12 +651,19 @@ class ScientificCalculator:
             return
         
         try:
-            derivative = compute_derivative(func_str, var_str)
-            self.calc_result.text = f'✅ 导数: {derivative}'
+            key = ('derivative', normalize_expression(func_str), var_str.strip())
+            simplified = self.recall('derivative', key)
+            if simplified is None:
+                simplified = await self.run_job('calculus', key, derivative_job, func_str, var_str)
+                if simplified is None:
+                    return
+                self.remember('derivative', key, simplified, str(simplified['result']), f'd/d{var_str} {func_str}')
+            self.last_calculus = (simplified['result'], [var_str])
+            self.calc_result.text = self.format_simplified('✅ 导数', simplified)
         except Exception as e:
             self.calc_result.text = f'❌ 错误: {str(e)}'
     
-    def compute_integral(self):
+    async def compute_integral(self):
         """计算积分"""
         func_str = self.func_input.value
         var_str = self.var_integral.value
@@ -289,15 +675,283 @@ class ScientificCalculator:
             return
         
         try:
-            if lower_str and upper_str:
-                integral = compute_integral(func_str, var_str, lower_str, upper_str)
-                self.calc_result.text = f'✅ 定积分结果: {integral}'
+            definite = bool(lower_str and upper_str)
+            bounds = (lower_str, upper_str) if definite else ()
+            key = ('integral', normalize_expression(func_str), var_str.strip(), *map(normalize_expression, bounds))
+            simplified = self.recall('integral', key)
+            if simplified is None:
+                simplified = await self.run_job('calculus', key, integral_job, func_str, var_str, *bounds)
+                if simplified is None:
+                    return
+                label = f'∫ {func_str} d{var_str}' + (f'，[{lower_str}, {upper_str}]' if definite else '')
+                self.remember('integral', key, simplified, str(simplified['result']), label)
+            if definite:
+                self.last_calculus = (simplified['result'], None)
+                self.calc_result.text = self.format_simplified('✅ 定积分结果', simplified)
             else:
-                integral = compute_integral(func_str, var_str)
-                self.calc_result.text = f'✅ 不定积分结果: {integral} + C'
+                self.last_calculus = (simplified['result'], [var_str])
+                self.calc_result.text = self.format_simplified('✅ 不定积分结果', simplified, ' + C')
         except Exception as e:
             self.calc_result.text = f'❌ 错误: {str(e)}'
     
+    def format_simplified(self, title, simplified, suffix=''):
+        """格式化化简流水线的输出：结果、公共子表达式及各阶段状态"""
+        text = f'{title}: {simplified["result"]}{suffix}'
+        if simplified['cse'] is not None:
+            replacements, reduced = simplified['cse']
+            lines = [f'{symbol} = {value}' for symbol, value in replacements]
+            text += '\n公共子表达式: ' + '; '.join(lines) + f'\n⇒ {", ".join(map(str, reduced))}'
+        stages = simplified['report'].iloc[1:]
+        text += '\n化简: ' + ' · '.join(f'{row.阶段} {row.状态}' for row in stages.itertuples())
+        return text
+    
+    async def plot_function(self):
+        """绘制函数、导函数与原函数"""
+        func_str = self.func_input.value
+        var_str = self.var_integral.value
+        lower_str = self.lower_input.value or '-10'
+        upper_str = self.upper_input.value or '10'
+        
+        if not func_str or not var_str:
+            self.calc_plot.content = '<div class="text-red-500 text-center p-4">❌ 请输入函数和变量</div>'
+            return
+        
+        try:
+            key = ('plot', normalize_expression(func_str), var_str.strip(),
+                   normalize_expression(lower_str), normalize_expression(upper_str))
+            job = await self.run_job('calculus', key, captured_job, create_function_plot,
+                                     func_str, var_str, lower_str, upper_str)
+            if job is None:
+                return
+            (img_base64, evaluations), captured = job
+            self.set_exports('calculus', captured)
+            self.calc_plot.show(img_base64, '函数图像', details=(
+                f'<p class="text-sm text-gray-600 text-center">自适应采样点数: '
+                f'f {evaluations["f"]}，f′ {evaluations["df"]}，∫f {evaluations["integral"]}</p>'))
+        except Exception as e:
+            self.calc_plot.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    def show_numeric_kernel(self, last_result):
+        """将符号结果导出为数值内核并显示生成的源码"""
+        if last_result is None:
+            ui.notify('❌ 请先完成一次计算', type='negative')
+            return
+        
+        try:
+            result, variables = last_result
+            kernel = compile_kernel(result, variables)
+            # 在10⁶个点上试运行，展示内核的求值开销
+            grid = np.linspace(0.1, 1.0, 1_000_000)
+            start = time.perf_counter()
+            kernel(*[grid] * len(kernel.variables))
+            elapsed = (time.perf_counter() - start) * 1000
+            
+            with ui.dialog() as dialog, ui.card().classes('w-full'):
+                ui.label('⚙️ 数值内核').classes('text-h6')
+                ui.label(f'变量: {", ".join(map(str, kernel.variables)) or "无"}').classes('text-sm text-gray-600')
+                ui.code(kernel.source, language='python').classes('w-full')
+                ui.label(f'在10⁶个点上求值耗时 {elapsed:.1f} ms').classes('text-sm text-gray-600')
+                ui.button('关闭', on_click=dialog.close).classes('bg-gray-500 text-white')
+            dialog.open()
+        except Exception as e:
+            ui.notify(f'❌ {str(e)}', type='negative')
+    
+    def create_ode_tab(self, tab):
+        """创建常微分方程（初值问题）面板"""
+        with ui.tab_panel(tab):
+            with ui.card().classes('w-full'):
+                ui.label('📐 常微分方程').classes('text-h5 mb-4')
+                
+                self.ode_input = ui.textarea('方程组', placeholder="每行一个方程，例如:\nx' = y\ny' = -x\n高阶导数写作 x''，a = 1.5 定义参数").classes('w-full mb-4')
+                with ui.row().classes('w-full gap-4 mb-4'):
+                    self.ode_initial = ui.input('初值', placeholder="例如: x=1, y=0 或 1, 0").classes('flex-grow')
+                    self.ode_t0 = ui.number('起始时间', value=0).classes('w-28')
+                    self.ode_t1 = ui.number('终止时间', value=10).classes('w-28')
+                    self.ode_method = ui.select({m: f'{m}（刚性）' if stiff else m for m, stiff in ODE_METHODS.items()},
+                                                value='RK45', label='求解方法').classes('w-36')
+                    self.ode_points = ui.number('输出点数', value=ODE_POINTS, min=100, max=100000, step=100, format='%d').classes('w-28')
+                
+                with ui.row().classes('w-full gap-2 mb-4 items-center'):
+                    ui.button('▶️ 求解', on_click=self.compute_ode).classes('bg-green-500 text-white')
+                    self.ode_cancel = threading.Event()
+                    ui.button('⏹️ 停止', on_click=lambda: self.ode_cancel.set()).classes('bg-red-500 text-white')
+                    self.ode_progress = ui.linear_progress(value=0, show_value=False).classes('flex-1')
+                    self.ode_status = ui.label('').classes('text-sm text-gray-600')
+                
+                with ui.card().classes('w-full'):
+                    self.ode_plot = PlotView('<div class="text-center text-gray-500 p-8">📐 解曲线将显示在这里</div>')
+                self.create_export_row('ode')
+                
+                ui.label('📝 示例:').classes('text-subtitle1 font-weight-bold mt-4')
+                with ui.row().classes('flex-wrap gap-2'):
+                    examples = [
+                        ('简谐振动', "x'' = -x", "x=1, x'=0", 20, 'RK45'),
+                        ('捕食者-猎物', "a = 1.5\nb = 1\nx' = a*x - b*x*y\ny' = -3*y + x*y", 'x=10, y=5', 15, 'RK45'),
+                        ('洛伦兹系统', "x' = 10*(y - x)\ny' = x*(28 - z) - y\nz' = x*y - 8/3*z", '1, 1, 1', 40, 'DOP853'),
+                        ('范德波尔(刚性)', "mu = 1000\nx'' = mu*(1 - x**2)*x' - x", "x=2, x'=0", 3000, 'BDF'),
+                    ]
+                    for label, eqs, initial, t1, method in examples:
+                        ui.button(label, on_click=lambda eqs=eqs, initial=initial, t1=t1, method=method: [
+                            self.ode_input.set_value(eqs),
+                            self.ode_initial.set_value(initial),
+                            self.ode_t1.set_value(t1),
+                            self.ode_method.set_value(method)
+                        ]).classes('example-button')
+    
+    async def compute_ode(self):
+        """在后台线程求解微分方程，定期刷新进度并绘制已完成部分"""
+        if not self.ode_input.value or not self.ode_initial.value:
+            self.ode_plot.content = '<div class="text-red-500 text-center p-4">❌ 请输入方程组和初值</div>'
+            return
+        slot = self.pending_slot('ode')
+        if slot in self.pending_tabs:
+            ui.notify('⏳ 上一次计算尚未完成', type='info')
+            return
+        
+        # 求解线程只写入最新的部分结果，由界面定时器取用
+        state = {'fraction': 0.0, 'partial': None, 'rendering': False, 'shown': 0.0}
+        
+        async def refresh():
+            self.ode_progress.set_value(state['fraction'])
+            partial = state['partial']
+            if partial is None or state['rendering'] or time.perf_counter() - state['shown'] < ODE_PREVIEW:
+                return
+            state['partial'], state['rendering'] = None, True
+            try:
+                img_base64 = await run.io_bound(create_ode_plot, *partial, True)
+                if slot in self.pending_tabs:
+                    self.ode_plot.show(img_base64, '求解中…')
+            finally:
+                state['rendering'], state['shown'] = False, time.perf_counter()
+        
+        def progress(fraction, t, y):
+            state['fraction'] = fraction
+            state['partial'] = (t, y, names)
+        
+        self.ode_cancel = cancel = threading.Event()
+        self.pending_tabs[slot] = None
+        timer = ui.timer(ODE_REFRESH, refresh)
+        self.ode_status.text = '⏳ 求解中…'
+        start = time.perf_counter()
+        try:
+            # 方程组只编译一次（带缓存），这里取得状态名称供部分结果绘图
+            names = (await run.io_bound(compile_ode, self.ode_input.value)).names
+            t_span = (float(self.ode_t0.value), float(self.ode_t1.value))
+            result = await run.io_bound(solve_ode, self.ode_input.value, self.ode_initial.value, t_span,
+                                        self.ode_method.value, 't', 1e-6, 1e-9, int(self.ode_points.value or ODE_POINTS),
+                                        progress, cancel)
+            elapsed = time.perf_counter() - start
+            img_base64, captured = await run.io_bound(captured_job, create_ode_plot, result['t'], result['y'], result['names'])
+            self.set_exports('ode', captured)
+            final = ', '.join(f'{name} = {value:.6g}' for name, value in zip(result['names'], result['y'][:, -1]))
+            self.ode_plot.show(img_base64, f'{result["method"]} 求解结果', details=(
+                f'<p class="text-sm text-gray-600 text-center">t = {t_span[1]:g} 时: {html.escape(final)}<br>'
+                f'积分步数 {result["steps"]}，右端项求值 {result["nfev"]} 次，雅可比 {result["njev"]} 次</p>'))
+            self.ode_status.text = f'✅ 用时 {elapsed:.2f}s'
+        except Exception as e:
+            if cancel.is_set():
+                self.ode_status.text = '⚠️ 已停止'
+            else:
+                self.ode_status.text = ''
+                self.ode_plot.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+        finally:
+            timer.cancel()
+            self.pending_tabs.pop(slot, None)
+            self.ode_progress.set_value(0)
+    
+    def create_export_row(self, key):
+        """创建导出控件：图像导出为PNG/SVG/PDF（可选分辨率），数据表导出为CSV/Parquet/NPY"""
+        with ui.expansion('📥 导出结果', icon='download').classes('w-full'):
+            with ui.row().classes('w-full gap-4 items-center'):
+                figure_format = ui.select(list(FIGURE_FORMATS), value='svg', label='图像格式').classes('w-28')
+                dpi = ui.select(list(EXPORT_DPI), value=300, label='分辨率 (dpi)').classes('w-28')
+                ui.button('🖼️ 导出图像', on_click=lambda: self.export_figure(key, figure_format.value, dpi.value)).classes('bg-blue-500 text-white')
+            with ui.row().classes('w-full gap-4 items-center'):
+                self.export_tables[key] = ui.select([], label='数据表').classes('w-40')
+                data_format = ui.select(list(DATA_FORMATS), value='csv', label='数据格式').classes('w-28')
+                ui.button('💾 导出数据', on_click=lambda: self.export_data(key, self.export_tables[key].value, data_format.value)).classes('bg-green-500 text-white')
+    
+    def set_exports(self, key, captured, tables=None):
+        """记录面板最近一次结果的可导出内容，并更新数据表选择框"""
+        captured.tables.update(tables or {})
+        self.exports[key] = captured
+        names = list(captured.tables)
+        self.export_tables[key].set_options(names, value=names[0] if names else None)
+    
+    async def export_figure(self, key, fmt, dpi):
+        """在后台渲染图像文件并以下载方式发送到浏览器"""
+        captured = self.exports.get(key)
+        if captured is None or captured.figure is None:
+            ui.notify('❌ 没有可导出的图像，请先生成图表', type='negative')
+            return
+        await self.send_export(save_figure, captured.figure, f'{key}.{fmt}', fmt, dpi)
+    
+    async def export_data(self, key, name, fmt):
+        """在后台写出数据表文件并以下载方式发送到浏览器"""
+        captured = self.exports.get(key)
+        if captured is None or name not in captured.tables:
+            ui.notify('❌ 没有可导出的数据，请先完成计算', type='negative')
+            return
+        await self.send_export(save_table, captured.tables[name], f'{key}_{name}.{fmt}', fmt)
+    
+    async def send_export(self, writer, content, filename, fmt, *args):
+        """写出导出文件后通过HTTP下载发送，避免大文件经由websocket传输"""
+        path = export_path(os.path.splitext(filename)[0], fmt)
+        try:
+            await run.io_bound(writer, content, path, fmt, *args)
+        except Exception as e:
+            os.remove(path)
+            ui.notify(f'❌ 导出失败: {str(e)}', type='negative')
+            return
+        # 文件由导出路由发送后删除，各用户的导出互不影响
+        ui.download.from_url(export_url(path, filename), filename)
+    
+    def create_table_upload(self, on_loaded):
+        """创建表格文件上传控件：流式写入临时文件，后台读取并显示进度，可取消"""
+        with ui.row().classes('w-full gap-4 mb-4 items-center'):
+            upload = ui.upload(
+                max_file_size=MAX_UPLOAD_BYTES,
+                multiple=False
+            ).props(f'accept="{",".join(TABLE_SUFFIXES)}"').classes('flex-1')
+            ui.label(f'支持 .xlsx、.xls 和 .csv 格式，最大{MAX_UPLOAD_BYTES // 2**20}MB').classes('text-sm text-gray-600')
+        current = {'cancel': threading.Event()}
+        with ui.row().classes('w-full gap-4 mb-4 items-center') as status:
+            progress = ui.linear_progress(value=0, show_value=False).classes('flex-1')
+            ui.button('取消', icon='close', on_click=lambda: current['cancel'].set()).props('flat dense').classes('text-red-500')
+        status.set_visibility(False)
+        
+        async def handle_upload(e):
+            current['cancel'] = threading.Event()
+            await self.handle_table_upload(e, on_loaded, status, progress, current['cancel'])
+        upload.on_upload(handle_upload)
+        return upload
+    
+    async def handle_table_upload(self, e, on_loaded, status, progress, cancel):
+        """处理表格文件上传：内容分块写入临时文件，在后台线程中解析，解析期间界面保持响应"""
+        state = {'progress': 0.0}
+        status.set_visibility(True)
+        # 后台线程只写入进度值，由界面定时器刷新进度条
+        timer = ui.timer(0.2, lambda: progress.set_value(state['progress']))
+        path = None
+        try:
+            path = await run.io_bound(save_upload, e.content, os.path.splitext(e.name)[1].lower(), cancel=cancel)
+            df = await run.io_bound(read_table, path, lambda fraction: state.update(progress=fraction), cancel)
+            # 列式缓存同样在后台构建，之后切换列选择不再重复转换
+            self.data_store = await run.io_bound(ColumnStore, df)
+            self.excel_data = df
+            on_loaded(df)
+        except Exception as ex:
+            if cancel.is_set():
+                ui.notify('⚠️ 已取消文件读取', type='warning')
+            else:
+                ui.notify(f'❌ 文件读取失败: {str(ex)}', type='negative')
+        finally:
+            timer.cancel()
+            status.set_visibility(False)
+            progress.set_value(0)
+            if path is not None:
+                os.remove(path)
+    
     def create_stats_tab(self, tab):
         """创建统计分析面板"""
         with ui.tab_panel(tab):
@@ -306,13 +960,7 @@ class ScientificCalculator:
                 
                 # Excel上传功能
                 with ui.expansion('📊 Excel文件输入', icon='upload_file').classes('w-full mb-4'):
-                    with ui.row().classes('w-full gap-4 mb-4'):
-                        self.stats_excel_upload = ui.upload(
-                            on_upload=self.handle_stats_excel_upload,
-                            max_file_size=5_000_000,
-                            multiple=False
-                        ).props('accept=".xlsx,.xls"').classes('flex-1')
-                        ui.label('支持 .xlsx 和 .xls 格式，最大5MB').classes('text-sm text-gray-600')
+                    self.stats_excel_upload = self.create_table_upload(self.on_stats_data_loaded)
                     
                     with ui.row().classes('w-full gap-4'):
                         self.stats_column = ui.select(
@@ -321,6 +969,29 @@ class ScientificCalculator:
                             on_change=self.update_stats_data
                         ).classes('flex-1')
                         ui.button('📋 预览数据', on_click=self.preview_stats_data).classes('bg-blue-500 text-white')
+                    
+                    # 全部数值列统计（可分组）
+                    with ui.row().classes('w-full gap-4'):
+                        self.stats_group_by = ui.select(
+                            options=[], 
+                            label='分组列 (可选)',
+                            clearable=True
+                        ).classes('flex-1')
+                        self.stats_percentiles = ui.input('百分位数 (逗号分隔)', 
+                                                         value='5, 25, 50, 75, 95').classes('flex-1')
+                        ui.button('📑 全部列统计', on_click=self.compute_table_statistics).classes('bg-green-500 text-white')
+                    
+                    # 列间相关与滞后相关
+                    with ui.row().classes('w-full gap-4 items-center'):
+                        self.corr_method = ui.select(CORRELATION_METHODS, value='pearson', label='相关系数').classes('w-32')
+                        ui.button('🔗 相关矩阵', on_click=self.compute_correlation_matrix).classes('bg-green-500 text-white')
+                        self.corr_y_column = ui.select(
+                            options=[],
+                            label='互相关列 (留空为自相关)',
+                            clearable=True
+                        ).classes('flex-1')
+                        self.corr_max_lag = ui.number('最大滞后', value=50, min=0, step=1, format='%d').classes('w-32')
+                        ui.button('⏱️ 滞后相关', on_click=self.compute_lag_correlation).classes('bg-purple-500 text-white')
                 
                 # 手动输入功能
                 with ui.expansion('✏️ 手动输入', icon='edit', value=True).classes('w-full mb-4'):
@@ -329,10 +1000,15 @@ class ScientificCalculator:
                 
                 with ui.row().classes('w-full gap-2 mb-4'):
                     ui.button('📊 计算统计量', on_click=self.compute_statistics).classes('bg-blue-500 text-white')
+                    ui.button('🎲 置信区间', on_click=self.compute_bootstrap_statistics).classes('bg-purple-500 text-white')
+                    self.stats_resamples = ui.number('重采样次数', value=10000, min=100, max=100000, step=1000).classes('w-32')
                     ui.button('🗑️ 清除', on_click=lambda: self.data_input.set_value('')).classes('bg-gray-500 text-white')
                 
                 with ui.card().classes('result-card w-full'):
                     self.stats_result = ui.html('🎯 统计结果将显示在这里').classes('text-h6')
+                with ui.card().classes('w-full'):
+                    self.corr_result = PlotView('<div class="text-center text-gray-500 p-8">🔗 相关分析图表将显示在这里</div>')
+                self.create_export_row('stats')
                 
                 # 数据预览区域
                 with ui.card().classes('w-full'):
@@ -350,54 +1026,150 @@ class ScientificCalculator:
                     for label, data in examples:
                         ui.button(label, on_click=lambda d=data: self.data_input.set_value(d)).classes('example-button')
     
-    def handle_stats_excel_upload(self, e):
-        """处理统计分析功能的Excel文件上传"""
-        try:
-            # 读取Excel文件
-            content = e.content.read()
-            df = pd.read_excel(io.BytesIO(content))
-            self.excel_data = df
-            
-            # 更新列选择器选项，只显示数值列
-            numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
-            all_columns = df.columns.tolist()
-            
-            # 优先显示数值列，但也包含所有列
-            self.stats_column.options = numeric_columns + [col for col in all_columns if col not in numeric_columns]
-            
-            # 显示成功消息
-            ui.notify(f'✅ Excel文件上传成功！共{len(df)}行，{len(numeric_columns)}个数值列', type='positive')
-            
-            # 自动选择第一个数值列（如果存在）
-            if numeric_columns:
-                self.stats_column.value = numeric_columns[0]
-                self.update_stats_data()
-                
-        except Exception as ex:
-            ui.notify(f'❌ Excel文件读取失败: {str(ex)}', type='negative')
+    def on_stats_data_loaded(self, df):
+        """统计分析面板：表格读取完成后更新列选择器"""
+        # 更新列选择器选项，只显示数值列
+        numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
+        all_columns = df.columns.tolist()
+        
+        # 优先显示数值列，但也包含所有列
+        self.stats_column.options = numeric_columns + [col for col in all_columns if col not in numeric_columns]
+        self.stats_group_by.options = all_columns
+        self.stats_group_by.value = None
+        self.corr_y_column.options = numeric_columns
+        self.corr_y_column.value = None
+        
+        # 显示成功消息
+        ui.notify(f'✅ 文件读取成功！共{len(df)}行，{len(numeric_columns)}个数值列', type='positive')
+        
+        # 自动选择第一个数值列（如果存在）
+        if numeric_columns:
+            self.stats_column.value = numeric_columns[0]
+            self.update_stats_data()
     
     def update_stats_data(self):
         """更新统计分析的数据"""
         if self.excel_data is not None and self.stats_column.value:
             try:
-                # 获取选中列的数据，去除空值
-                column_data = self.excel_data[self.stats_column.value].dropna()
-                
-                # 尝试转换为数值类型
-                try:
-                    numeric_data = pd.to_numeric(column_data, errors='coerce').dropna()
-                    data_str = ', '.join(str(x) for x in numeric_data.tolist())
-                    self.data_input.set_value(data_str)
-                    
-                    # 显示数据信息
-                    ui.notify(f'✅ 已加载 {len(numeric_data)} 个有效数值', type='positive')
-                    
-                except Exception:
+                # 从列式缓存获取去除空值后的数值数据
+                numeric_data = self.data_store.numeric(self.stats_column.value)
+                if len(numeric_data) == 0:
                     ui.notify(f'❌ 列 "{self.stats_column.value}" 包含非数值数据', type='negative')
+                    return
+                self.data_input.set_value(self.data_store.text(self.stats_column.value, numeric=True))
+                
+                # 显示数据信息
+                ui.notify(f'✅ 已加载 {len(numeric_data)} 个有效数值', type='positive')
                     
             except Exception as e:
                 ui.notify(f'❌ 数据更新失败: {str(e)}', type='negative')
     
+    def compute_table_statistics(self):
+        """计算所有数值列的统计量表"""
+        if self.excel_data is None:
+            self.stats_result.content = '<div class="text-red-500 text-center p-4">❌ 请先上传Excel文件</div>'
+            return
+        
+        try:
+            percentiles_str = self.stats_percentiles.value
+            percentiles = parse_data(percentiles_str) if percentiles_str else []
+            table = compute_table_statistics(self.excel_data, percentiles, self.stats_group_by.value)
+            self.set_exports('stats', ExportCapture(), {'列统计': table})
+            table_html = table.to_html(
+                float_format=lambda v: f'{v:.6g}',
+                classes='w-full border-collapse border border-gray-300 text-sm'
+            )
+            
+            self.stats_result.content = f'''
+            <div class="bg-blue-50 p-4 rounded-lg">
+                <h3 class="text-lg font-bold mb-4 text-center">📊 全部数值列统计结果</h3>
+                <div class="overflow-x-auto">{table_html}</div>
+            </div>
+            '''
+        except Exception as e:
+            self.stats_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    async def compute_correlation_matrix(self):
+        """计算所有数值列的相关矩阵"""
+        if self.excel_data is None:
+            self.corr_result.content = '<div class="text-red-500 text-center p-4">❌ 请先上传Excel文件</div>'
+            return
+        
+        try:
+            method = self.corr_method.value
+            (img_base64, corr), captured = await run.io_bound(captured_job, create_correlation_plot, self.excel_data, method)
+            self.set_exports('stats', captured)
+            table_html = corr.to_html(
+                float_format=lambda v: f'{v:.4f}',
+                classes='w-full border-collapse border border-gray-300 text-sm'
+            )
+            self.corr_result.show(img_base64, f'{CORRELATION_METHODS[method]}相关矩阵 ({len(corr)}个数值列)',
+                                  details=f'<div class="overflow-x-auto mt-4">{table_html}</div>')
+        except Exception as e:
+            self.corr_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    def lag_correlation_data(self):
+        """滞后相关的输入：已上传文件时取所选列（按行对齐去除空值），否则取手动输入的数据"""
+        if self.excel_data is not None and self.stats_column.value:
+            columns = [self.stats_column.value]
+            if self.corr_y_column.value:
+                columns.append(self.corr_y_column.value)
+            pairs = self.excel_data[columns].apply(pd.to_numeric, errors='coerce').dropna()
+            y_data = pairs.iloc[:, 1].to_numpy(dtype=float) if len(columns) == 2 else None
+            return pairs.iloc[:, 0].to_numpy(dtype=float), y_data, tuple(map(str, columns))
+        if self.data_input.value:
+            return parse_data(self.data_input.value), None, ('数据',)
+        raise ValueError('请上传文件或输入数据')
+    
+    async def compute_lag_correlation(self):
+        """计算自相关或互相关随滞后的变化"""
+        try:
+            x_data, y_data, names = self.lag_correlation_data()
+            max_lag = None if self.corr_max_lag.value is None else int(self.corr_max_lag.value)
+            (img_base64, (lag, value)), captured = await run.io_bound(
+                captured_job, create_lag_correlation_plot, x_data, y_data, max_lag, names)
+            self.set_exports('stats', captured)
+            self.corr_result.show(img_base64, f'{"自相关" if y_data is None else "互相关"}分析结果 (共{len(x_data)}个数据点)',
+                                  summary=f'''
+                <div class="bg-blue-100 p-3 rounded text-center">
+                    <p><strong>相关最强的滞后:</strong> {lag}</p>
+                    <p><strong>相关系数:</strong> {value:.6f}</p>
+                </div>''')
+        except Exception as e:
+            self.corr_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    async def compute_bootstrap_statistics(self):
+        """计算统计量的bootstrap置信区间"""
+        data_str = self.data_input.value
+        
+        if not data_str:
+            self.stats_result.content = '❌ 请输入数据'
+            return
+        
+        try:
+            n_resamples = int(self.stats_resamples.value)
+            table = await self.run_job('stats', ('bootstrap_statistics', data_str, n_resamples),
+                                       bootstrap_statistics_job, data_str, n_resamples)
+            if table is None:
+                return
+            self.set_exports('stats', ExportCapture(), {'置信区间': table})
+            self.stats_result.content = self.render_confidence_table(table, '📊 Bootstrap 95% 置信区间')
+        except Exception as e:
+            self.stats_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    def render_confidence_table(self, table, title):
+        """将置信区间表渲染为HTML"""
+        table_html = table.to_html(
+            float_format=lambda v: f'{v:.6g}',
+            classes='w-full border-collapse border border-gray-300 text-sm'
+        )
+        return f'''
+        <div class="bg-blue-50 p-4 rounded-lg">
+            <h3 class="text-lg font-bold mb-4 text-center">{title}</h3>
+            <div class="overflow-x-auto">{table_html}</div>
+        </div>
+        '''
+    
     def preview_stats_data(self):
         """预览统计分析的数据"""
         if self.excel_data is None:
@@ -431,7 +1203,7 @@ class ScientificCalculator:
             html_table += f'<p class="text-sm text-gray-600 mt-2">显示前10行，共{total_rows}行数据</p>'
             html_table += f'<p class="text-sm text-green-600">绿色背景列为数值列，推荐用于统计分析</p>'
             
-            self.stats_preview.content = html_table
+            update_html(self.stats_preview, html_table)
             
         except Exception as e:
             self.stats_preview.content = f'<div class="text-red-500 text-center p-4">❌ 预览失败: {str(e)}</div>'
@@ -444,13 +1216,7 @@ class ScientificCalculator:
                 
                 # Excel上传功能
                 with ui.expansion('📊 Excel文件输入', icon='upload_file').classes('w-full mb-4'):
-                    with ui.row().classes('w-full gap-4 mb-4'):
-                        self.fit_excel_upload = ui.upload(
-                            on_upload=self.handle_fitting_excel_upload,
-                            max_file_size=5_000_000,
-                            multiple=False
-                        ).props('accept=".xlsx,.xls"').classes('flex-1')
-                        ui.label('支持 .xlsx 和 .xls 格式，最大5MB').classes('text-sm text-gray-600')
+                    self.fit_excel_upload = self.create_table_upload(self.on_fitting_data_loaded)
                     
                     with ui.row().classes('w-full gap-4'):
                         self.fit_x_column = ui.select(
@@ -472,58 +1238,92 @@ class ScientificCalculator:
                                                      placeholder='例如: 1, 2, 3, 4, 5').classes('flex-1')
                         self.fit_y_input = ui.textarea('Y 数据 (逗号分隔)', 
                                                      placeholder='例如: 2, 4, 6, 8, 10').classes('flex-1')
+                        self.fit_w_input = ui.textarea('权重 (可选，逗号分隔)', 
+                                                     placeholder='例如: 1, 1, 0.5, 1, 1').classes('flex-1')
+
+                with ui.row().classes('w-full gap-4 mb-4'):
+                    self.deg_input = ui.number('多项式次数', value=1, min=1, max=30, step=1).classes('w-32')
+                    self.fit_basis = ui.select(
+                        {'auto': '自动', 'power': '幂基', 'chebyshev': '切比雪夫', 'legendre': '勒让德'},
+                        value='auto',
+                        label='多项式基'
+                    ).classes('w-32')
+                    self.fit_loss = ui.select(
+                        {'linear': '最小二乘', 'huber': 'Huber', 'soft_l1': 'Soft-L1', 'cauchy': 'Cauchy'},
+                        value='linear',
+                        label='损失函数'
+                    ).classes('w-32')
+                    self.fit_model_input = ui.input('自定义模型 (可选)', 
+                                                  placeholder='例如: a*exp(b*x) + c').classes('flex-grow')
 
-                self.deg_input = ui.number('多项式次数', value=1, min=1, max=10, step=1).classes('w-32')
+                with ui.row().classes('w-full gap-4 mb-4'):
+                    self.auto_max_deg = ui.number('最高次数', value=8, min=1, max=30, step=1).classes('w-32')
+                    self.auto_criterion = ui.select(
+                        {'cv': 'K折交叉验证', 'aic': 'AIC', 'bic': 'BIC'},
+                        value='cv',
+                        label='选择准则'
+                    ).classes('w-40')
+                    self.auto_families = ui.select(
+                        {expr: f'{name}: {expr}' for name, expr in FIT_FAMILIES.items()},
+                        value=[],
+                        multiple=True,
+                        label='候选模型族'
+                    ).classes('flex-grow')
 
                 with ui.row().classes('w-full gap-4 mb-4'):
                     ui.button('📈 执行拟合', on_click=self.curve_fitting).classes('bg-green-500 text-white')
+                    ui.button('🤖 自动选择模型', on_click=self.auto_select_model).classes('bg-blue-500 text-white')
+                    ui.button('🎲 系数置信区间', on_click=self.compute_bootstrap_fit).classes('bg-purple-500 text-white')
                     ui.button('🗑️ 清除', on_click=lambda: [
                         self.fit_x_input.set_value(''), 
-                        self.fit_y_input.set_value('')
+                        self.fit_y_input.set_value(''),
+                        self.fit_w_input.set_value(''),
+                        self.fit_model_input.set_value('')
                     ]).classes('bg-gray-500 text-white')
                 
+                # 插值模型按数据内容缓存，同一数据换查询网格时只需求值
+                with ui.expansion('〰️ 插值与重采样', icon='timeline').classes('w-full mb-4'):
+                    with ui.row().classes('w-full gap-4 mb-4 items-center'):
+                        self.interp_method = ui.select(INTERPOLATION_METHODS, value='cubic', label='插值方法').classes('w-40')
+                        self.interp_grid = ui.input('查询网格', placeholder='起点:终点:步长 或逗号分隔，留空则在数据范围内均匀取点').classes('flex-grow')
+                        self.interp_extrapolate = ui.checkbox('外推', value=False)
+                        ui.button('〰️ 插值', on_click=self.compute_interpolation).classes('bg-green-500 text-white')
+                    with ui.row().classes('w-full gap-4 items-center'):
+                        self.resample_ratio = ui.input('重采样比例 (新/原)', value='3/2', placeholder='例如: 3/2 或 0.5').classes('w-48')
+                        ui.label('Y视为等间距采样的信号，按有理比例多相重采样').classes('text-sm text-gray-600')
+                        ui.button('🔁 重采样', on_click=self.compute_resample).classes('bg-blue-500 text-white')
+                
                 with ui.card().classes('w-full'):
-                    self.fit_result = ui.html().classes('w-full')
-                    self.fit_result.content = '<div class="text-center text-gray-500 p-8">📉 拟合结果将显示在这里</div>'
+                    self.fit_result = PlotView('<div class="text-center text-gray-500 p-8">📉 拟合结果将显示在这里</div>')
+                self.create_export_row('fitting')
                 
                 # 数据预览区域
                 with ui.card().classes('w-full'):
                     self.fitting_preview = ui.html().classes('w-full')
                     self.fitting_preview.content = '<div class="text-center text-gray-500 p-4">📋 数据预览将显示在这里</div>'
     
-    def handle_fitting_excel_upload(self, e):
-        """处理拟合功能的Excel文件上传"""
-        try:
-            # 读取Excel文件
-            content = e.content.read()
-            df = pd.read_excel(io.BytesIO(content))
-            self.excel_data = df
-            
-            # 更新列选择器选项
-            columns = df.columns.tolist()
-            self.fit_x_column.options = columns
-            self.fit_y_column.options = columns
-            
-            # 显示成功消息
-            ui.notify(f'✅ Excel文件上传成功！共{len(df)}行，{len(columns)}列', type='positive')
-            
-            # 自动选择前两列（如果存在）
-            if len(columns) >= 2:
-                self.fit_x_column.value = columns[0]
-                self.fit_y_column.value = columns[1]
-                self.update_fitting_x_data()
-                self.update_fitting_y_data()
-                
-        except Exception as ex:
-            ui.notify(f'❌ Excel文件读取失败: {str(ex)}', type='negative')
+    def on_fitting_data_loaded(self, df):
+        """拟合面板：表格读取完成后更新列选择器"""
+        # 更新列选择器选项
+        columns = df.columns.tolist()
+        self.fit_x_column.options = columns
+        self.fit_y_column.options = columns
+        
+        # 显示成功消息
+        ui.notify(f'✅ 文件读取成功！共{len(df)}行，{len(columns)}列', type='positive')
+        
+        # 自动选择前两列（如果存在）
+        if len(columns) >= 2:
+            self.fit_x_column.value = columns[0]
+            self.fit_y_column.value = columns[1]
+            self.update_fitting_x_data()
+            self.update_fitting_y_data()
     
     def update_fitting_x_data(self):
         """更新拟合功能的X轴数据"""
         if self.excel_data is not None and self.fit_x_column.value:
             try:
-                x_data = self.excel_data[self.fit_x_column.value].dropna().tolist()
-                x_str = ', '.join(str(x) for x in x_data)
-                self.fit_x_input.set_value(x_str)
+                self.fit_x_input.set_value(self.data_store.text(self.fit_x_column.value))
             except Exception as e:
                 ui.notify(f'❌ X轴数据更新失败: {str(e)}', type='negative')
     
@@ -531,9 +1331,7 @@ class ScientificCalculator:
         """更新拟合功能的Y轴数据"""
         if self.excel_data is not None and self.fit_y_column.value:
             try:
-                y_data = self.excel_data[self.fit_y_column.value].dropna().tolist()
-                y_str = ', '.join(str(y) for y in y_data)
-                self.fit_y_input.set_value(y_str)
+                self.fit_y_input.set_value(self.data_store.text(self.fit_y_column.value))
             except Exception as e:
                 ui.notify(f'❌ Y轴数据更新失败: {str(e)}', type='negative')
     
@@ -563,7 +1361,7 @@ class ScientificCalculator:
             total_rows = len(self.excel_data)
             html_table += f'<p class="text-sm text-gray-600 mt-2">显示前10行，共{total_rows}行数据</p>'
             
-            self.fitting_preview.content = html_table
+            update_html(self.fitting_preview, html_table)
             
         except Exception as e:
             self.fitting_preview.content = f'<div class="text-red-500 text-center p-4">❌ 预览失败: {str(e)}</div>'
@@ -579,19 +1377,149 @@ class ScientificCalculator:
             return
         
         try:
-            img_base64, poly, r_squared = create_fitting_plot(x_str, y_str, degree)
+            with capture_exports() as captured:
+                # 在线拟合器只用于低次幂基；指定基或高次时走正交基的完整拟合
+                if (self.fit_w_input.value or self.fit_model_input.value or self.fit_loss.value != 'linear'
+                        or self.fit_basis.value != 'auto' or int(degree) >= ORTHOGONAL_DEGREE):
+                    self.fit_stream = None
+                    img_base64, poly, r_squared = create_fitting_plot(
+                        x_str, y_str, degree,
+                        weights_str=self.fit_w_input.value,
+                        loss=self.fit_loss.value,
+                        basis=self.fit_basis.value,
+                        model_expr=self.fit_model_input.value
+                    )
+                else:
+                    # 普通多项式拟合走在线拟合器，追加数据时只处理新增的点
+                    fitter, x_data, y_data = self.update_online_fit(x_str, y_str, int(degree))
+                    img_base64, poly, r_squared = create_online_fitting_plot(fitter, x_data, y_data)
+            self.set_exports('fitting', captured)
             
-            self.fit_result.content = f'''
-            <div class="text-center">
-                <h3 class="text-lg font-bold mb-2">曲线拟合结果</h3>
-                <div class="bg-blue-100 p-3 rounded mb-4">
-                    <p><strong>拟合多项式:</strong> {poly}</p>
+            self.fit_result.show(img_base64, '曲线拟合结果', summary=f'''
+                <div class="bg-blue-100 p-3 rounded text-center">
+                    <p><strong>拟合模型:</strong> {poly}</p>
                     <p><strong>R²相关系数:</strong> {r_squared:.6f}</p>
                     <p><strong>拟合质量:</strong> {'优秀' if r_squared > 0.95 else '良好' if r_squared > 0.8 else '一般' if r_squared > 0.6 else '较差'}</p>
-                </div>
-                <img src="data:image/png;base64,{img_base64}" class="w-full h-auto rounded-lg shadow-lg">
-            </div>
-            '''
+                </div>''')
+        except Exception as e:
+            self.fit_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    async def compute_interpolation(self):
+        """在查询网格上插值"""
+        x_str = self.fit_x_input.value
+        y_str = self.fit_y_input.value
+        
+        if not x_str or not y_str:
+            self.fit_result.content = '❌ 请输入X和Y数据'
+            return
+        
+        try:
+            (img_base64, n_points), captured = await run.io_bound(
+                captured_job, create_interpolation_plot, x_str, y_str, self.interp_grid.value,
+                self.interp_method.value, bool(self.interp_extrapolate.value))
+            self.set_exports('fitting', captured)
+            self.fit_result.show(img_base64, f'{INTERPOLATION_METHODS[self.interp_method.value]}插值结果 (共{n_points}个查询点)')
+        except Exception as e:
+            self.fit_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    async def compute_resample(self):
+        """按有理比例重采样等间距数据"""
+        x_str = self.fit_x_input.value
+        y_str = self.fit_y_input.value
+        
+        if not x_str or not y_str:
+            self.fit_result.content = '❌ 请输入X和Y数据'
+            return
+        
+        try:
+            (img_base64, (up, down, n_points)), captured = await run.io_bound(
+                captured_job, create_resample_plot, x_str, y_str, self.resample_ratio.value)
+            self.set_exports('fitting', captured)
+            self.fit_result.show(img_base64, f'重采样结果 (×{up}/{down}，共{n_points}点)')
+        except Exception as e:
+            self.fit_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    def update_online_fit(self, x_str, y_str, degree):
+        """若数据只是在末尾追加，则增量更新在线拟合器，否则重新拟合"""
+        state = self.fit_stream
+        if (state is not None and state['degree'] == degree
+                and x_str.startswith(state['x_str']) and y_str.startswith(state['y_str'])):
+            x_tail = x_str[len(state['x_str']):].strip()
+            y_tail = y_str[len(state['y_str']):].strip()
+            if not x_tail and not y_tail:
+                return state['fitter'], state['x_data'], state['y_data']
+            if x_tail.startswith(',') and y_tail.startswith(','):
+                x_new = parse_data(x_tail[1:])
+                y_new = parse_data(y_tail[1:])
+                if len(x_new) != len(y_new):
+                    raise ValueError('X和Y数据数量不一致')
+                state['fitter'].update(x_new, y_new)
+                state['x_data'] = np.concatenate([state['x_data'], x_new])
+                state['y_data'] = np.concatenate([state['y_data'], y_new])
+                state['x_str'], state['y_str'] = x_str, y_str
+                return state['fitter'], state['x_data'], state['y_data']
+        
+        x_data = parse_data(x_str)
+        y_data = parse_data(y_str)
+        fitter = OnlinePolyFit(degree).update(x_data, y_data)
+        self.fit_stream = {
+            'degree': degree, 'fitter': fitter,
+            'x_str': x_str, 'y_str': y_str,
+            'x_data': x_data, 'y_data': y_data,
+        }
+        return fitter, x_data, y_data
+    
+    async def compute_bootstrap_fit(self):
+        """计算拟合系数和R²的bootstrap置信区间"""
+        x_str = self.fit_x_input.value
+        y_str = self.fit_y_input.value
+        
+        if not x_str or not y_str:
+            self.fit_result.content = '❌ 请输入X和Y数据'
+            return
+        
+        try:
+            degree = int(self.deg_input.value)
+            table = await self.run_job('fitting', ('bootstrap_fit', x_str, y_str, degree),
+                                       bootstrap_fit_job, x_str, y_str, degree)
+            if table is None:
+                return
+            self.set_exports('fitting', ExportCapture(), {'系数置信区间': table})
+            self.fit_result.content = self.render_confidence_table(table, '📉 拟合系数 Bootstrap 95% 置信区间')
+        except Exception as e:
+            self.fit_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    async def auto_select_model(self):
+        """自动选择拟合模型"""
+        x_str = self.fit_x_input.value
+        y_str = self.fit_y_input.value
+        
+        if not x_str or not y_str:
+            self.fit_result.content = '❌ 请输入X和Y数据'
+            return
+        
+        try:
+            families = list(self.auto_families.value or [])
+            if self.fit_model_input.value:
+                families.append(self.fit_model_input.value)
+            args = (x_str, y_str, self.auto_max_deg.value, self.auto_criterion.value, tuple(families))
+            job = await self.run_job('fitting', ('model_selection',) + args, captured_job,
+                                     create_model_selection_plot, *args)
+            if job is None:
+                return
+            (img_base64, table, fit), captured = job
+            self.set_exports('fitting', captured, {'模型比较': table})
+            table_html = table.to_html(
+                index=False,
+                float_format=lambda v: f'{v:.6g}',
+                classes='w-full border-collapse border border-gray-300 text-sm'
+            )
+            
+            self.fit_result.show(img_base64, '自动模型选择结果', summary=f'''
+                <div class="bg-blue-100 p-3 rounded text-center">
+                    <p><strong>最优模型:</strong> {fit['model']}</p>
+                    <p><strong>R²相关系数:</strong> {fit['r_squared']:.6f}</p>
+                </div>''', details=f'<div class="overflow-x-auto mt-4">{table_html}</div>')
         except Exception as e:
             self.fit_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
     
@@ -603,13 +1531,7 @@ class ScientificCalculator:
                 
                 # Excel上传功能
                 with ui.expansion('📊 Excel文件输入', icon='upload_file').classes('w-full mb-4'):
-                    with ui.row().classes('w-full gap-4 mb-4'):
-                        self.vis_excel_upload = ui.upload(
-                            on_upload=self.handle_visualization_excel_upload,
-                            max_file_size=5_000_000,
-                            multiple=False
-                        ).props('accept=".xlsx,.xls"').classes('flex-1')
-                        ui.label('支持 .xlsx 和 .xls 格式，最大5MB').classes('text-sm text-gray-600')
+                    self.vis_excel_upload = self.create_table_upload(self.on_visualization_data_loaded)
                     
                     with ui.row().classes('w-full gap-4'):
                         self.vis_x_column = ui.select(
@@ -632,11 +1554,15 @@ class ScientificCalculator:
                         self.vis_y_input = ui.textarea('Y 数据 (逗号分隔)', 
                                                      placeholder='例如: 2, 4, 6, 8, 10').classes('flex-1')
                 
-                self.chart_type = ui.select(
-                        ['散点图', '折线图', '柱状图', '饼图'], 
-                        value='散点图', 
-                        label='图表类型'
-                    ).classes('w-48')
+                with ui.row().classes('w-full gap-4 items-center'):
+                    self.chart_type = ui.select(
+                            ['散点图', '折线图', '柱状图', '饼图', *BINNED_CHARTS], 
+                            value='散点图', 
+                            label='图表类型'
+                        ).classes('w-48')
+                    self.vis_bins = ui.number('分箱数', value=DEFAULT_BINS, min=5, max=1000, step=5).classes('w-32')
+                    self.vis_bins.bind_visibility_from(self.chart_type, 'value', backward=lambda v: v in ('直方图', '二维密度图'))
+                    ui.label('直方图、核密度估计只使用Y数据；箱线图可按类别X分组').classes('text-sm text-gray-600')
 
                 with ui.row().classes('w-full gap-4 mb-4'):
                     ui.button('🎨 绘制图表', on_click=self.plot_data).classes('bg-purple-500 text-white')
@@ -646,47 +1572,36 @@ class ScientificCalculator:
                     ]).classes('bg-gray-500 text-white')
                 
                 with ui.card().classes('w-full'):
-                    self.vis_result = ui.html().classes('w-full')
-                    self.vis_result.content = '<div class="text-center text-gray-500 p-8">🎨 图表将显示在这里</div>'
+                    self.vis_result = PlotView('<div class="text-center text-gray-500 p-8">🎨 图表将显示在这里</div>')
+                self.create_export_row('visualization')
                 
                 # 数据预览区域
                 with ui.card().classes('w-full'):
                     self.visualization_preview = ui.html().classes('w-full')
                     self.visualization_preview.content = '<div class="text-center text-gray-500 p-4">📋 数据预览将显示在这里</div>'
     
-    def handle_visualization_excel_upload(self, e):
-        """处理可视化功能的Excel文件上传"""
-        try:
-            # 读取Excel文件
-            content = e.content.read()
-            df = pd.read_excel(io.BytesIO(content))
-            self.excel_data = df
-            
-            # 更新列选择器选项
-            columns = df.columns.tolist()
-            self.vis_x_column.options = columns
-            self.vis_y_column.options = columns
-            
-            # 显示成功消息
-            ui.notify(f'✅ Excel文件上传成功！共{len(df)}行，{len(columns)}列', type='positive')
-            
-            # 自动选择前两列（如果存在）
-            if len(columns) >= 2:
-                self.vis_x_column.value = columns[0]
-                self.vis_y_column.value = columns[1]
-                self.update_visualization_x_data()
-                self.update_visualization_y_data()
-                
-        except Exception as ex:
-            ui.notify(f'❌ Excel文件读取失败: {str(ex)}', type='negative')
+    def on_visualization_data_loaded(self, df):
+        """可视化面板：表格读取完成后更新列选择器"""
+        # 更新列选择器选项
+        columns = df.columns.tolist()
+        self.vis_x_column.options = columns
+        self.vis_y_column.options = columns
+        
+        # 显示成功消息
+        ui.notify(f'✅ 文件读取成功！共{len(df)}行，{len(columns)}列', type='positive')
+        
+        # 自动选择前两列（如果存在）
+        if len(columns) >= 2:
+            self.vis_x_column.value = columns[0]
+            self.vis_y_column.value = columns[1]
+            self.update_visualization_x_data()
+            self.update_visualization_y_data()
     
     def update_visualization_x_data(self):
         """更新可视化功能的X轴数据"""
         if self.excel_data is not None and self.vis_x_column.value:
             try:
-                x_data = self.excel_data[self.vis_x_column.value].dropna().tolist()
-                x_str = ', '.join(str(x) for x in x_data)
-                self.vis_x_input.set_value(x_str)
+                self.vis_x_input.set_value(self.data_store.text(self.vis_x_column.value))
             except Exception as e:
                 ui.notify(f'❌ X轴数据更新失败: {str(e)}', type='negative')
     
@@ -694,9 +1609,7 @@ class ScientificCalculator:
         """更新可视化功能的Y轴数据"""
         if self.excel_data is not None and self.vis_y_column.value:
             try:
-                y_data = self.excel_data[self.vis_y_column.value].dropna().tolist()
-                y_str = ', '.join(str(y) for y in y_data)
-                self.vis_y_input.set_value(y_str)
+                self.vis_y_input.set_value(self.data_store.text(self.vis_y_column.value))
             except Exception as e:
                 ui.notify(f'❌ Y轴数据更新失败: {str(e)}', type='negative')
     
@@ -726,7 +1639,7 @@ class ScientificCalculator:
             total_rows = len(self.excel_data)
             html_table += f'<p class="text-sm text-gray-600 mt-2">显示前10行，共{total_rows}行数据</p>'
             
-            self.visualization_preview.content = html_table
+            update_html(self.visualization_preview, html_table)
             
         except Exception as e:
             self.visualization_preview.content = f'<div class="text-red-500 text-center p-4">❌ 预览失败: {str(e)}</div>'
@@ -737,6 +1650,10 @@ class ScientificCalculator:
         y_str = self.vis_y_input.value
         chart_type = self.chart_type.value
         
+        if chart_type in BINNED_CHARTS:
+            self.plot_binned_data(x_str, y_str, chart_type)
+            return
+        
         if not x_str or not y_str:
             self.vis_result.content = '❌ 请输入X和Y数据'
             return
@@ -768,15 +1685,37 @@ class ScientificCalculator:
                 self.vis_result.content = '<div class="text-red-500 text-center p-4">❌ X和Y数据数量不一致</div>'
                 return
             
-            img_base64 = create_visualization_plot(x_data, y_data, chart_type)
+            with capture_exports() as captured:
+                img_base64 = create_visualization_plot(x_data, y_data, chart_type)
+            self.set_exports('visualization', captured)
             
-            self.vis_result.content = f'''
-            <div class="text-center">
-                <h3 class="text-lg font-bold mb-4">{chart_type}可视化结果</h3>
-                <img src="data:image/png;base64,{img_base64}" class="w-full h-auto rounded-lg shadow-lg">
-            </div>
-            '''
+            self.vis_result.show(img_base64, f'{chart_type}可视化结果')
+            
+        except Exception as e:
+            self.vis_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    def plot_binned_data(self, x_str, y_str, chart_type):
+        """绘制基于分箱聚合的图表（直方图、二维密度图、核密度估计、箱线图）"""
+        if not y_str or (chart_type == '二维密度图' and not x_str):
+            self.vis_result.content = '❌ 请输入X和Y数据' if chart_type == '二维密度图' else '❌ 请输入Y数据'
+            return
+        
+        try:
+            y_data = parse_data(y_str)
+            x_data = None
+            if x_str:
+                try:
+                    x_data = parse_data(x_str)
+                except ValueError:
+                    # 非数值X作为箱线图的分组类别
+                    x_data = np.array([x.strip() for x in x_str.split(',')])
             
+            with capture_exports() as captured:
+                img_base64 = create_visualization_plot(x_data, y_data, chart_type, self.vis_bins.value or DEFAULT_BINS)
+            self.set_exports('visualization', captured)
+            
+            self.vis_result.show(img_base64, f'{chart_type}可视化结果',
+                                 details=f'<p class="text-sm text-gray-600 text-center">共 {len(y_data)} 个数据点</p>')
         except Exception as e:
             self.vis_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
     
@@ -833,134 +1772,245 @@ class ScientificCalculator:
                 iqr=stats['q3'] - stats['q1']
             )
             
-            self.stats_result.content = html_content
+            update_html(self.stats_result, html_content)
             
         except Exception as e:
             self.stats_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
-            self.visualization_preview.content = '<div class="text-center text-gray-500 p-4">📋 数据预览将显示在这里</div>'
     
-    def handle_visualization_excel_upload(self, e):
-        """处理可视化功能的Excel文件上传"""
-        try:
-            # 读取Excel文件
-            content = e.content.read()
-            df = pd.read_excel(io.BytesIO(content))
-            self.excel_data = df
-            
-            # 更新列选择器选项
-            columns = df.columns.tolist()
-            self.vis_x_column.options = columns
-            self.vis_y_column.options = columns
-            
-            # 显示成功消息
-            ui.notify(f'✅ Excel文件上传成功！共{len(df)}行，{len(columns)}列', type='positive')
-            
-            # 自动选择前两列（如果存在）
-            if len(columns) >= 2:
-                self.vis_x_column.value = columns[0]
-                self.vis_y_column.value = columns[1]
-                self.update_visualization_x_data()
-                self.update_visualization_y_data()
+    def create_linalg_tab(self, tab):
+        """创建线性代数面板"""
+        with ui.tab_panel(tab):
+            with ui.card().classes('w-full'):
+                ui.label('🧮 线性代数').classes('text-h5 mb-4')
+                
+                with ui.row().classes('w-full gap-4 mb-4'):
+                    self.linalg_op = ui.select(LINALG_OPERATIONS, value='det', label='运算').classes('w-56')
+                    self.linalg_mode = ui.select({None: '自动', False: '数值 (LAPACK)', True: '精确 (SymPy)'},
+                                                 value=None, label='计算方式').classes('w-40')
+                    self.linalg_threads = ui.number('线程数 (留空自动)', value=None, min=1, max=64, step=1, format='%d').classes('w-40')
                 
+                with ui.row().classes('w-full gap-4 mb-4'):
+                    self.matrix_a = ui.textarea('矩阵 A', placeholder='1 2\n3 4\n（空行分隔多个矩阵进行批量计算）').classes('flex-1')
+                    self.matrix_b = ui.textarea('右端项 B（线性方程组/最小二乘）', placeholder='5\n6').classes('flex-1')
+                
+                # 大矩阵从文件读取，.npy以内存映射方式打开
+                with ui.expansion('📄 矩阵文件', icon='upload_file').classes('w-full mb-4'):
+                    with ui.row().classes('w-full gap-4 items-center'):
+                        self.matrix_target = ui.toggle(['A', 'B'], value='A').classes('w-24')
+                        ui.upload(
+                            on_upload=self.handle_matrix_upload,
+                            max_file_size=MAX_UPLOAD_BYTES,
+                            multiple=False
+                        ).props(f'accept="{",".join(MATRIX_SUFFIXES)}"').classes('flex-1')
+                        ui.label('.npy（可为三维批量）、.csv、.txt 或 Excel 文件').classes('text-sm text-gray-600')
+                
+                with ui.row().classes('w-full gap-2 mb-4'):
+                    ui.button('🧮 计算', on_click=self.compute_linalg).classes('bg-green-500 text-white')
+                    ui.button('🗑️ 清除', on_click=lambda: [
+                        self.matrix_a.set_value(''),
+                        self.matrix_b.set_value(''),
+                        self.matrix_files.clear()
+                    ]).classes('bg-gray-500 text-white')
+                
+                with ui.card().classes('w-full'):
+                    self.linalg_result = ui.html().classes('w-full')
+                    self.linalg_result.content = '<div class="text-center text-gray-500 p-8">🧮 计算结果将显示在这里</div>'
+                self.create_export_row('linalg')
+                
+                ui.label('📝 示例:').classes('text-subtitle1 font-weight-bold mt-4')
+                with ui.row().classes('flex-wrap gap-2'):
+                    examples = [
+                        ('整数矩阵求逆', 'inv', '2 1 0\n1 3 1\n0 1 4', ''),
+                        ('对称矩阵特征值', 'eig', '4 1\n1 3', ''),
+                        ('线性方程组', 'solve', '1 2\n3 4', '5\n6'),
+                        ('直线拟合(最小二乘)', 'lstsq', '1 0\n1 1\n1 2\n1 3', '1.1\n1.9\n3.2\n3.9'),
+                        ('批量行列式', 'det', '1 2\n3 4\n\n2 0\n0 2\n\n0.5 1\n1 0.5', ''),
+                    ]
+                    for label, op, a, b in examples:
+                        ui.button(label, on_click=lambda op=op, a=a, b=b: [
+                            self.linalg_op.set_value(op),
+                            self.matrix_a.set_value(a),
+                            self.matrix_b.set_value(b)
+                        ]).classes('example-button')
+    
+    async def handle_matrix_upload(self, e):
+        """保存上传的矩阵文件并在后台读取（.npy为内存映射，不整体读入内存）"""
+        target = self.matrix_target.value
+        path = None
+        try:
+            path = await run.io_bound(save_upload, e.content, os.path.splitext(e.name)[1].lower())
+            array = await run.io_bound(load_matrix, path)
         except Exception as ex:
-            ui.notify(f'❌ Excel文件读取失败: {str(ex)}', type='negative')
+            if path is not None:
+                os.remove(path)
+            ui.notify(f'❌ 矩阵文件读取失败: {str(ex)}', type='negative')
+            return
+        self.release_matrix_file(target)
+        self.matrix_files[target] = (e.name, array, path)
+        shape = '×'.join(map(str, array.shape))
+        (self.matrix_a if target == 'A' else self.matrix_b).set_value(f'[文件 {e.name}: {shape}]')
+        ui.notify(f'✅ 矩阵{target}读取成功: {shape}', type='positive')
     
-    def update_visualization_x_data(self):
-        """更新可视化功能的X轴数据"""
-        if self.excel_data is not None and self.vis_x_column.value:
+    def release_matrix_file(self, target):
+        """删除之前上传的矩阵临时文件"""
+        previous = self.matrix_files.pop(target, None)
+        if previous is not None:
             try:
-                x_data = self.excel_data[self.vis_x_column.value].dropna().tolist()
-                x_str = ', '.join(str(x) for x in x_data)
-                self.vis_x_input.set_value(x_str)
-            except Exception as e:
-                ui.notify(f'❌ X轴数据更新失败: {str(e)}', type='negative')
+                os.remove(previous[2])
+            except OSError:
+                pass
     
-    def update_visualization_y_data(self):
-        """更新可视化功能的Y轴数据"""
-        if self.excel_data is not None and self.vis_y_column.value:
-            try:
-                y_data = self.excel_data[self.vis_y_column.value].dropna().tolist()
-                y_str = ', '.join(str(y) for y in y_data)
-                self.vis_y_input.set_value(y_str)
-            except Exception as e:
-                ui.notify(f'❌ Y轴数据更新失败: {str(e)}', type='negative')
+    def matrix_input(self, target, text):
+        """读取矩阵输入：输入框仍显示文件占位文本时使用上传的文件"""
+        if text.startswith('[文件') and target in self.matrix_files:
+            return self.matrix_files[target][1]
+        return parse_matrix(text)
     
-    def preview_visualization_data(self):
-        """预览可视化功能的数据"""
-        if self.excel_data is None:
-            self.visualization_preview.content = '<div class="text-red-500 text-center p-4">❌ 请先上传Excel文件</div>'
+    async def compute_linalg(self):
+        """执行线性代数运算（后台线程）"""
+        op = self.linalg_op.value
+        if not self.matrix_a.value:
+            self.linalg_result.content = '<div class="text-red-500 text-center p-4">❌ 请输入矩阵A</div>'
+            return
+        slot = self.pending_slot('linalg')
+        if slot in self.pending_tabs:
+            ui.notify('⏳ 上一次计算尚未完成', type='info')
             return
         
+        self.pending_tabs[slot] = None
         try:
-            # 创建预览表格
-            preview_df = self.excel_data.head(10)  # 只显示前10行
-            
-            html_table = '<div class="overflow-x-auto"><table class="w-full border-collapse border border-gray-300">'
-            html_table += '<thead><tr class="bg-gray-100">'
-            for col in preview_df.columns:
-                html_table += f'<th class="border border-gray-300 px-2 py-1 text-left">{col}</th>'
-            html_table += '</tr></thead><tbody>'
-            
-            for _, row in preview_df.iterrows():
-                html_table += '<tr>'
-                for val in row:
-                    html_table += f'<td class="border border-gray-300 px-2 py-1">{val}</td>'
-                html_table += '</tr>'
-            html_table += '</tbody></table></div>'
-            
-            total_rows = len(self.excel_data)
-            html_table += f'<p class="text-sm text-gray-600 mt-2">显示前10行，共{total_rows}行数据</p>'
-            
-            self.visualization_preview.content = html_table
+            a = self.matrix_input('A', self.matrix_a.value)
+            b = self.matrix_input('B', self.matrix_b.value) if op in ('solve', 'lstsq') and self.matrix_b.value else None
+            threads = None if self.linalg_threads.value is None else int(self.linalg_threads.value)
+            start = time.perf_counter()
+            output = await run.io_bound(matrix_operation, op, a, b, threads, self.linalg_mode.value)
+            elapsed = time.perf_counter() - start
+            tables = {name: matrix_table(value) for name, value in output['results'].items()
+                      if isinstance(value, (np.ndarray, sp.MatrixBase))}
+            self.set_exports('linalg', ExportCapture(), tables)
             
+            shape = '×'.join(map(str, a.shape))
+            batch = f'，批量 {output["batch"]} 个' if output['batch'] else ''
+            sections = ''.join(
+                f'<p class="font-bold mt-2">{html.escape(name)}</p>'
+                f'<pre class="bg-white p-2 rounded border overflow-x-auto">{html.escape(self.format_matrix(value))}</pre>'
+                for name, value in output['results'].items())
+            self.linalg_result.content = f'''
+            <div>
+                <h3 class="text-lg font-bold mb-2">{LINALG_OPERATIONS[op]}（A: {shape}{batch}）</h3>
+                <p class="text-sm text-gray-600">{output["method"]}，用时 {elapsed:.3f}s</p>
+                {sections}
+            </div>
+            '''
         except Exception as e:
-            self.visualization_preview.content = f'<div class="text-red-500 text-center p-4">❌ 预览失败: {str(e)}</div>'
+            self.linalg_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+        finally:
+            self.pending_tabs.pop(slot, None)
     
-    def plot_data(self):
-        """绘制数据图表"""
-        x_str = self.vis_x_input.value
-        y_str = self.vis_y_input.value
-        chart_type = self.chart_type.value
-        
-        if not x_str or not y_str:
-            self.vis_result.content = '❌ 请输入X和Y数据'
+    def format_matrix(self, value):
+        """格式化矩阵结果：符号结果用二维排版，大数组只显示首尾部分"""
+        if isinstance(value, (sp.Basic, sp.MatrixBase, dict, list)):
+            return sp.pretty(value, use_unicode=True)
+        return np.array2string(np.asarray(value), precision=6, threshold=200, edgeitems=3, suppress_small=True)
+    
+    def create_history_tab(self, tab):
+        """创建历史记录面板：按操作筛选，重新显示或比较过去的结果"""
+        with ui.tab_panel(tab):
+            with ui.card().classes('w-full'):
+                ui.label('🕘 计算历史').classes('text-h5 mb-4')
+                
+                with ui.row().classes('w-full gap-4 mb-4 items-center'):
+                    options = {None: '全部', **HISTORY_OPERATIONS}
+                    self.history_operation = ui.select(options, value=None, label='操作',
+                                                       on_change=lambda: self.refresh_history()).classes('w-40')
+                    self.history_session_only = ui.checkbox('仅本次会话', on_change=lambda: self.refresh_history())
+                    ui.button('🔄 刷新', on_click=self.refresh_history).classes('bg-blue-500 text-white')
+                    self.history_usage = ui.label('').classes('text-sm text-gray-600')
+                
+                columns = [{'name': name, 'label': label, 'field': name, 'align': 'left'}
+                           for name, label in [('time', '时间'), ('operation', '操作'), ('inputs', '输入'),
+                                               ('summary', '结果'), ('size', '大小')]]
+                self.history_table = ui.table(columns=columns, rows=[], row_key='id',
+                                              selection='multiple', pagination=10).classes('w-full')
+                
+                with ui.row().classes('w-full gap-2 my-4'):
+                    ui.button('🔁 重新显示', on_click=self.show_history_entry).classes('bg-green-500 text-white')
+                    ui.button('⚖️ 比较', on_click=self.compare_history_entries).classes('bg-purple-500 text-white')
+                    ui.button('🗑️ 删除所选', on_click=self.delete_history_entries).classes('bg-gray-500 text-white')
+                
+                with ui.card().classes('w-full'):
+                    self.history_result = ui.html().classes('w-full')
+                    self.history_result.content = '<div class="text-center text-gray-500 p-8">🕘 选择记录后重新显示或比较</div>'
+        self.refresh_history()
+    
+    def refresh_history(self):
+        """重新读取历史记录列表"""
+        try:
+            table = self.history.entries(self.user, self.history_operation.value,
+                                    self.session if self.history_session_only.value else None)
+            self.history_table.rows = [{
+                'id': int(row.id), 'time': row.时间.strftime('%m-%d %H:%M:%S'),
+                'operation': HISTORY_OPERATIONS.get(row.操作, row.操作), 'op': row.操作,
+                'inputs': row.输入, 'summary': row.摘要, 'size': f'{row.大小 / 1024:.1f} KB'
+            } for row in table.itertuples()]
+            self.history_table.selected = []
+            self.history_usage.text = f'已用 {self.history.total_size() / 2**20:.2f} / {self.history.quota / 2**20:.0f} MB'
+        except Exception as e:
+            self.history_usage.text = f'❌ 错误: {str(e)}'
+    
+    def render_history_entry(self, row, stored):
+        """将一条历史结果格式化为HTML，FFT结果重新绘图"""
+        title = f'{row["operation"]} · {row["time"]}'
+        if row['op'] == 'fft':
+            with capture_exports():
+                img_base64 = replot_fft(stored)
+            return (f'<h3 class="text-lg font-bold mb-2">{title}</h3>'
+                    f'<img src="{IMAGES.url(img_base64)}" class="w-full h-auto rounded-lg shadow-lg">')
+        if row['op'] == 'expression':
+            text = f'{row["inputs"]} = {self.format_result(stored["result"])}'
+        else:
+            text = self.format_simplified(row['inputs'], stored)
+        return f'<h3 class="text-lg font-bold mb-2">{title}</h3><pre class="whitespace-pre-wrap">{html.escape(text)}</pre>'
+    
+    def show_history_entry(self):
+        """重新显示所选的一条历史结果（不重新计算）"""
+        selected = self.history_table.selected
+        if len(selected) != 1:
+            ui.notify('❌ 请选择一条记录', type='negative')
             return
-        
         try:
-            # 改进数据转换逻辑
-            x_parts = [x.strip() for x in x_str.split(',')]
-            y_parts = [y.strip() for y in y_str.split(',')]
-            
-            # 处理X数据
-            x_data = []
-            for i, x in enumerate(x_parts):
-                try:
-                    # 尝试转换为数字
-                    x_data.append(float(x))
-                except ValueError:
-                    # 如果不能转换为数字，保留字符串
-                    x_data.append(x)
-            
-            # 处理Y数据
-            y_data = []
-            for y in y_parts:
-                try:
-                    y_data.append(float(y))
-                except ValueError:
-                    raise ValueError(f"Y数据 '{y}' 不是有效数字")
-            
-            if len(x_data) != len(y_data):
-                self.vis_result.content = '<div class="text-red-500 text-center p-4">❌ X和Y数据数量不一致</div>'
+            self.history_result.content = self.render_history_entry(selected[0], self.history.load(selected[0]['id']))
+        except Exception as e:
+            self.history_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    def compare_history_entries(self):
+        """比较所选的两条同类历史结果：FFT频谱叠加绘制，符号结果并列显示"""
+        selected = sorted(self.history_table.selected, key=lambda row: row['id'])
+        if len(selected) != 2 or selected[0]['op'] != selected[1]['op']:
+            ui.notify('❌ 请选择两条同类操作的记录', type='negative')
+            return
+        try:
+            stored = [self.history.load(row['id']) for row in selected]
+            if selected[0]['op'] == 'fft':
+                img_base64 = create_comparison_plot(
+                    [(f'#{row["id"]} {row["inputs"]}', result['FFT频谱']) for row, result in zip(selected, stored)],
+                    '频谱对比')
+                self.history_result.content = f'<img src="{IMAGES.url(img_base64)}" class="w-full h-auto rounded-lg shadow-lg">'
                 return
-            
-            img_base64 = create_visualization_plot(x_data, y_data, chart_type)
-            
-            self.vis_result.content = f'''
-            <div class="text-center">
-                <h3 class="text-lg font-bold mb-4">{chart_type}可视化结果</h3>
-                <img src="data:image/png;base64,{img_base64}" class="w-full h-auto rounded-lg shadow-lg">
-            </div>
-            '''
-            
+            same = str(stored[0]['result']) == str(stored[1]['result'])
+            verdict = '✅ 两次结果相同' if same else '⚠️ 两次结果不同'
+            panels = ''.join(f'<div class="bg-white p-3 rounded border">{self.render_history_entry(row, result)}</div>'
+                             for row, result in zip(selected, stored))
+            self.history_result.content = (f'<div class="font-bold mb-2">{verdict}</div>'
+                                           f'<div class="grid grid-cols-2 gap-4">{panels}</div>')
         except Exception as e:
-            self.vis_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+            self.history_result.content = f'<div class="text-red-500 text-center p-4">❌ 错误: {str(e)}</div>'
+    
+    def delete_history_entries(self):
+        """删除所选历史记录"""
+        selected = self.history_table.selected
+        if not selected:
+            ui.notify('❌ 请先选择记录', type='negative')
+            return
+        self.history.delete([row['id'] for row in selected])
+        self.refresh_history()
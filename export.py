@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import threading
+import tempfile
+import shutil
+import atexit
+import time
+import os
+from contextlib import contextmanager
+from urllib.parse import quote
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+
+# 导出格式与对应的媒体类型
+FIGURE_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf'}
+DATA_FORMATS = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet', 'npy': 'application/octet-stream'}
+EXPORT_DPI = (100, 150, 300, 600)
+# CSV分块写入的行数
+CSV_CHUNK_ROWS = 100_000
+
+# 导出文件写入的临时目录（进程内共享）
+EXPORT_DIR = tempfile.mkdtemp(prefix='scicalc_export_')
+atexit.register(shutil.rmtree, EXPORT_DIR, ignore_errors=True)
+# 导出文件经此路由下载，发送完成后即删除
+EXPORT_ROUTE = '/exports'
+# 始终未被下载的导出文件的保留时间（秒），超时后在下次导出时清理
+EXPORT_MAX_AGE = 3600
+
+_capture = threading.local()
+
+class ExportCapture:
+    """一次计算过程中产生的可导出内容：图像与数据表"""
+
+    def __init__(self):
+        self.figures = []
+        self.tables = {}
+
+    @property
+    def figure(self):
+        """最后生成的图像"""
+        return self.figures[-1] if self.figures else None
+
+@contextmanager
+def capture_exports():
+    """收集代码块内绘图函数输出的图像和数据表
+
+    绘图函数通过record_figure/record_table登记内容，不在收集状态时登记为空操作。
+    图像在plot_to_base64中关闭后仍可用save_figure重新渲染为其他格式。
+    """
+    previous = getattr(_capture, 'current', None)
+    _capture.current = ExportCapture()
+    try:
+        yield _capture.current
+    finally:
+        _capture.current = previous
+
+def record_figure(fig):
+    """登记生成的图像"""
+    current = getattr(_capture, 'current', None)
+    if current is not None:
+        current.figures.append(fig)
+
+def record_table(name, build):
+    """登记数据表，build为生成DataFrame的函数，仅在收集状态时调用"""
+    current = getattr(_capture, 'current', None)
+    if current is not None:
+        current.tables[name] = build()
+
+def save_figure(fig, path, fmt='png', dpi=100):
+    """将图像渲染为PNG/SVG/PDF文件，dpi只影响位图（PNG）及矢量图中嵌入的栅格元素"""
+    if fmt not in FIGURE_FORMATS:
+        raise ValueError(f'不支持的图像格式: {fmt}')
+    fig.savefig(path, format=fmt, bbox_inches='tight', dpi=dpi, facecolor='white')
+    return path
+
+def structured_array(df):
+    """DataFrame转为NumPy结构化数组，文本列转为定长Unicode，无需pickle即可读取"""
+    columns = []
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if values.dtype.kind not in 'biufcmM':
+            values = df[name].astype(str).to_numpy(dtype=str)
+        columns.append((str(name), values))
+    array = np.empty(len(df), dtype=[(name, values.dtype) for name, values in columns])
+    for name, values in columns:
+        array[name] = values
+    return array
+
+def save_table(table, path, fmt='csv'):
+    """将数据表写入CSV/Parquet/NPY文件"""
+    if fmt not in DATA_FORMATS:
+        raise ValueError(f'不支持的数据格式: {fmt}')
+    if isinstance(table, pd.Series):
+        table = table.to_frame()
+    # 统计量名称等有意义的索引作为普通列导出
+    if not isinstance(table.index, pd.RangeIndex):
+        table = table.reset_index()
+    if fmt == 'csv':
+        table.to_csv(path, index=False, chunksize=CSV_CHUNK_ROWS, encoding='utf-8-sig')
+    elif fmt == 'parquet':
+        try:
+            table.to_parquet(path, index=False)
+        except ImportError:
+            raise ValueError('Parquet导出需要安装pyarrow或fastparquet')
+    else:
+        np.save(path, structured_array(table), allow_pickle=False)
+    return path
+
+def prune_exports(max_age=EXPORT_MAX_AGE):
+    """删除超时仍未下载的导出文件"""
+    cutoff = time.time() - max_age
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+def export_path(stem, fmt):
+    """在导出目录中生成不重名的文件路径"""
+    prune_exports()
+    fd, path = tempfile.mkstemp(prefix=f'{stem}_', suffix=f'.{fmt}', dir=EXPORT_DIR)
+    os.close(fd)
+    return path
+
+def export_url(path, filename):
+    """导出文件的下载地址，filename为浏览器保存时使用的文件名"""
+    return f'{EXPORT_ROUTE}/{os.path.basename(path)}?filename={quote(filename)}'
+
+router = APIRouter()
+
+@router.get(EXPORT_ROUTE + '/{name}')
+def download_export(name: str, filename: str = None):
+    """发送导出文件，发送完成后删除，每个文件只能下载一次"""
+    name = os.path.basename(name)
+    path = os.path.join(EXPORT_DIR, name)
+    # 先改名认领文件，重复请求在文件删除前到达时也不会再次发送
+    sending = f'{path}.sending'
+    try:
+        os.rename(path, sending)
+    except OSError:
+        raise HTTPException(status_code=404, detail='导出文件不存在或已下载，请重新导出')
+    fmt = os.path.splitext(name)[1][1:]
+    media_type = FIGURE_FORMATS.get(fmt) or DATA_FORMATS.get(fmt, 'application/octet-stream')
+    return FileResponse(sending, media_type=media_type, filename=filename or name,
+                        background=BackgroundTask(os.remove, sending))
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+import sympy as sp
+import sqlite3
+import threading
+import hashlib
+import json
+import zlib
+import time
+import io
+import os
+from export import structured_array
+
+# 历史数据库位置与总大小上限（字节），超出时删除最旧的记录
+HISTORY_PATH = os.environ.get('SCICALC_HISTORY', os.path.join(os.path.expanduser('~'), '.scicalc', 'history.sqlite3'))
+HISTORY_QUOTA = 64 * 2**20
+# 超过该长度的数据压缩后存储
+COMPRESS_MIN = 256
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    session TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    compressed INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (entry_id, name)
+);
+CREATE INDEX IF NOT EXISTS entries_lookup ON entries(user, operation, input_hash);
+CREATE INDEX IF NOT EXISTS entries_recent ON entries(user, created);
+'''
+
+def input_hash(operation, inputs):
+    """计算操作与（规范化后）输入的哈希，作为查找键"""
+    text = json.dumps([operation, inputs], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _contains_sympy(value):
+    """判断值（或其中的容器元素）是否包含SymPy对象"""
+    if isinstance(value, sp.Basic):
+        return True
+    if isinstance(value, dict):
+        return any(_contains_sympy(k) or _contains_sympy(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return any(_contains_sympy(v) for v in value)
+    return False
+
+def _json_default(value):
+    """NumPy标量等转为JSON可表示的值"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def encode_value(value):
+    """序列化结果：数组与数据表为NPY二进制，符号结果为srepr字符串，其余为JSON
+
+    返回 (kind, compressed, data)。
+    """
+    if isinstance(value, bytes):
+        kind, data = 'bytes', value
+    elif isinstance(value, np.ndarray) and value.dtype.kind in 'biufcmM':
+        kind, data = 'npy', _npy_bytes(value)
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        table = value.to_frame() if isinstance(value, pd.Series) else value
+        kind, data = 'table', _npy_bytes(structured_array(table))
+    elif _contains_sympy(value):
+        kind, data = 'sympy', sp.srepr(value).encode('utf-8')
+    else:
+        kind, data = 'json', json.dumps(value, ensure_ascii=False, default=_json_default).encode('utf-8')
+    if len(data) > COMPRESS_MIN:
+        packed = zlib.compress(data)
+        if len(packed) < len(data):
+            return kind, True, packed
+    return kind, False, data
+
+def decode_value(kind, compressed, data):
+    """反序列化encode_value的输出"""
+    data = zlib.decompress(data) if compressed else bytes(data)
+    if kind == 'bytes':
+        return data
+    if kind == 'npy':
+        return np.load(io.BytesIO(data), allow_pickle=False)
+    if kind == 'table':
+        return pd.DataFrame(np.load(io.BytesIO(data), allow_pickle=False))
+    if kind == 'sympy':
+        return sp.sympify(data.decode('utf-8'))
+    if kind == 'json':
+        return json.loads(data.decode('utf-8'))
+    raise ValueError(f'未知的历史数据类型: {kind}')
+
+def _npy_bytes(array):
+    """数组写为NPY格式字节串（不使用pickle），3.0版格式支持中文字段名"""
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, array, version=(3, 0), allow_pickle=False)
+    return buffer.getvalue()
+
+class HistoryStore:
+    """基于sqlite的计算历史，按用户、操作与输入哈希建立索引
+
+    每条记录的结果为 名称 -> 值 的字典，各项分别序列化存储；总大小超过quota时删除最旧的记录。
+    连接在线程间共享，读写由锁串行化。
+    """
+
+    def __init__(self, path=HISTORY_PATH, quota=HISTORY_QUOTA):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.quota = quota
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.executescript(_SCHEMA)
+
+    def record(self, user, session, operation, inputs, result, summary='', label=None):
+        """保存一次计算结果，返回记录id；label为列表中显示的输入（默认为inputs本身）"""
+        items = [(name, *encode_value(value)) for name, value in result.items()]
+        size = sum(len(data) for _, _, _, data in items)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO entries (user, session, operation, input_hash, inputs, summary, size, created) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (user, session, operation, input_hash(operation, inputs),
+                 label or json.dumps(inputs, ensure_ascii=False, default=str), summary, size, time.time()))
+            entry_id = cursor.lastrowid
+            self._conn.executemany(
+                'INSERT INTO items (entry_id, name, kind, compressed, data) VALUES (?, ?, ?, ?, ?)',
+                [(entry_id, name, kind, int(compressed), data) for name, kind, compressed, data in items])
+            self._prune()
+        return entry_id
+
+    def lookup(self, user, operation, inputs):
+        """按输入查找最近一次相同计算的结果，没有时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id FROM entries WHERE user = ? AND operation = ? AND input_hash = ? '
+                'ORDER BY id DESC LIMIT 1',
+                (user, operation, input_hash(operation, inputs))).fetchone()
+        return None if row is None else self.load(row[0])
+
+    def load(self, entry_id):
+        """读取一条记录的全部结果"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT name, kind, compressed, data FROM items WHERE entry_id = ?', (entry_id,)).fetchall()
+        if not rows:
+            raise ValueError(f'历史记录不存在: {entry_id}')
+        return {name: decode_value(kind, compressed, data) for name, kind, compressed, data in rows}
+
+    def entries(self, user, operation=None, session=None, limit=100):
+        """列出最近的记录（不读取结果数据）"""
+        query = 'SELECT id, created, operation, inputs, summary, size FROM entries WHERE user = ?'
+        params = [user]
+        if operation:
+            query += ' AND operation = ?'
+            params.append(operation)
+        if session:
+            query += ' AND session = ?'
+            params.append(session)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        table = pd.DataFrame(rows, columns=['id', '时间', '操作', '输入', '摘要', '大小'])
+        table['时间'] = pd.to_datetime(table['时间'], unit='s')
+        return table
+
+    def delete(self, entry_ids):
+        """删除指定记录"""
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM entries WHERE id = ?', [(i,) for i in entry_ids])
+
+    def total_size(self):
+        """已存储结果的总字节数"""
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def _prune(self):
+        """删除超出总大小上限的最旧记录（调用方持有锁）"""
+        self._conn.execute(
+            'DELETE FROM entries WHERE id IN (SELECT id FROM '
+            '(SELECT id, SUM(size) OVER (ORDER BY id DESC) AS total FROM entries) WHERE total > ?)',
+            (self.quota,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,64 @@
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+# 图像以独立的HTTP资源发送，页面只引用URL，避免在websocket消息中内嵌base64图像
+IMAGE_ROUTE = '/images'
+# 内存中保留的图像总大小上限（字节），超出时淘汰最久未使用的图像
+IMAGE_CACHE_BYTES = 256 * 2**20
+# 图像按内容寻址，URL不变则内容不变，浏览器可长期缓存
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+class ImageStore:
+    """按内容哈希保存PNG图像的LRU缓存"""
+
+    def __init__(self, max_bytes=IMAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, image):
+        """保存图像（PNG字节或base64字符串），返回内容摘要"""
+        data = base64.b64decode(image) if isinstance(image, str) else bytes(image)
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            if digest in self._images:
+                self._images.move_to_end(digest)
+                return digest
+            self._images[digest] = data
+            self._size += len(data)
+            # 至少保留刚加入的图像
+            while self._size > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._size -= len(evicted)
+        return digest
+
+    def get(self, digest):
+        """取得图像字节，不存在时返回None"""
+        with self._lock:
+            data = self._images.get(digest)
+            if data is not None:
+                self._images.move_to_end(digest)
+            return data
+
+    def url(self, image):
+        """保存图像并返回引用它的URL"""
+        return f'{IMAGE_ROUTE}/{self.put(image)}.png'
+
+IMAGES = ImageStore()
+router = APIRouter()
+
+@router.get(IMAGE_ROUTE + '/{digest}.png')
+def image(digest: str, request: Request):
+    """发送图像，带长期缓存头；浏览器带ETag再次请求时返回304"""
+    etag = f'"{digest}"'
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+    data = IMAGES.get(digest)
+    if data is None:
+        raise HTTPException(status_code=404, detail='图像已过期，请重新计算')
+    return Response(data, media_type='image/png', headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
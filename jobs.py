@@ -0,0 +1,69 @@
+from export import capture_exports
+from utils import (
+    SingleFlight, solve_equation, solve_system_numeric, simplify_result, compute_derivative,
+    compute_integral, bootstrap_statistics, bootstrap_fit, create_fft_plot, replot_fft,
+    compute_fft_sweep, create_fft_sweep_plot, parse_range, parse_data, filter_signal_file
+)
+import time
+
+# 后台计算任务，界面（calculator.py）与HTTP接口（api.py）共用
+
+# 所有会话共享：相同输入的并发计算只执行一次
+COMPUTATIONS = SingleFlight()
+
+def solve_job(eq_str, var_str):
+    """求解并化简方程（在后台线程中运行）"""
+    return simplify_result(solve_equation(eq_str, var_str))
+
+def system_job(eq_str, var_str):
+    """数值求解方程组并记录用时（在后台线程中运行）"""
+    start = time.perf_counter()
+    result = solve_system_numeric(eq_str, var_str or None)
+    return result, time.perf_counter() - start
+
+def derivative_job(func_str, var_str):
+    """求导并化简（在后台线程中运行）"""
+    return simplify_result(compute_derivative(func_str, var_str))
+
+def integral_job(func_str, var_str, *bounds):
+    """计算并化简积分（在后台线程中运行）"""
+    return simplify_result(compute_integral(func_str, var_str, *bounds))
+
+def fft_plot_job(*args):
+    """绘制FFT图并收集可导出内容（收集依赖线程局部状态，须与绘图在同一线程）"""
+    with capture_exports() as captured:
+        img_base64 = create_fft_plot(*args)
+    return img_base64, captured
+
+def fft_sweep_job(freqs, durations, sample_rates, noise_levels, seed, x, y, metric):
+    """解析参数范围、执行傅里叶变换参数扫描并绘图，返回 ((图像, 结果表), 可导出内容)"""
+    table = compute_fft_sweep(parse_range(freqs), parse_range(durations), parse_range(sample_rates),
+                              parse_range(noise_levels), seed=seed)
+    with capture_exports() as captured:
+        img_base64 = create_fft_sweep_plot(table, x, y, metric)
+    captured.tables['参数扫描'] = table
+    return (img_base64, table), captured
+
+def captured_job(func, *args):
+    """在后台线程中绘图并收集可导出内容"""
+    with capture_exports() as captured:
+        result = func(*args)
+    return result, captured
+
+def filter_file_job(in_path, out_path, fmt, *args):
+    """滤波信号文件并写入导出路径（send_export的写出函数）"""
+    filter_signal_file(in_path, out_path, *args)
+
+def bootstrap_statistics_job(data_str, n_resamples):
+    """解析数据并计算统计量的bootstrap置信区间（后台线程中等待进程池）"""
+    return bootstrap_statistics(parse_data(data_str), n_resamples=n_resamples)
+
+def bootstrap_fit_job(x_str, y_str, degree):
+    """解析数据并计算拟合系数的bootstrap置信区间（后台线程中等待进程池）"""
+    return bootstrap_fit(parse_data(x_str), parse_data(y_str), degree)
+
+def fft_replot_job(tables):
+    """由历史记录中的数据表重新绘制FFT图"""
+    with capture_exports() as captured:
+        img_base64 = replot_fft(tables)
+    return img_base64, captured
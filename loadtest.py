@@ -0,0 +1,206 @@
+"""负载测试：模拟多个并发用户访问main.py启动的计算器
+
+每个模拟用户按权重随机选择操作（打开页面、表达式、方程、FFT、积分、统计、拟合、上传与绘图），
+操作之间按指数分布停顿，结束后报告吞吐量、各操作的延迟分位数与服务端内存。
+
+    python main.py &
+    python loadtest.py --clients 20 --duration 60
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import httpx
+
+# 默认操作组合（权重），对应各面板的常见使用比例
+DEFAULT_MIX = {
+    'page': 1, 'expression': 4, 'solve': 1, 'fft': 2, 'integral': 2,
+    'statistics': 2, 'fit': 1, 'upload': 1, 'plot': 1
+}
+LATENCY_PERCENTILES = (50, 90, 99)
+MEMORY_INTERVAL = 1.0
+
+EXPRESSIONS = ('2 + 3 * 4', 'sqrt(16) + log(10)', 'sin(pi/4)**2 + cos(pi/4)**2', '2**10 / 3', 'exp(1) * pi')
+EQUATIONS = (('x**2 - 4 = 0', 'x'), ('x + 2*y = 10, 3*x - y = 5', 'x,y'), ('exp(x) - 2 = 0', 'x'))
+INTEGRALS = (('x**2', None, None), ('sin(x)*exp(x)', None, None), ('x*cos(x)', '0', 'pi'), ('1/(1+x**2)', '0', '1'))
+CHART_TYPES = ('直方图', '核密度估计', '散点图')
+
+def parse_mix(text):
+    """解析操作组合，如 "fft=2,integral=1"，未列出的操作不执行"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'未知操作: {name}（可选: {", ".join(DEFAULT_MIX)}）')
+        mix[name] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError('操作组合为空')
+    return mix
+
+def make_table(rows, seed=0):
+    """生成上传用的CSV内容：两列数值与一列分类"""
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, 10, rows)
+    table = pd.DataFrame({'x': x, 'y': 2 * x + rng.normal(0, 1, rows), 'group': rng.choice(list('ABCD'), rows)})
+    buffer = io.StringIO()
+    table.to_csv(buffer, index=False)
+    return buffer.getvalue().encode('utf-8')
+
+class Scenario:
+    """一个模拟用户的操作序列，参数从固定集合中随机选取，使部分请求相同（与真实使用一致）"""
+
+    def __init__(self, client, rng, table_bytes):
+        self.client = client
+        self.rng = rng
+        self.table_bytes = table_bytes
+
+    def choice(self, options):
+        return options[self.rng.integers(len(options))]
+
+    async def run(self, name):
+        response = await getattr(self, name)()
+        response.raise_for_status()
+
+    async def page(self):
+        return await self.client.get('/')
+
+    async def expression(self):
+        return await self.client.post('/api/expression', json={'expr': self.choice(EXPRESSIONS)})
+
+    async def solve(self):
+        equation, variables = self.choice(EQUATIONS)
+        return await self.client.post('/api/solve', json={'equation': equation, 'variables': variables})
+
+    async def fft(self):
+        return await self.client.post('/api/fft', json={
+            'freq': float(self.rng.integers(1, 40)), 'duration': 1, 'sample_rate': float(self.choice((100, 500, 1000))),
+            'noise_level': 0.1, 'seed': int(self.rng.integers(3)), 'waveform': self.choice(('sine', 'square', 'harmonics'))})
+
+    async def integral(self):
+        function, lower, upper = self.choice(INTEGRALS)
+        return await self.client.post('/api/integral', json={'function': function, 'variable': 'x',
+                                                             'lower': lower, 'upper': upper})
+
+    async def statistics(self):
+        data = ','.join(f'{v:.4f}' for v in self.rng.normal(50, 10, 1000))
+        return await self.client.post('/api/statistics', json={'data': data})
+
+    async def fit(self):
+        x = np.arange(50.0)
+        y = 0.5 * x**2 - x + self.rng.normal(0, 5, 50)
+        return await self.client.post('/api/fit', json={
+            'x': ','.join(map(str, x)), 'y': ','.join(f'{v:.4f}' for v in y), 'degree': 2})
+
+    async def upload(self):
+        return await self.client.post('/api/table', files={'file': ('data.csv', self.table_bytes, 'text/csv')})
+
+    async def plot(self):
+        x = self.rng.normal(0, 1, 5000)
+        return await self.client.post('/api/plot', json={
+            'x': x.tolist(), 'y': (x + self.rng.normal(0, 0.5, 5000)).tolist(), 'chart_type': self.choice(CHART_TYPES)})
+
+async def simulate_client(base_url, mix, deadline, think_time, seed, table_bytes, samples, timeout, headers=None):
+    """单个模拟用户：重复选择操作直到截止时间，记录 (操作, 开始时间, 延迟, 是否成功)"""
+    rng = np.random.default_rng(seed)
+    names = list(mix)
+    weights = np.array([mix[n] for n in names], dtype=float)
+    weights /= weights.sum()
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, headers=headers) as client:
+        scenario = Scenario(client, rng, table_bytes)
+        while time.perf_counter() < deadline:
+            name = names[rng.choice(len(names), p=weights)]
+            start = time.perf_counter()
+            try:
+                await scenario.run(name)
+                ok = True
+            except (httpx.HTTPError, OSError):
+                ok = False
+            samples.append((name, start, time.perf_counter() - start, ok))
+            if think_time > 0:
+                await asyncio.sleep(rng.exponential(think_time))
+
+async def sample_memory(base_url, stop, memory, headers=None):
+    """定期读取服务端内存"""
+    async with httpx.AsyncClient(base_url=base_url, timeout=5, headers=headers) as client:
+        while not stop.is_set():
+            try:
+                memory.append((await client.get('/api/health')).json())
+            except (httpx.HTTPError, ValueError):
+                pass
+            try:
+                await asyncio.wait_for(stop.wait(), MEMORY_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+def summarize(samples, elapsed):
+    """按操作汇总请求数、失败数、吞吐量与延迟分位数（毫秒），最后一行为总计"""
+    table = pd.DataFrame(samples, columns=['操作', '开始', '延迟', '成功'])
+    if table.empty:
+        raise ValueError('没有完成任何请求')
+
+    def stats(group):
+        latency = group['延迟'].to_numpy() * 1000
+        row = {'请求数': len(group), '失败': int((~group['成功']).sum()), '吞吐(次/秒)': len(group) / elapsed}
+        row.update({f'p{p}(ms)': np.percentile(latency, p) for p in LATENCY_PERCENTILES})
+        row['最大(ms)'] = latency.max()
+        return row
+
+    rows = {name: stats(group) for name, group in table.groupby('操作', sort=True)}
+    rows['总计'] = stats(table)
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+async def run_load_test(base_url, clients=10, duration=30.0, mix=None, think_time=0.5, seed=0,
+                        upload_rows=10_000, timeout=60.0, token=None):
+    """运行负载测试，返回 (汇总表, 内存采样表)"""
+    mix = mix or DEFAULT_MIX
+    headers = {'Authorization': f'Bearer {token}'} if token else None
+    table_bytes = make_table(upload_rows, seed)
+    samples, memory = [], []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(sample_memory(base_url, stop, memory, headers))
+    start = time.perf_counter()
+    deadline = start + duration
+    seeds = np.random.SeedSequence(seed).generate_state(clients)
+    await asyncio.gather(*(simulate_client(base_url, mix, deadline, think_time, int(s), table_bytes, samples, timeout,
+                                           headers) for s in seeds))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    return summarize(samples, elapsed), pd.DataFrame(memory)
+
+def main():
+    parser = argparse.ArgumentParser(description='高级科学计算器负载测试')
+    parser.add_argument('--url', default='http://localhost:8080', help='服务地址')
+    parser.add_argument('--clients', type=int, default=10, help='并发用户数')
+    parser.add_argument('--duration', type=float, default=30, help='持续时间（秒）')
+    parser.add_argument('--mix', default=None, help='操作组合，如 "fft=2,integral=1"，默认: '
+                        + ','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items()))
+    parser.add_argument('--think', type=float, default=0.5, help='操作间平均停顿（秒），0为不停顿')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--upload-rows', type=int, default=10_000, help='上传表格的行数')
+    parser.add_argument('--json', default=None, help='结果另存为JSON文件（用于回归比较）')
+    parser.add_argument('--token', default=os.environ.get('SCICALC_API_TOKEN'),
+                        help='接口令牌，默认读取环境变量SCICALC_API_TOKEN')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix) if args.mix else None
+    print(f'🚀 {args.clients} 个并发用户，持续 {args.duration:g} 秒: {args.url}')
+    report, memory = asyncio.run(run_load_test(args.url, args.clients, args.duration, mix, args.think,
+                                               args.seed, args.upload_rows, token=args.token))
+    pd.set_option('display.width', 160)
+    print(report.round(1).to_string())
+    if not memory.empty and memory['rss_mb'].notna().any():
+        print(f'💾 服务端内存: 开始 {memory["rss_mb"].iloc[0]:.0f} MB，'
+              f'最高 {memory["rss_mb"].max():.0f} MB，结束 {memory["rss_mb"].iloc[-1]:.0f} MB')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'report': report.to_dict(orient='index'),
+                       'memory': memory.to_dict(orient='list')}, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
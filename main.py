@@ -1,7 +1,17 @@
 import signal
+import secrets
 import sys
-from nicegui import ui
+import os
+from nicegui import ui, app
 from calculator import ScientificCalculator
+from history import HistoryStore, HISTORY_PATH
+from api import router
+from export import router as export_router
+from images import router as image_router
+
+# 浏览器会话cookie的签名密钥：历史记录按浏览器区分。
+# 未设置时每次启动随机生成，重启后浏览器得到新的身份，之前的历史记录不再对应到该浏览器
+STORAGE_SECRET = os.environ.get('SCICALC_STORAGE_SECRET') or secrets.token_urlsafe(32)
 
 def signal_handler(sig, frame):
     """处理键盘中断信号"""
@@ -16,11 +26,25 @@ def main():
     ui.page_title = '高级科学计算器'
     
     try:
-        # 创建计算器实例
-        _ = ScientificCalculator()
+        # 计算历史（sqlite）在启动时打开，路径可由环境变量SCICALC_HISTORY指定
+        history = HistoryStore(HISTORY_PATH)
+        app.on_shutdown(history.close)
+        
+        @ui.page('/')
+        def index():
+            """每个浏览器页面创建独立的计算器实例"""
+            ScientificCalculator(history)
+        
+        # HTTP接口（脚本调用与负载测试）
+        app.include_router(router)
+        # 图像以URL引用，由独立的HTTP路由发送
+        app.include_router(image_router)
+        # 导出文件下载
+        app.include_router(export_router)
         
         print('🚀 高级计算器启动中...')
         print('💡 在浏览器中访问: http://localhost:8080')
+        print('🔌 HTTP接口: http://localhost:8080/api/health')
         print('⚡ 按 Ctrl+C 退出程序')
         
         # 启动应用
@@ -29,7 +53,8 @@ def main():
             reload=False, 
             port=8080,
             show=True,
-            favicon='🧮'
+            favicon='🧮',
+            storage_secret=STORAGE_SECRET
         )
     except KeyboardInterrupt:
         print('\n🛑 收到键盘中断，正在退出程序...')
@@ -0,0 +1,289 @@
+import numpy as np
+from fractions import Fraction
+from functools import lru_cache
+from math import gcd
+from scipy import signal as sps
+from scipy.fft import rfft, irfft, rfftfreq, next_fast_len
+
+# 信号源统一接口: source(t, ..., out=None)，t为时间数组（可广播），
+# out为可选的输出缓冲区，提供时结果原地写入，避免产生中间临时数组。
+
+def make_rng(seed=None):
+    """创建随机数生成器（seed为None时使用系统熵，结果不可复现）"""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+def _output(out, *arrays):
+    """按广播形状分配或检查输出缓冲区"""
+    shape = np.broadcast_shapes(*(np.shape(a) for a in arrays))
+    if out is None:
+        return np.empty(shape)
+    # 输出缓冲区可以比输入更大（如批量生成多路噪声），但必须能容纳广播结果
+    if np.broadcast_shapes(shape, out.shape) != out.shape:
+        raise ValueError(f'输出缓冲区形状{out.shape}与信号形状{shape}不兼容')
+    return out
+
+def time_axis(duration, sample_rate, out=None):
+    """生成采样时间序列"""
+    n = int(sample_rate * duration)
+    out = _output(out, np.empty(n))
+    np.divide(np.arange(n), sample_rate, out=out)
+    return out
+
+def tone(t, freq, amplitude=1.0, phase=0.0, out=None):
+    """正弦波 amplitude * sin(2πft + phase)，freq可为列向量以批量生成"""
+    out = _output(out, t, freq)
+    np.multiply(t, 2 * np.pi * np.asarray(freq, dtype=float), out=out)
+    out += phase
+    np.sin(out, out=out)
+    out *= amplitude
+    return out
+
+def multi_tone(t, freqs, amplitudes=None, phases=None, out=None):
+    """多个正弦波叠加，只使用一个临时缓冲区"""
+    freqs = np.atleast_1d(freqs)
+    amplitudes = np.ones(len(freqs)) if amplitudes is None else np.atleast_1d(amplitudes)
+    phases = np.zeros(len(freqs)) if phases is None else np.atleast_1d(phases)
+    out = _output(out, t)
+    out.fill(0)
+    scratch = np.empty_like(out)
+    for f, a, p in zip(freqs, amplitudes, phases):
+        out += tone(t, f, a, p, out=scratch)
+    return out
+
+def chirp(t, f0, f1, t1, method='linear', amplitude=1.0, out=None):
+    """扫频信号：频率在t1时刻从f0变化到f1（linear线性，exponential指数）"""
+    out = _output(out, t)
+    if method == 'linear':
+        # 相位 2π(f0·t + (f1-f0)/(2·t1)·t²)
+        np.multiply(t, (f1 - f0) / (2 * t1), out=out)
+        out += f0
+        out *= t
+    elif method == 'exponential':
+        if f0 <= 0 or f1 <= 0:
+            raise ValueError('指数扫频的频率必须为正')
+        if f0 == f1:
+            np.multiply(t, f0, out=out)
+        else:
+            # 相位 2π·f0·t1/ln(k)·(k^(t/t1) - 1)，k = f1/f0
+            k = f1 / f0
+            np.multiply(t, np.log(k) / t1, out=out)
+            np.expm1(out, out=out)
+            out *= f0 * t1 / np.log(k)
+    else:
+        raise ValueError(f'不支持的扫频方式: {method}')
+    out *= 2 * np.pi
+    np.sin(out, out=out)
+    out *= amplitude
+    return out
+
+def square(t, freq, duty=0.5, amplitude=1.0, out=None):
+    """方波：每周期前duty比例为amplitude，其余为-amplitude"""
+    out = _output(out, t, freq)
+    np.multiply(t, freq, out=out)
+    np.mod(out, 1, out=out)
+    out -= duty
+    # 相位小于duty时 -out > 0，取正幅度
+    np.negative(out, out=out)
+    np.copysign(amplitude, out, out=out)
+    return out
+
+def impulse(t, times, amplitude=1.0, out=None):
+    """冲激序列：在最接近times的采样点处取amplitude，其余为0"""
+    out = _output(out, t)
+    out.fill(0)
+    positions = np.clip(np.searchsorted(t, np.atleast_1d(times)), 0, len(t) - 1)
+    out[positions] = amplitude
+    return out
+
+def colored_noise(t, exponent=0.0, scale=1.0, seed=None, out=None):
+    """有色噪声：功率谱密度 ∝ 1/f^exponent（0白噪声，1粉红噪声，2布朗噪声）
+
+    沿最后一维生成，结果标准差为scale。seed可为整数或np.random.Generator。
+    """
+    out = _output(out, t)
+    make_rng(seed).standard_normal(out=out)
+    if exponent:
+        n = out.shape[-1]
+        spectrum = rfft(out, axis=-1)
+        freqs = rfftfreq(n)
+        spectrum[..., 0] = 0
+        spectrum[..., 1:] /= freqs[1:]**(exponent / 2)
+        out[...] = irfft(spectrum, n, axis=-1)
+        std = out.std(axis=-1, keepdims=True)
+        np.divide(out, np.where(std > 0, std, 1), out=out)
+    out *= scale
+    return out
+
+def compose(t, sources, out=None):
+    """叠加多个信号源，sources为接受 (t, out=...) 的可调用对象列表"""
+    out = _output(out, t)
+    out.fill(0)
+    scratch = np.empty_like(out)
+    for source in sources:
+        out += source(t, out=scratch)
+    return out
+
+# 滤波：逐块处理长信号（可为内存映射数组），内存占用只与块大小和滤波器长度有关。
+# 输出同样可以写入out（如np.lib.format.open_memmap创建的文件）。
+
+FILTER_BLOCK = 1 << 18
+FILTER_FAMILIES = {'fir': 'FIR (窗函数法)', 'butter': 'IIR 巴特沃斯', 'cheby1': 'IIR 切比雪夫I型', 'ellip': 'IIR 椭圆'}
+FILTER_BANDS = {'lowpass': '低通', 'highpass': '高通', 'bandpass': '带通', 'bandstop': '带阻'}
+
+def design_filter(family, band, cutoff, sample_rate, order=4):
+    """设计滤波器，返回 {'family', 'taps'}（FIR）或 {'family', 'sos'}（IIR二阶节）
+
+    cutoff为截止频率（Hz），带通/带阻为 (低, 高)；FIR的order为抽头数（高通/带阻时调整为奇数）。
+    """
+    if family not in FILTER_FAMILIES:
+        raise ValueError(f'不支持的滤波器类型: {family}')
+    if band not in FILTER_BANDS:
+        raise ValueError(f'不支持的滤波方式: {band}')
+    cutoff = np.atleast_1d(np.asarray(cutoff, dtype=float))
+    if len(cutoff) != (2 if band in ('bandpass', 'bandstop') else 1):
+        raise ValueError(f'{FILTER_BANDS[band]}滤波需要{"两个" if band in ("bandpass", "bandstop") else "一个"}截止频率')
+    if np.any(cutoff <= 0) or np.any(cutoff >= sample_rate / 2):
+        raise ValueError(f'截止频率必须在0到奈奎斯特频率{sample_rate / 2:g}Hz之间')
+    if family == 'fir':
+        numtaps = int(order)
+        if band in ('highpass', 'bandstop') and numtaps % 2 == 0:
+            numtaps += 1
+        taps = sps.firwin(numtaps, cutoff, pass_zero=band in ('lowpass', 'bandstop'), fs=sample_rate)
+        return {'family': family, 'taps': taps}
+    cutoff = cutoff if len(cutoff) == 2 else cutoff[0]
+    ripple = {'butter': {}, 'cheby1': {'rp': 1}, 'ellip': {'rp': 1, 'rs': 60}}[family]
+    sos = sps.iirfilter(int(order), cutoff, btype=band, ftype=family, output='sos', fs=sample_rate, **ripple)
+    return {'family': family, 'sos': sos}
+
+def frequency_response(design, freqs, sample_rate, zero_phase=False):
+    """滤波器在给定频率（可含负频率）处的复频率响应
+
+    FIR按居中对齐（补偿群延迟）计算；zero_phase时IIR为双向滤波的 |H|²。
+    """
+    positive = np.abs(freqs)
+    if 'taps' in design:
+        taps = design['taps']
+        _, h = sps.freqz(taps, worN=positive, fs=sample_rate)
+        h = h * np.exp(2j * np.pi * positive / sample_rate * ((len(taps) - 1) // 2))
+    else:
+        _, h = sps.sosfreqz(design['sos'], worN=positive, fs=sample_rate)
+        if zero_phase:
+            h = np.abs(h)**2
+    return np.where(freqs < 0, np.conj(h), h)
+
+def _blocks(n, block):
+    return ((start, min(start + block, n)) for start in range(0, n, block))
+
+def fft_convolve(x, taps, method='overlap-add', centered=True, out=None, block=FILTER_BLOCK):
+    """FIR滤波的分块FFT卷积（overlap-add或overlap-save），结果长度与x相同
+
+    centered时输出与输入对齐（补偿 (抽头数-1)//2 的群延迟，等同于 np.convolve(..., 'same')），
+    否则为因果输出（等同于 scipy.signal.lfilter(taps, 1, x)）。
+    """
+    if method not in ('overlap-add', 'overlap-save'):
+        raise ValueError(f'不支持的卷积方式: {method}')
+    n, m = len(x), len(taps)
+    out = _output(out, x)
+    delay = (m - 1) // 2 if centered else 0
+    nfft = next_fast_len(block + m - 1)
+    response = rfft(taps, nfft)
+    # 因果输出第i个样本写入out[i - delay]，输入末尾补delay个零以得到最后的样本
+    total = n + delay
+    carry = np.zeros(m - 1)  # overlap-add: 上一块卷积溢出的尾部；overlap-save: 上一块输入的末尾
+    for start, stop in _blocks(total, block):
+        segment = np.zeros(stop - start)
+        if start < n:
+            segment[:min(stop, n) - start] = x[start:min(stop, n)]
+        if method == 'overlap-add':
+            y = irfft(rfft(segment, nfft) * response, nfft)[:len(segment) + m - 1]
+            y[:m - 1] += carry
+            carry = y[len(segment):].copy()
+            y = y[:len(segment)]
+        else:
+            buffer = np.concatenate([carry, segment])
+            carry = buffer[len(buffer) - (m - 1):].copy()
+            y = irfft(rfft(buffer, nfft) * response, nfft)[m - 1:len(buffer)]
+        lo = max(start, delay)
+        if stop > lo:
+            out[lo - delay:stop - delay] = y[lo - start:]
+    return out
+
+def sos_filter(x, sos, zero_phase=False, out=None, block=FILTER_BLOCK, steady_state=False):
+    """IIR二阶节滤波，逐块传递滤波器状态
+
+    单向滤波默认从零初始状态开始，与 scipy.signal.sosfilt 一致；steady_state时以x[0]的稳态为初始状态，
+    消除起始处的瞬态。zero_phase时为前向-反向滤波，结果与 scipy.signal.sosfiltfilt 一致（含奇延拓边界处理），
+    反向滤波直接在out上逐块进行，额外内存只有块缓冲区和两段边界延拓。
+    """
+    n = len(x)
+    out = _output(out, x)
+    if n == 0:
+        return out
+    zi0 = sps.sosfilt_zi(sos)
+    if not zero_phase:
+        zi = zi0 * x[0] if steady_state else np.zeros_like(zi0)
+        for start, stop in _blocks(n, block):
+            out[start:stop], zi = sps.sosfilt(sos, x[start:stop], zi=zi)
+        return out
+    
+    # 与sosfiltfilt相同的奇延拓长度
+    ntaps = 2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    if n < 2:
+        raise ValueError(f'信号只有{n}个采样点，零相位滤波至少需要2个采样点')
+    pad = min(3 * ntaps, n - 1)
+    left = 2 * x[0] - x[pad:0:-1]
+    # 右侧为 x[n-2], …, x[n-1-pad]；pad=n-1时反向切片的终点会变为-1，因此先正向切片再反转
+    right = 2 * x[n - 1] - x[n - 1 - pad:n - 1][::-1]
+    # 前向
+    zi = zi0 * left[0]
+    _, zi = sps.sosfilt(sos, left, zi=zi)
+    for start, stop in _blocks(n, block):
+        out[start:stop], zi = sps.sosfilt(sos, x[start:stop], zi=zi)
+    right, zi = sps.sosfilt(sos, right, zi=zi)
+    # 反向：先处理右侧延拓，再从末尾逐块向前
+    zi = zi0 * right[-1]
+    _, zi = sps.sosfilt(sos, right[::-1], zi=zi)
+    for start, stop in _blocks(n, block):
+        lo, hi = n - stop, n - start
+        values, zi = sps.sosfilt(sos, out[lo:hi][::-1], zi=zi)
+        out[lo:hi] = values[::-1]
+    return out
+
+def apply_filter(x, design, zero_phase=True, method='overlap-add', out=None, block=FILTER_BLOCK):
+    """按设计结果滤波：FIR用分块FFT卷积（居中对齐即零相位），IIR用二阶节滤波"""
+    if 'taps' in design:
+        return fft_convolve(x, design['taps'], method, centered=zero_phase, out=out, block=block)
+    return sos_filter(x, design['sos'], zero_phase, out=out, block=block)
+
+# 有理重采样比例的最大分母：分母越大，多相滤波器越长
+RESAMPLE_MAX_DENOMINATOR = 1000
+
+def resample_ratio(sample_rate, target_rate, max_denominator=RESAMPLE_MAX_DENOMINATOR):
+    """目标采样率与原采样率之比的有理近似，返回 (up, down)"""
+    if sample_rate <= 0 or target_rate <= 0:
+        raise ValueError('采样率必须为正数')
+    ratio = Fraction(target_rate / sample_rate).limit_denominator(max_denominator)
+    if ratio == 0:
+        raise ValueError(f'重采样比例过小: {target_rate:g}/{sample_rate:g}')
+    return ratio.numerator, ratio.denominator
+
+@lru_cache(maxsize=64)
+def _resample_taps(up, down):
+    """多相重采样的抗混叠低通滤波器（与resample_poly默认设计相同），按比例缓存"""
+    max_rate = max(up, down)
+    taps = sps.firwin(20 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0))
+    taps.flags.writeable = False
+    return taps
+
+def resample(x, up, down, axis=-1):
+    """多相有理重采样，输出长度为 ceil(n * up / down)，滤波器按比例只设计一次"""
+    up, down = int(up), int(down)
+    if up < 1 or down < 1:
+        raise ValueError('重采样比例必须为正整数')
+    g = gcd(up, down)
+    up, down = up // g, down // g
+    if up == down:
+        return np.array(x, dtype=float)
+    return sps.resample_poly(np.asarray(x, dtype=float), up, down, axis=axis, window=_resample_taps(up, down))
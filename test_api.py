@@ -0,0 +1,37 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import api
+from api import router, memory_usage
+
+class TestApi:
+    """测试api.py的接口令牌与内存读取"""
+
+    def test_token(self, monkeypatch):
+        """测试设置令牌后的授权校验"""
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+        assert client.post('/api/expression', json={'expr': '2 + 3'}).json() == {'result': '5'}
+        monkeypatch.setattr(api, 'API_TOKEN', 'secret')
+        assert client.post('/api/expression', json={'expr': '2 + 3'}).status_code == 401
+        response = client.post('/api/expression', json={'expr': 'pow(9, 9**9)'},
+                               headers={'Authorization': 'Bearer secret'})
+        assert response.status_code == 400 and '结果过大' in response.json()['detail']
+
+    def test_memory_usage(self, monkeypatch):
+        """测试缺少resource模块（Windows）时仍可取得内存信息"""
+        monkeypatch.setattr(api, 'resource', None)
+        rss, peak = memory_usage()
+        assert rss is None or rss > 0
+
+    def test_table_upload_limit(self, monkeypatch):
+        """测试表格上传的大小上限"""
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+        content = b'x,y\n' + b'1,2\n' * 100
+        response = client.post('/api/table', files={'file': ('data.csv', content)})
+        assert response.status_code == 200 and response.json()['rows'] == 100
+        monkeypatch.setattr(api, 'MAX_UPLOAD_BYTES', 100)
+        response = client.post('/api/table', files={'file': ('data.csv', content)})
+        assert response.status_code == 413
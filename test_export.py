@@ -0,0 +1,95 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from export import (
+    capture_exports,
+    save_figure,
+    save_table,
+    export_path,
+    export_url,
+    prune_exports,
+    router
+)
+from utils import create_fft_plot, create_fitting_plot
+
+class TestExport:
+    """测试export.py导出功能"""
+
+    def test_capture(self):
+        """测试绘图过程中图像与数据表的收集"""
+        # 不在收集状态时不登记
+        create_fft_plot(5, 1, 100, 0.1, seed=0)
+        
+        with capture_exports() as captured:
+            create_fft_plot(5, 1, 100, 0.1, seed=0)
+        assert len(captured.figures) == 1
+        spectrum = captured.tables['FFT频谱']
+        assert len(spectrum) == 50
+        assert spectrum['频率(Hz)'][spectrum['幅度'].idxmax()] == pytest.approx(5)
+        
+        with capture_exports() as captured:
+            create_fitting_plot("1,2,3,4", "2,4,6,9", 1)
+        residuals = captured.tables['拟合残差']
+        assert residuals['残差'].sum() == pytest.approx(0, abs=1e-9)
+
+    def test_save_figure(self):
+        """测试图像导出为不同格式与分辨率"""
+        with capture_exports() as captured:
+            create_fft_plot(5, 1, 100, 0.1, seed=0)
+        headers = {'png': b'\x89PNG', 'svg': b'<?xml', 'pdf': b'%PDF'}
+        for fmt, header in headers.items():
+            path = save_figure(captured.figure, export_path('test', fmt), fmt)
+            with open(path, 'rb') as f:
+                assert f.read(len(header)) == header
+        
+        low = os.path.getsize(save_figure(captured.figure, export_path('test', 'png'), 'png', 100))
+        high = os.path.getsize(save_figure(captured.figure, export_path('test', 'png'), 'png', 300))
+        assert high > 2 * low
+        with pytest.raises(ValueError, match="不支持的图像格式"):
+            save_figure(captured.figure, export_path('test', 'gif'), 'gif')
+
+    def test_save_table(self):
+        """测试数据表导出"""
+        df = pd.DataFrame({'x': [1, 2, 3], '名称': ['a', 'bb', 'c'], 'y': [0.5, np.nan, 2.0]})
+        
+        path = save_table(df, export_path('test', 'csv'), 'csv')
+        pd.testing.assert_frame_equal(pd.read_csv(path, encoding='utf-8-sig'), df)
+        
+        # NPY为结构化数组，无需pickle即可读取
+        array = np.load(save_table(df, export_path('test', 'npy'), 'npy'), allow_pickle=False)
+        assert array['名称'].tolist() == ['a', 'bb', 'c']
+        assert array['y'][2] == 2.0
+        
+        # 有名称的索引作为列导出
+        stats = pd.DataFrame({'估计值': [1.0, 2.0]}, index=pd.Index(['均值', '中位数'], name='统计量'))
+        assert list(pd.read_csv(save_table(stats, export_path('test', 'csv')), encoding='utf-8-sig')) == ['统计量', '估计值']
+        
+        with pytest.raises(ValueError, match="不支持的数据格式"):
+            save_table(df, export_path('test', 'xlsx'), 'xlsx')
+
+    def test_download(self):
+        """测试导出文件下载一次后删除及超时清理"""
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+        path = export_path('结果', 'csv')
+        save_table(pd.DataFrame({'x': [1, 2]}), path, 'csv')
+        url = export_url(path, '结果.csv')
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/csv')
+        assert 'filename*=utf-8\'\'%E7%BB%93%E6%9E%9C.csv' in response.headers['content-disposition']
+        assert not os.path.exists(path)
+        assert client.get(url).status_code == 404
+        # 路径穿越的文件名只在导出目录中查找
+        assert client.get('/exports/..%2Fexport.py').status_code == 404
+        
+        stale = export_path('stale', 'csv')
+        os.utime(stale, (0, 0))
+        fresh = export_path('fresh', 'csv')
+        assert not os.path.exists(stale) and os.path.exists(fresh)
+        prune_exports(max_age=-1)
+        assert not os.path.exists(fresh)
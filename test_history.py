@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import sympy as sp
+from history import HistoryStore, encode_value, decode_value
+from utils import simplify_result, compute_integral
+
+class TestHistory:
+    """测试history.py计算历史存储"""
+
+    def test_encode(self):
+        """测试各类结果的序列化与还原"""
+        x = sp.Symbol('x')
+        signal = np.random.default_rng(0).standard_normal(1000)
+        kind, compressed, data = encode_value(signal)
+        assert kind == 'npy' and len(data) < signal.nbytes + 200
+        assert np.array_equal(decode_value(kind, compressed, data), signal)
+
+        # 符号结果以srepr保存，容器结构保持不变
+        solution = [x - 1, {x: sp.Rational(1, 3)}]
+        kind, compressed, data = encode_value(solution)
+        assert kind == 'sympy' and decode_value(kind, compressed, data) == solution
+
+        table = pd.DataFrame({'阶段': ['原始', 'cancel'], '用时(s)': [0.0, 0.5]})
+        restored = decode_value(*encode_value(table))
+        assert list(restored.columns) == ['阶段', '用时(s)'] and list(restored['阶段']) == ['原始', 'cancel']
+
+        # 长文本压缩存储
+        kind, compressed, data = encode_value({'text': 'a' * 1000, 'value': np.float64(1.5)})
+        assert compressed and decode_value(kind, compressed, data) == {'text': 'a' * 1000, 'value': 1.5}
+
+    def test_record_lookup(self, tmp_path):
+        """测试按用户与输入查找、列表筛选"""
+        store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+        simplified = simplify_result(compute_integral('x**2', 'x'))
+        key = ('integral', 'x**2', 'x')
+        store.record('alice', 's1', 'integral', key, simplified, str(simplified['result']))
+        store.record('alice', 's2', 'expression', ('expression', '1+1'), {'result': 2}, '2')
+
+        stored = store.lookup('alice', 'integral', key)
+        assert stored['result'] == simplified['result'] and stored['cse'] is None
+        assert list(stored['report']['阶段']) == list(simplified['report']['阶段'])
+        assert store.lookup('bob', 'integral', key) is None
+        assert store.lookup('alice', 'integral', ('integral', 'x**3', 'x')) is None
+
+        assert len(store.entries('alice')) == 2
+        assert list(store.entries('alice', operation='expression')['摘要']) == ['2']
+        assert len(store.entries('alice', session='s1')) == 1
+
+        # 重新打开数据库后记录仍在
+        store.close()
+        store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+        assert store.lookup('alice', 'expression', ('expression', '1+1')) == {'result': 2}
+        store.close()
+
+    def test_prune(self, tmp_path):
+        """测试超过大小上限时删除最旧的记录"""
+        store = HistoryStore(str(tmp_path / 'history.sqlite3'), quota=50_000)
+        rng = np.random.default_rng(0)
+        for i in range(10):
+            store.record('alice', 's1', 'fft', ('fft', i), {'signal': rng.standard_normal(1000)})
+        assert store.total_size() <= 50_000
+        ids = list(store.entries('alice')['id'])
+        assert len(ids) == 6 and ids[0] == 10
+        assert store.lookup('alice', 'fft', ('fft', 0)) is None
+        assert store.lookup('alice', 'fft', ('fft', 9))['signal'].shape == (1000,)
+
+        store.delete([10])
+        assert len(store.entries('alice')) == 5
+        store.close()
@@ -0,0 +1,39 @@
+import base64
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import images
+from images import ImageStore, router
+
+class TestImages:
+    """测试images.py图像资源缓存与路由"""
+
+    def test_store(self):
+        """测试按内容寻址与LRU淘汰"""
+        store = ImageStore(max_bytes=250)
+        first = store.put(b'a' * 100)
+        # base64字符串与字节内容相同时得到同一摘要
+        assert store.put(base64.b64encode(b'a' * 100).decode()) == first
+        assert store.url(b'a' * 100) == f'/images/{first}.png'
+        second = store.put(b'b' * 100)
+        store.get(first)  # 访问后first变为最近使用
+        third = store.put(b'c' * 100)
+        assert store.get(second) is None
+        assert store.get(first) == b'a' * 100 and store.get(third) == b'c' * 100
+        # 超过上限的单张图像仍然保留
+        large = store.put(b'd' * 1000)
+        assert store.get(large) is not None and store.get(first) is None
+
+    def test_route(self, monkeypatch):
+        """测试图像路由的缓存头、304与404"""
+        store = ImageStore()
+        monkeypatch.setattr(images, 'IMAGES', store)
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+        url = store.url(b'\x89PNG test')
+        response = client.get(url)
+        assert response.status_code == 200 and response.content == b'\x89PNG test'
+        assert response.headers['content-type'] == 'image/png'
+        assert 'immutable' in response.headers['cache-control']
+        assert client.get(url, headers={'If-None-Match': response.headers['etag']}).status_code == 304
+        assert client.get('/images/0000.png').status_code == 404
@@ -0,0 +1,35 @@
+import io
+import pytest
+import pandas as pd
+from loadtest import parse_mix, make_table, summarize, DEFAULT_MIX
+
+class TestLoadTest:
+    """测试loadtest.py负载测试的配置解析与结果汇总"""
+
+    def test_parse_mix(self):
+        """测试操作组合解析"""
+        assert parse_mix('fft=2, integral') == {'fft': 2.0, 'integral': 1.0}
+        assert set(parse_mix(','.join(DEFAULT_MIX))) == set(DEFAULT_MIX)
+        with pytest.raises(ValueError):
+            parse_mix('unknown=1')
+        with pytest.raises(ValueError):
+            parse_mix('fft=0')
+
+    def test_make_table(self):
+        """测试上传数据生成"""
+        table = pd.read_csv(io.BytesIO(make_table(100)))
+        assert table.shape == (100, 3) and list(table.columns) == ['x', 'y', 'group']
+        assert make_table(100) == make_table(100)
+
+    def test_summarize(self):
+        """测试延迟分位数与吞吐量汇总"""
+        samples = [('fft', 0.0, 0.1 * (i + 1), True) for i in range(10)]
+        samples += [('expression', 0.0, 0.01, i % 2 == 0) for i in range(10)]
+        report = summarize(samples, elapsed=10.0)
+        assert list(report.index) == ['expression', 'fft', '总计']
+        assert report.loc['fft', '请求数'] == 10 and report.loc['expression', '失败'] == 5
+        assert report.loc['总计', '吞吐(次/秒)'] == pytest.approx(2.0)
+        assert report.loc['fft', 'p50(ms)'] == pytest.approx(550)
+        assert report.loc['fft', '最大(ms)'] == pytest.approx(1000)
+        with pytest.raises(ValueError):
+            summarize([], elapsed=1.0)
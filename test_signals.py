@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+from scipy import signal as sps
+import signals
+from signals import (
+    time_axis,
+    tone,
+    multi_tone,
+    chirp,
+    square,
+    impulse,
+    colored_noise,
+    compose,
+    design_filter,
+    fft_convolve,
+    sos_filter,
+    apply_filter
+)
+
+class TestSignals:
+    """测试signals.py信号生成库"""
+
+    def test_sources(self):
+        """测试各信号源与参考实现一致"""
+        t = time_axis(1, 1000)
+        assert len(t) == 1000
+        assert tone(t, 5, 2, 0.3) == pytest.approx(2 * np.sin(2 * np.pi * 5 * t + 0.3))
+        assert multi_tone(t, [5, 10], [1, 0.5]) == pytest.approx(
+            np.sin(2 * np.pi * 5 * t) + 0.5 * np.sin(2 * np.pi * 10 * t))
+        assert chirp(t, 1, 10, 1) == pytest.approx(sps.chirp(t, 1, 1, 10, phi=-90), abs=1e-9)
+        assert chirp(t, 1, 10, 1, 'exponential') == pytest.approx(
+            sps.chirp(t, 1, 1, 10, method='logarithmic', phi=-90), abs=1e-9)
+        assert np.mean(square(t, 5, 0.3) > 0) == pytest.approx(0.3, abs=0.01)
+        assert impulse(t, [0.1, 0.5]).nonzero()[0].tolist() == [100, 500]
+        with pytest.raises(ValueError):
+            chirp(t, 1, 10, 1, 'cubic')
+
+    def test_in_place_and_batch(self):
+        """测试原地输出缓冲区与批量生成"""
+        t = time_axis(1, 100)
+        buf = np.empty_like(t)
+        assert tone(t, 5, out=buf) is buf
+        batch = tone(t, np.array([[1.0], [2.0], [3.0]]))
+        assert batch.shape == (3, 100)
+        assert batch[2] == pytest.approx(tone(t, 3))
+        with pytest.raises(ValueError):
+            tone(t, 5, out=np.empty(50))
+        
+        mixed = compose(t, [lambda t, out: tone(t, 5, out=out),
+                            lambda t, out: colored_noise(t, scale=0.1, seed=0, out=out)])
+        assert mixed == pytest.approx(tone(t, 5) + colored_noise(t, scale=0.1, seed=0))
+
+    def test_colored_noise(self):
+        """测试噪声的可复现性与功率谱斜率"""
+        t = np.empty(2**16)
+        assert np.array_equal(colored_noise(t, seed=1), colored_noise(t, seed=1))
+        assert not np.array_equal(colored_noise(t, seed=1), colored_noise(t, seed=2))
+        rng = signals.make_rng(0)
+        assert rng is signals.make_rng(rng)
+        
+        pink = colored_noise(t, 1, scale=2, seed=1)
+        assert pink.std() == pytest.approx(2)
+        f, p = sps.welch(pink)
+        slope = np.polyfit(np.log(f[5:1000]), np.log(p[5:1000]), 1)[0]
+        assert slope == pytest.approx(-1, abs=0.1)
+
+    def test_filters(self):
+        """测试分块FFT卷积与分块二阶节滤波与scipy参考实现一致"""
+        x = np.random.default_rng(0).normal(size=5000)
+        taps = design_filter('fir', 'lowpass', 10, 100, 31)['taps']
+        for method in ('overlap-add', 'overlap-save'):
+            assert fft_convolve(x, taps, method, centered=False, block=256) == pytest.approx(sps.lfilter(taps, 1, x))
+            assert fft_convolve(x, taps, method, block=256) == pytest.approx(np.convolve(x, taps, 'same'))
+        sos = design_filter('butter', 'bandpass', (5, 20), 100)['sos']
+        # 单向滤波默认为零初始状态，steady_state时以x[0]的稳态开始
+        assert sos_filter(x, sos, block=333) == pytest.approx(sps.sosfilt(sos, x))
+        steady = sps.sosfilt(sos, x, zi=sps.sosfilt_zi(sos) * x[0])[0]
+        assert sos_filter(x, sos, block=333, steady_state=True) == pytest.approx(steady)
+        assert sos_filter(x, sos, zero_phase=True, block=333) == pytest.approx(sps.sosfiltfilt(sos, x))
+        # 延拓长度等于n-1的短信号
+        short = x[:28]
+        assert sos_filter(short, sos, zero_phase=True) == pytest.approx(sps.sosfiltfilt(sos, short))
+        # 过短的信号给出明确的错误
+        with pytest.raises(ValueError, match='至少需要2个采样点'):
+            sos_filter(x[:1], sos, zero_phase=True)
+        assert sos_filter(x[:1], sos) == pytest.approx(sps.sosfilt(sos, x[:1]))
+        out = np.empty_like(x)
+        assert apply_filter(x, {'family': 'ellip', 'sos': sos}, out=out) is out
+        with pytest.raises(ValueError):
+            design_filter('fir', 'bandpass', 10, 100)
+        with pytest.raises(ValueError):
+            design_filter('butter', 'lowpass', 60, 100)
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
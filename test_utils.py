@@ -1,20 +1,63 @@
+import os
+import threading
+import time
 import pytest
 import numpy as np
 import sympy as sp
+import pandas as pd
 import matplotlib.pyplot as plt
 from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
 from utils import (
     safe_eval,
+    ExpressionEvaluator,
+    SingleFlight,
+    normalize_expression,
+    normalize_equations,
     solve_equation,
+    solve_system_numeric,
     compute_derivative,
     compute_integral,
+    parse_expression,
+    simplify_result,
+    adaptive_sample,
+    lambdify_expression,
+    compile_kernel,
+    create_function_plot,
     compute_statistics,
+    save_upload,
+    read_table,
+    ColumnStore,
+    compute_table_statistics,
+    correlation_matrix,
+    lag_correlation,
+    bootstrap_statistics,
+    bootstrap_fit,
     curve_fitting,
+    fit_curve,
+    select_model,
+    OnlinePolyFit,
+    create_model_selection_plot,
+    InterpolantCache,
+    interpolate,
+    parse_ratio,
+    resample_data,
     compute_fft,
+    compute_fft_sweep,
+    parse_range,
+    create_fft_sweep_plot,
     create_fft_plot,
     create_fitting_plot,
     create_visualization_plot,
-    plot_to_base64
+    kde_fft,
+    box_statistics,
+    plot_to_base64,
+    parse_matrix,
+    load_matrix,
+    matrix_operation,
+    matrix_table,
+    compile_ode,
+    solve_ode
 )
 
 class TestCoreFunctions:
@@ -29,6 +72,60 @@ class TestCoreFunctions:
         with pytest.raises(ValueError, match="计算错误"):
             safe_eval("__import__('os').system('ls')")
 
+    def test_incremental_eval(self):
+        """测试增量表达式求值"""
+        evaluator = ExpressionEvaluator()
+        for expr in ["2+3*4", "sin(np.pi/2) + log(e**2)", "2^3 + 3^2", "np.linspace(0, 1, 5).sum()", "1 < 2"]:
+            assert evaluator.evaluate(expr) == pytest.approx(safe_eval(expr))
+        
+        # 逐字输入时复用已求值的子表达式：只有新增的 "+ 1" 部分需要计算
+        evaluator = ExpressionEvaluator()
+        evaluator.evaluate("sin(1.5) * cos(2)")
+        misses = evaluator.misses
+        assert evaluator.evaluate("sin(1.5) * cos(2) + 1") == pytest.approx(np.sin(1.5) * np.cos(2) + 1)
+        assert (evaluator.hits, evaluator.misses - misses) == (1, 2)
+        # 模幂不受位数限制
+        assert evaluator.evaluate("pow(9, 9**9, 7)") == pow(9, 9**9, 7)
+        # 限制按结果大小：较大但可算的幂与平凡底数不受影响
+        assert safe_eval("2**100000") == 2**100000
+        assert safe_eval("1**(10**12)") == 1 and safe_eval("(-1)**(10**12 + 1)") == -1
+        assert evaluator.evaluate("0**(10**12)") == 0
+        # 随机数不缓存
+        assert evaluator.evaluate("np.random.rand()") != evaluator.evaluate("np.random.rand()")
+        
+        for expr, message in [("().__class__", "不允许访问属性"), ("9**9**9", "结果过大"),
+                              ("pow(9, 9**9)", "结果过大"), ("9**9**9 if 1 else 0", "结果过大"),
+                              ("x + 1", "not defined"), ("2 +", "计算错误")]:
+            with pytest.raises(ValueError, match=message):
+                evaluator.evaluate(expr)
+
+    def test_single_flight(self):
+        """测试相同并发计算的合并"""
+        calls = []
+        release = threading.Event()
+        
+        def job(value):
+            calls.append(value)
+            release.wait(5)
+            return value * 2
+        
+        flights = SingleFlight(max_workers=4)
+        first = flights.submit(('job', 1), job, 1)
+        second = flights.submit(('job', 1), job, 1)
+        other = flights.submit(('job', 2), job, 2)
+        assert first is second and first is not other
+        release.set()
+        assert (first.result(), second.result(), other.result()) == (2, 2, 4)
+        assert sorted(calls) == [1, 2] and flights.shared == 1
+        
+        # 完成后的相同请求重新计算
+        assert flights.submit(('job', 1), job, 1).result() == 2
+        assert len(calls) == 3
+        
+        # 等价输入得到相同的键
+        assert normalize_expression("x^2 + 1") == normalize_expression("1+x**2")
+        assert normalize_equations("x + y = 5, x - y = 1") == normalize_equations("y+x=5 , x-y=1")
+
     # 2. 方程求解测试（修正版）
     def test_solve_equation(self):
         """测试方程求解功能"""
@@ -41,6 +138,34 @@ class TestCoreFunctions:
         sol = solve_equation("x + y - 5, x - y - 1", "x,y")
         assert str(sol) == "{x: 3, y: 2}"       
 
+    def test_solve_system_numeric(self):
+        """测试大型方程组数值求解"""
+        # 三对角线性方程组：组装为稀疏矩阵求解
+        n = 300
+        lines = [f"2*x{i} - x{i+1} = 1" if i == 0 else
+                 f"-x{i-1} + 2*x{i} = 1" if i == n - 1 else
+                 f"-x{i-1} + 2*x{i} - x{i+1} = 1" for i in range(n)]
+        res = solve_system_numeric("\n".join(lines))
+        assert 'spsolve' in res['method']
+        values = np.array(list(res['solution'].values()))
+        i = np.array([int(str(v)[1:]) for v in res['solution']]) + 1
+        assert values == pytest.approx(i * (n + 1 - i) / 2)
+        
+        # 超定方程组用最小二乘
+        res = solve_system_numeric("x = 1; x = 3")
+        assert 'lsqr' in res['method']
+        assert res['solution'][sp.Symbol('x')] == pytest.approx(2)
+        
+        # 非线性方程组
+        res = solve_system_numeric("x**2 + y**2 = 4, x*y = 1", "x,y", x0=[2, 0.5])
+        x, y = res['solution'].values()
+        assert x**2 + y**2 == pytest.approx(4) and x * y == pytest.approx(1)
+        
+        with pytest.raises(ValueError, match="未声明的符号"):
+            solve_system_numeric("x**2 + a = 1", "x")
+        with pytest.raises(ValueError, match="未收敛"):
+            solve_system_numeric("x**2 = -1", "x")
+
     # 3. 傅里叶变换测试
     def test_fft(self):
         """测试FFT计算"""
@@ -48,7 +173,42 @@ class TestCoreFunctions:
         assert len(t) == 100
         assert len(signal) == 100
         assert np.argmax(np.abs(yf[:50])) == 5
+        
+        # 固定种子结果可复现并被缓存
+        first = compute_fft(5, 1, 100, 0.5, seed=7)
+        assert compute_fft(5, 1, 100, 0.5, seed=7) is first
+        assert not first[1].flags.writeable
+        for waveform in ("square", "harmonics", "chirp"):
+            _, _, _, yf = compute_fft(5, 1, 100, 0.1, seed=0, waveform=waveform, noise_exponent=1)
+            assert np.argmax(np.abs(yf[:50])) >= 5
     
+    def test_fft_sweep(self):
+        """测试批量参数扫描"""
+        assert parse_range("0:1:0.25").tolist() == [0, 0.25, 0.5, 0.75, 1]
+        assert parse_range("1, 2, 5").tolist() == [1, 2, 5]
+        
+        table = compute_fft_sweep(parse_range("1:20:0.5"), [1, 2], [100], [0, 0.5], seed=0)
+        assert len(table) == 39 * 2 * 2
+        # 整周期信号无泄漏，峰值频率准确
+        exact = table[(table["频率"] == 5) & (table["噪声水平"] == 0)]
+        assert (exact["峰值频率"] == 5).all()
+        assert (exact["频谱泄漏"] < 1e-12).all()
+        # 非整周期信号产生泄漏
+        leaky = table[(table["频率"] == 5.5) & (table["持续时间"] == 1) & (table["噪声水平"] == 0)]
+        assert (leaky["频谱泄漏"] > 0.05).all()
+        noisy = table[table["噪声水平"] == 0.5]
+        assert np.isfinite(noisy["SNR(dB)"]).all()
+        # 固定种子可复现
+        again = compute_fft_sweep(parse_range("1:20:0.5"), [1, 2], [100], [0, 0.5], seed=0)
+        assert again.equals(table)
+        
+        assert len(create_fft_sweep_plot(table)) > 1000
+        # 取值个数与总采样点数有上限
+        with pytest.raises(ValueError, match="超过"):
+            parse_range("0:1e9:1")
+        with pytest.raises(ValueError, match="上限"):
+            compute_fft_sweep(parse_range("1:100:1"), [100], [1000], parse_range("0:1:0.1"))
+
     # 4. 微积分测试
     def test_calculus(self):
         """测试微积分功能"""
@@ -59,6 +219,86 @@ class TestCoreFunctions:
         # 定积分
         assert compute_integral("sin(x)", "x", "0", "pi/2") == pytest.approx(1)
 
+    def test_simplify_result(self):
+        """测试符号结果化简流水线"""
+        x = sp.Symbol('x')
+        # 共享解析：同一输入只解析一次，e为自然常数且不破坏exp
+        assert parse_expression("exp(x) + e^x") is parse_expression("exp(x) + e^x")
+        assert str(compute_derivative("exp(x) + e^x", "x")) == "2*exp(x)"
+        
+        out = simplify_result((x**2 - 1)/(x - 1) + sp.sin(x)**2 + sp.cos(x)**2)
+        assert out['result'] == x + 2
+        assert list(out['report']['阶段']) == ['原始结果', 'cancel', 'trigsimp', 'nsimplify', 'cse']
+        
+        # 浮点解识别为精确常数，结构（列表）保持不变
+        out = simplify_result(solve_equation("x**2 - 0.5 = 0", "x"))
+        assert sorted(out['result'], key=float) == [-sp.sqrt(2)/2, sp.sqrt(2)/2]
+        
+        # 超时的阶段被放弃，结果仍然可用
+        big = sp.expand((x + sp.sin(x) + 1)**30) / (x + 1)
+        out = simplify_result(big, budgets={'cancel': 0.01, 'trigsimp': 0.01})
+        assert '超时' in set(out['report']['状态'])
+        assert out['result'] == big
+        
+        # 耗时的化简不阻塞其他请求
+        with ThreadPoolExecutor(2) as executor:
+            slow = executor.submit(simplify_result, big, {'cancel': 3, 'trigsimp': 3})
+            time.sleep(0.5)
+            start = time.perf_counter()
+            assert simplify_result(x**2 - x*x + x)['result'] == x
+            assert time.perf_counter() - start < 2.5
+            slow.result()
+
+    def test_function_plot(self, monkeypatch):
+        """测试自适应采样与函数绘图"""
+        x = sp.Symbol("x")
+        f = lambdify_expression(sp.sin(x), "x")
+        assert lambdify_expression(sp.sin(x), "x") is f  # 缓存命中
+        xs, ys, evaluations = adaptive_sample(f, -10, 10)
+        dense = np.linspace(-10, 10, 20001)
+        assert np.max(np.abs(np.interp(dense, xs, ys) - np.sin(dense))) < 0.01
+        assert evaluations < 1000
+        
+        # 间断点处断开曲线
+        _, ys, _ = adaptive_sample(lambdify_expression(1 / x, "x"), -1, 1.3)
+        assert np.isnan(ys).any()
+        # 采样点用尽但连续的区间不断开
+        _, ys, _ = adaptive_sample(lambdify_expression(sp.sin(50 * x), "x"), -10, 10)
+        assert not np.isnan(ys).any()
+        _, ys, _ = adaptive_sample(lambdify_expression(sp.floor(x), "x"), -3, 3.2)
+        assert np.isnan(ys).sum() == 6
+        
+        img, evaluations = create_function_plot("exp(-x^2)", "x", -3, 3)
+        assert len(img) > 1000
+        assert set(evaluations) == {"f", "df", "integral"}
+        # 上下限可为符号表达式
+        assert len(create_function_plot("sin(x)", "x", "0", "pi")[0]) > 1000
+        with pytest.raises(ValueError, match="函数绘图错误"):
+            create_function_plot("x**2", "x", 1, 0)
+        with pytest.raises(ValueError, match="未定义的变量: a"):
+            create_function_plot("a*x", "x")
+        # 符号积分超时时改用数值积分
+        monkeypatch.setattr("utils.ANTIDERIVATIVE_TIMEOUT", 0.01)
+        _, evaluations = create_function_plot("1/(x**5 + x + 1)", "x", 0, 3)
+        assert evaluations["integral"] == 0
+
+    def test_numeric_kernel(self):
+        """测试符号结果导出的数值内核"""
+        derivative = compute_derivative("sin(x)**2*cos(x)**2 + sin(x)**2", "x")
+        kernel = compile_kernel(derivative, ["x"])
+        assert compile_kernel(derivative, ["x"]) is kernel  # 按表达式缓存
+        assert "x0" in kernel.source  # 公共子表达式消除
+        xs = np.linspace(0, 10, 3000)
+        expected = sp.lambdify(sp.Symbol("x"), derivative)(xs)
+        assert kernel(xs, chunk_size=1000) == pytest.approx(expected)
+        
+        # 方程组的解与常数结果
+        solution = solve_equation("x + y - 5, x - y - 1", "x,y")
+        assert compile_kernel(solution)() == pytest.approx((3, 2))
+        assert compile_kernel(sp.Integer(2), ["x"])(np.arange(4)).tolist() == [2, 2, 2, 2]
+        with pytest.raises(ValueError, match="数值内核生成错误"):
+            compile_kernel(derivative, ["x"], backend="fortran")
+
     # 5. 统计分析测试
     def test_statistics(self):
         """测试统计分析功能"""
@@ -68,6 +308,98 @@ class TestCoreFunctions:
         with pytest.raises(ValueError):
             compute_statistics("")
 
+    def test_read_table(self, tmp_path):
+        """测试上传文件流式保存与分块读取"""
+        df = pd.DataFrame({'x': np.arange(12000.0), 'y': np.where(np.arange(12000) % 7, 1.5, np.nan),
+                           'label': ['a', 'b', 'c'] * 4000})
+        df.to_csv(tmp_path / 'data.csv', index=False)
+        df.to_excel(tmp_path / 'data.xlsx', index=False)
+        
+        for name in ('data.csv', 'data.xlsx'):
+            with open(tmp_path / name, 'rb') as source:
+                path = save_upload(source, suffix=os.path.splitext(name)[1], chunk_size=4096)
+            progress = []
+            loaded = read_table(path, progress.append)
+            pd.testing.assert_frame_equal(loaded, df, check_dtype=False)
+            assert progress == sorted(progress) and progress[-1] == 1.0
+            
+            # 取消后中止读取
+            cancel = threading.Event()
+            cancel.set()
+            with pytest.raises(ValueError, match="已取消"):
+                read_table(path, cancel=cancel)
+            os.remove(path)
+        
+        with pytest.raises(ValueError, match="不支持的文件格式"):
+            read_table(str(tmp_path / 'data.txt'))
+
+    def test_column_store(self):
+        """测试列式数据缓存"""
+        df = pd.DataFrame({'n': [1, 2, 3], 'f': [1.5, None, 2.5], 's': ['x', '4', None]})
+        store = ColumnStore(df)
+        assert store.null_count('f') == 1
+        assert store.text('n') == "1, 2, 3"
+        assert store.text('f', numeric=True) == "1.5, 2.5"
+        assert store.numeric('s').tolist() == [4.0]
+        assert list(store.values('s')) == ['x', '4']
+        
+        # 无空值的float64列直接返回底层数据的只读视图，重复选择命中缓存
+        big = pd.DataFrame({'x': np.random.default_rng(0).random(1000)})
+        store = ColumnStore(big)
+        values = store.numeric('x')
+        assert np.shares_memory(values, big['x'].to_numpy())
+        assert not values.flags.writeable
+        assert store.numeric('x') is values
+
+    def test_table_statistics(self):
+        """测试多列与分组统计"""
+        df = pd.DataFrame({
+            "组": list("ab" * 10),
+            "x": np.arange(20.0),
+            "y": np.r_[np.arange(19.0)**2, np.nan],
+            "备注": ["-"] * 20,
+        })
+        table = compute_table_statistics(df, percentiles=(10, 90))
+        assert list(table.index) == ["x", "y"]
+        single = compute_statistics(",".join(map(str, df["x"])))
+        for key in ("mean", "median", "std", "var", "min", "max"):
+            assert table.loc["x", key] == pytest.approx(single[key])
+        assert table.loc["x", "skew"] == pytest.approx(0)
+        assert table.loc["x", "kurtosis"] == pytest.approx(-1.206015, rel=1e-6)
+        assert table.loc["y", "count"] == 19
+        assert table.loc["x", "p90"] == pytest.approx(np.percentile(df["x"], 90))
+        # 重复的百分位数只计算一次，结果按数值对应
+        dup = compute_table_statistics(df, percentiles=(50, 50, 75))
+        assert [c for c in dup.columns if c.startswith("p")] == ["p50", "p75"]
+        assert dup.loc["x", "p75"] == pytest.approx(np.percentile(df["x"], 75))
+        
+        grouped = compute_table_statistics(df, group_by="组")
+        assert grouped.loc[("a", "x"), "mean"] == 9
+        assert grouped.loc[("b", "y"), "count"] == 9
+        with pytest.raises(ValueError, match="统计计算错误"):
+            compute_table_statistics(df, group_by="不存在")
+
+    def test_bootstrap(self):
+        """测试bootstrap置信区间的覆盖与可复现性"""
+        rng = np.random.default_rng(0)
+        data = rng.normal(10, 2, size=500)
+        table = bootstrap_statistics(data, percentiles=(25,), n_resamples=1200, n_workers=1)
+        assert list(table.index) == ["mean", "median", "std", "p25"]
+        assert (table["下限"] <= table["估计值"]).all()
+        assert (table["估计值"] <= table["上限"]).all()
+        assert table.loc["mean", "标准误"] == pytest.approx(2 / np.sqrt(500), rel=0.15)
+        
+        # 结果与进程数和内存预算无关
+        parallel = bootstrap_statistics(data, percentiles=(25,), n_resamples=1200, n_workers=2, max_memory_mb=1)
+        assert np.array_equal(table.to_numpy(), parallel.to_numpy())
+        
+        x = np.linspace(0, 5, 200)
+        y = 2 * x**2 - x + 1 + rng.normal(scale=0.5, size=x.size)
+        fit_table = bootstrap_fit(x, y, 2, n_resamples=500, n_workers=1)
+        assert list(fit_table.index) == ["x^2", "x^1", "x^0", "R²"]
+        assert fit_table.loc["x^2", "下限"] < 2 < fit_table.loc["x^2", "上限"]
+        assert fit_table.loc["R²", "上限"] <= 1
+
     # 6. 曲线拟合测试
     def test_curve_fitting(self):
         """测试曲线拟合"""
@@ -96,6 +428,278 @@ class TestCoreFunctions:
         fit_img, _, _ = create_fitting_plot("1,2,3", "2,4,6", 1)
         assert len(fit_img) > 1000
 
+    def test_binned_charts(self):
+        """测试基于分箱聚合的图表"""
+        rng = np.random.default_rng(0)
+        y = rng.normal(size=100000)
+        
+        # FFT核密度估计：积分为1，峰值接近标准正态密度
+        grid, density = kde_fft(y)
+        assert np.trapezoid(density, grid) == pytest.approx(1, abs=1e-3)
+        assert density.max() == pytest.approx(1 / np.sqrt(2 * np.pi), rel=0.03)
+        
+        stats = box_statistics([1, 2, 3, 4, 100])
+        assert stats['med'] == 3 and stats['whishi'] == 4
+        assert stats['fliers'].tolist() == [100]
+        
+        for chart in ['直方图', '二维密度图', '核密度估计', '箱线图']:
+            assert create_visualization_plot(y + rng.normal(size=len(y)), y, chart).startswith("iVBOR")
+        assert create_visualization_plot(np.array(['a', 'b'] * 50), y[:100], '箱线图').startswith("iVBOR")
+        with pytest.raises(ValueError, match="核密度估计至少需要2个数据点"):
+            create_visualization_plot(None, [1.0], '核密度估计')
+
+    # 8. 加权与稳健拟合测试
+    def test_weighted_robust_fitting(self):
+        """测试加权、稳健损失与自定义模型拟合"""
+        x = np.linspace(0, 10, 200)
+        y = 3 * x + 1
+        y_outlier = y.copy()
+        y_outlier[::20] += 50
+        
+        # 权重为0的点不影响拟合
+        weights = np.where(y_outlier != y, 0.0, 1.0)
+        fit = fit_curve(x, y_outlier, 1, weights=weights)
+        assert fit['model'].coeffs == pytest.approx([3, 1])
+        
+        # Huber损失抑制离群点
+        plain = fit_curve(x, y_outlier, 1)
+        fit = fit_curve(x, y_outlier, 1, loss='huber')
+        assert fit['model'].coeffs == pytest.approx([3, 1], abs=0.05)
+        assert abs(fit['model'](0) - 1) < abs(plain['model'](0) - 1) / 10
+        
+        # 高次多项式自动使用正交基
+        fit = fit_curve(x, np.sin(x), 12)
+        assert fit['basis'] == 'chebyshev'
+        assert fit['r_squared'] > 0.9999
+        
+        # 自定义模型表达式
+        fit = fit_curve(x, 2 * np.exp(-0.5 * x) + 1, model='a*exp(-b*x) + c')
+        assert fit['params']['a'] == pytest.approx(2, rel=1e-4)
+        assert fit['params']['b'] == pytest.approx(0.5, rel=1e-4)
+        assert fit['params']['c'] == pytest.approx(1, rel=1e-4)
+        with pytest.raises(ValueError, match="拟合错误"):
+            fit_curve(x, y, model='2*x')
+
+    # 9. 自动模型选择测试
+    def test_model_selection(self):
+        """测试次数扫描与模型族选择"""
+        rng = np.random.default_rng(0)
+        x = np.linspace(-3, 3, 200)
+        y = x**3 - 2 * x + rng.normal(scale=0.5, size=x.size)
+        for criterion in ("cv", "aic", "bic"):
+            table, best = select_model(x, y, max_degree=8, criterion=criterion)
+            assert best == ("poly", 3)
+            assert len(table) == 8
+        
+        # 共享QR分解的R²与逐次拟合一致
+        table, _ = select_model(x, y, max_degree=4, criterion="aic")
+        r2 = dict(zip(table["模型"], table["R²"]))
+        _, r2_direct, _, _ = curve_fitting(",".join(map(str, x)), ",".join(map(str, y)), 2)
+        assert r2["2次多项式"] == pytest.approx(r2_direct)
+        
+        # 模型族参与排序
+        x = np.linspace(0, 4, 100)
+        table, best = select_model(x, 2 * np.exp(0.8 * x) + 1, max_degree=3, families=("a*exp(b*x) + c",))
+        assert best == ("expr", "a*exp(b*x) + c")
+        
+        img, table, fit = create_model_selection_plot("1,2,3,4,5,6", "1,4,9,16,25,36", 3)
+        assert len(img) > 1000
+        assert fit["r_squared"] > 0.999
+        
+        # 小样本时最高次数受每折训练集大小限制
+        x = np.arange(10.0)
+        table, best = select_model(x, x**2, max_degree=8)
+        assert len(table) == 7 and best == ("poly", 2)
+        _, table, _ = create_model_selection_plot("1,2,3,4,5,6", "1,4,9,16,25,36", 8)
+        assert len(table) == 3
+
+    # 10. 在线拟合测试
+    def test_online_fitting(self):
+        """测试增量拟合与一次性拟合结果一致"""
+        rng = np.random.default_rng(0)
+        x = np.linspace(100, 110, 1000)
+        y = 0.5 * (x - 105)**3 + x + rng.normal(size=x.size)
+        fitter = OnlinePolyFit(3)
+        # 首批数据范围很小，后续数据不断扩展范围
+        for i in range(0, len(x), 7):
+            fitter.update(x[i:i + 7], y[i:i + 7])
+        
+        ref = fit_curve(x, y, 3)
+        assert fitter.n == len(x)
+        assert fitter.predict(x) == pytest.approx(ref["predict"](x), abs=1e-8)
+        assert fitter.r_squared() == pytest.approx(ref["r_squared"])
+        assert fitter.poly()(105.5) == pytest.approx(ref["model"](105.5), rel=1e-6)
+        
+        with pytest.raises(ValueError):
+            OnlinePolyFit(3).update([1, 2], [1, 2]).coefficients()
+        
+        # y有很大的偏移量时R²不受抵消误差影响
+        x = np.linspace(0, 100, 2000)
+        for offset in (1e9, 1e10):
+            y = offset + 0.5 * x + rng.normal(size=x.size)
+            fitter = OnlinePolyFit(1)
+            for i in range(0, len(x), 13):
+                fitter.update(x[i:i + 13], y[i:i + 13])
+            assert fitter.r_squared() == pytest.approx(fit_curve(x, y, 1)["r_squared"], abs=1e-6)
+            assert fitter.r_squared() < 1
+
+    def test_matrix_operations(self, tmp_path):
+        """测试线性代数运算：精确/数值路径、批量与文件读取"""
+        a = parse_matrix("[2 1; 1 3]")
+        assert a.shape == (2, 2)
+        assert parse_matrix("1,2\n3,4\n\n5,6\n7,8").shape == (2, 2, 2)
+        with pytest.raises(ValueError):
+            parse_matrix("1 2\n3")
+        
+        # 小规模整数矩阵精确计算
+        exact = matrix_operation('inv', a)
+        assert exact['method'] == 'SymPy精确计算'
+        assert exact['results']['逆矩阵'] == sp.Matrix([[sp.Rational(3, 5), sp.Rational(-1, 5)], [sp.Rational(-1, 5), sp.Rational(2, 5)]])
+        assert matrix_operation('det', a)['results']['行列式'] == 5
+        assert matrix_operation('det', a, exact=False)['results']['行列式'] == pytest.approx(5)
+        with pytest.raises(ValueError, match="方阵"):
+            matrix_operation('det', parse_matrix("1 2 3; 4 5 6"))
+        # 精确计算时小数按有理数处理，不截断为整数
+        assert matrix_operation('det', [[0.5, 1], [1, 0.5]], exact=True)['results']['行列式'] == sp.Rational(-3, 4)
+        with pytest.raises(ValueError, match="批量"):
+            matrix_operation('det', np.ones((2, 2, 2)), exact=True)
+        # 列不满秩的整数最小二乘自动改用数值计算（最小范数解）
+        deficient = matrix_operation('lstsq', [[1, 1], [2, 2], [3, 3]], [1, 2, 3])
+        assert deficient['method'].startswith('LAPACK') and deficient['results']['解'] == pytest.approx([0.5, 0.5])
+        
+        # 批量运算：多线程分批与整体计算结果一致
+        rng = np.random.default_rng(0)
+        batch = rng.standard_normal((20, 8, 8))
+        rhs = rng.standard_normal(8)
+        split = matrix_operation('solve', batch, rhs, threads=3)
+        whole = matrix_operation('solve', batch, rhs)
+        assert split['batch'] == 20 and '3 线程分批' in split['method']
+        assert np.allclose(split['results']['解'], whole['results']['解'])
+        assert np.allclose(np.einsum('bij,bj->bi', batch, split['results']['解']), rhs)
+        
+        # 对称矩阵使用eigh，特征值为实数
+        sym = batch + np.swapaxes(batch, 1, 2)
+        eig = matrix_operation('eig', sym)
+        assert 'eigh' in eig['method'] and eig['results']['特征值'].dtype == float
+        assert np.allclose(eig['results']['特征值'], np.linalg.eigvalsh(sym))
+        # 整数小矩阵的特征分解默认仍为数值结果，指定时才精确计算
+        small = np.array([[2, 1, 0, 3], [1, 0, 4, 1], [0, 5, 1, 2], [3, 1, 2, 7]])
+        assert matrix_operation('eig', small)['method'].startswith('LAPACK')
+        assert matrix_operation('eig', small, exact=True)['method'] == 'SymPy精确计算'
+        
+        # 最小二乘与SVD
+        x = np.linspace(0, 1, 30)
+        design = np.column_stack([np.ones_like(x), x])
+        fit = matrix_operation('lstsq', design, 1 + 2 * x)
+        assert fit['results']['解'] == pytest.approx([1, 2])
+        assert matrix_operation('svd', design)['results']['奇异值'] == pytest.approx(np.linalg.svd(design, compute_uv=False))
+        
+        # .npy文件以内存映射方式读取
+        path = str(tmp_path / 'batch.npy')
+        np.save(path, batch)
+        loaded = load_matrix(path)
+        assert isinstance(loaded, np.memmap) and loaded.shape == (20, 8, 8)
+        table = matrix_table(matrix_operation('inv', loaded)['results']['逆矩阵'])
+        assert table.shape == (160, 9) and list(table['批次'][:9]) == [0] * 8 + [1]
+
+    def test_solve_ode(self):
+        """测试常微分方程解析、编译与逐步求解"""
+        # 高阶方程自动降阶，参数定义与dx/dt写法
+        system = compile_ode("w = 2\nx'' = -w**2 * x")
+        assert system.names == ['x', "x'"]
+        assert system.rhs(0, np.array([[1.0, 2.0], [0.0, 0.0]])).shape == (2, 2)
+        assert system.jac(0, np.array([1.0, 0.0])) == pytest.approx(np.array([[0, 1], [-4, 0]]))
+        assert compile_ode("w = 2\nx'' = -w**2 * x") is system
+        
+        result = solve_ode("dx/dt = y; dy/dt = -x", "y=0, x=1", (0, 2 * np.pi), n_points=500)
+        assert result['y'].shape == (2, 500) and result['t'][-1] == pytest.approx(2 * np.pi)
+        assert result['y'][0] == pytest.approx(np.cos(result['t']), abs=1e-5)
+        
+        # 刚性问题使用解析雅可比矩阵
+        updates = []
+        stiff = solve_ode("x' = -1000*(x - cos(t))", "0", (0, 10), method='BDF',
+                          progress=lambda fraction, t, y: updates.append((fraction, len(t))))
+        assert stiff['njev'] > 0 and stiff['y'][0, -1] == pytest.approx(np.cos(10), abs=1e-2)
+        assert updates[-1] == (1.0, 2000)
+        
+        cancel = threading.Event()
+        cancel.set()
+        with pytest.raises(ValueError, match="已取消"):
+            solve_ode("x' = -x", "1", (0, 1), cancel=cancel)
+        with pytest.raises(ValueError, match="未定义的符号"):
+            solve_ode("x' = k*x", "1", (0, 1))
+        with pytest.raises(ValueError, match="初值"):
+            solve_ode("x' = y; y' = -x", "1", (0, 1))
+
+    def test_interpolation(self):
+        """测试插值模型缓存、分块求值与有理重采样"""
+        x = np.array([3.0, 0.0, 1.0, 2.0, 1.0])
+        y = x**2
+        cache = InterpolantCache(maxsize=2)
+        model = cache.get(x, y, 'cubic')
+        # 相同内容的数据命中缓存，重复的x取平均
+        assert cache.get(x.copy(), y.copy(), 'cubic') is model
+        assert model.x == pytest.approx([0, 1, 2, 3])
+        assert model(np.array([0.5, 2.5])) == pytest.approx([0.25, 6.25])
+        grid = np.linspace(0, 3, 1001)
+        assert model(grid, chunk_size=100) == pytest.approx(model(grid))
+        assert np.isnan(model([-1.0])[0]) and model([4.0], extrapolate=True)[0] == pytest.approx(16)
+        cache.get(x, y, 'linear')
+        cache.get(x, y, 'pchip')
+        assert cache.get(x, y, 'cubic') is not model
+        
+        # PCHIP保持单调，各方法均通过数据点
+        step = np.array([0, 0, 1, 1, 1.0])
+        values = interpolate(np.arange(5.0), step, np.linspace(0, 4, 401), 'pchip')
+        assert values.min() >= 0 and values.max() <= 1
+        for method in ('linear', 'cubic', 'pchip', 'akima'):
+            assert interpolate(np.arange(5.0), step, np.arange(5.0), method) == pytest.approx(step)
+        with pytest.raises(ValueError, match="插值"):
+            interpolate([1, 1], [2, 3], [1], 'cubic')
+        
+        assert parse_ratio('3/2') == (3, 2) and parse_ratio('0.5') == (1, 2)
+        t = np.arange(100) / 100
+        t_new, s_new = resample_data(t, np.sin(2 * np.pi * t), 3, 2)
+        assert len(s_new) == 150 and t_new[1] == pytest.approx(1 / 150)
+        assert s_new[20:130] == pytest.approx(np.sin(2 * np.pi * t_new[20:130]), abs=1e-2)
+        with pytest.raises(ValueError, match="等间距"):
+            resample_data([0, 1, 3], [1, 2, 3], 2, 1)
+
+    def test_correlation(self):
+        """测试相关矩阵与FFT滞后相关"""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.normal(size=(500, 3)), columns=['a', 'b', 'c'])
+        df['d'] = np.exp(df['a'])
+        df['label'] = 'x'
+        numeric = df.drop(columns='label')
+        assert correlation_matrix(df).to_numpy() == pytest.approx(numeric.corr().to_numpy())
+        spearman = correlation_matrix(df, 'spearman')
+        assert spearman.to_numpy() == pytest.approx(numeric.corr('spearman').to_numpy())
+        assert spearman.loc['a', 'd'] == pytest.approx(1)
+        # 含空值的行整体去除，常数列为NaN
+        df.loc[0, 'b'] = np.nan
+        df['e'] = 1.0
+        corr = correlation_matrix(df)
+        assert corr.loc['a', 'c'] == pytest.approx(df.iloc[1:][['a', 'c']].corr().iloc[0, 1])
+        assert np.isnan(corr.loc['e', 'a'])
+        # 单一数值块的表格（to_numpy可能返回只读视图）
+        assert correlation_matrix(numeric[['a', 'c']]).iloc[0, 1] == pytest.approx(corr.loc['a', 'c'], abs=0.01)
+        with pytest.raises(ValueError, match="两个数值列"):
+            correlation_matrix(df[['a', 'label']])
+        
+        # 与直接按定义计算的结果一致，互相关峰值位于真实延迟处
+        x = rng.normal(size=300)
+        y = np.roll(x, 5) + 0.1 * rng.normal(size=300)
+        lags, values = lag_correlation(y, x, max_lag=10)
+        assert list(lags) == list(range(-10, 11)) and lags[np.argmax(values)] == 5
+        xc, yc = x - x.mean(), y - y.mean()
+        direct = [np.sum(yc[k:] * xc[:300 - k]) for k in range(11)]
+        assert values[10:] == pytest.approx(np.array(direct) / (300 * x.std() * y.std()))
+        lags, values = lag_correlation(x)
+        assert len(lags) == 599 and values[lags == 0][0] == pytest.approx(1)
+        with pytest.raises(ValueError, match="常数"):
+            lag_correlation(np.ones(10))
+
 
  
   
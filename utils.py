@@ -1,40 +1,261 @@
 import numpy as np
 import sympy as sp
+import matplotlib
+# 图像在后台线程中绘制并编码为PNG，只使用非交互后端，避免在非主线程创建GUI窗口
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from scipy.fft import fft, fftfreq
+from scipy.fft import fft, fftfreq, rfft, irfft, rfftfreq
+from scipy.optimize import least_squares, root
+from scipy import sparse
+from scipy.sparse.linalg import spsolve, lsqr
+from scipy.linalg import qr, solve_triangular
+import scipy.linalg
+from scipy.special import comb
+from scipy.stats import rankdata
+from scipy.signal import correlate, correlation_lags
+from scipy.interpolate import make_interp_spline, CubicSpline, PchipInterpolator, Akima1DInterpolator
+from scipy.integrate import cumulative_trapezoid, RK23, RK45, DOP853, Radau, BDF, LSODA
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+from contextlib import nullcontext
+from collections import OrderedDict
+from itertools import product
+from fractions import Fraction
+import pandas as pd
+import signals
+from export import record_figure, record_table
+import inspect
+import ast
+import operator
+import multiprocessing
+import signal
+import threading
+import time
+import math
+import hashlib
+import re
+import tempfile
+import os
 import io
 import base64
 
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
 # 设置全局绘图参数
 plt.rcParams['font.family'] = ['Microsoft YaHei', 'DejaVu Sans', 'Arial']
 plt.rcParams['axes.unicode_minus'] = False
 plt.rcParams['figure.facecolor'] = 'white'
 plt.rcParams['axes.facecolor'] = 'white'
 
+# 整数幂运算结果允许的最大位数（约4×10^6位，1秒内可算完），防止 9**9**9 之类的长时间计算
+MAX_INT_BITS = 1 << 22
+
+def guarded_pow(base, exponent, modulus=None):
+    """按结果的位数限制整数幂（如9**9**9）；底数为0、±1时结果平凡，模幂的结果不超过模数，均直接计算"""
+    if (modulus is None and type(base) is int and type(exponent) is int
+            and exponent > 0 and abs(base) > 1):
+        if exponent * math.log2(abs(base)) > MAX_INT_BITS:
+            raise ValueError('结果过大')
+    return pow(base, exponent) if modulus is None else pow(base, exponent, modulus)
+
+# 表达式求值允许使用的名称
+SAFE_NAMES = {
+    'np': np, 
+    'sin': np.sin, 
+    'cos': np.cos, 
+    'tan': np.tan, 
+    'sqrt': np.sqrt,
+    'log': np.log,
+    'exp': np.exp,
+    'pi': np.pi,
+    'e': np.e,
+    'abs': abs,
+    'pow': guarded_pow
+}
+
+class _GuardPow(ast.NodeTransformer):
+    """将 a**b 改写为受限的 pow(a, b)"""
+    
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(ast.Call(ast.Name('pow', ast.Load()), [node.left, node.right], []), node)
+        return node
+
 def safe_eval(expr):
     """安全评估数学表达式"""
     # 替换常见的数学符号
     expr = expr.replace('^', '**').replace('π', 'pi')
     
     try:
-        # 安全地评估表达式
-        result = eval(expr, {'__builtins__': None}, {
-            'np': np, 
-            'sin': np.sin, 
-            'cos': np.cos, 
-            'tan': np.tan, 
-            'sqrt': np.sqrt,
-            'log': np.log,
-            'exp': np.exp,
-            'pi': np.pi,
-            'e': np.e,
-            'abs': abs,
-            'pow': pow
-        })
+        # 幂运算改为受限的pow后再求值
+        tree = ast.fix_missing_locations(_GuardPow().visit(ast.parse(expr.strip(), mode='eval')))
+        result = eval(compile(tree, '<expr>', 'eval'), {'__builtins__': None}, SAFE_NAMES)
         return result
     except Exception as e:
         raise ValueError(f'计算错误: {str(e)}')
 
+# 子表达式缓存的条目数
+SUBEXPR_CACHE_SIZE = 1024
+
+_BINARY_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: guarded_pow, ast.MatMult: operator.matmul,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+class _Unsupported(Exception):
+    """求值器不支持的语法，交给safe_eval处理"""
+
+class ExpressionEvaluator:
+    """增量表达式求值器
+    
+    按AST子树（忽略空白与位置）缓存求值结果，输入逐字修改时未改变的子表达式直接复用；
+    含np.random的子树不缓存。不支持的语法整体交给safe_eval。
+    """
+    
+    def __init__(self, cache_size=SUBEXPR_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def evaluate(self, expr):
+        """求值表达式，错误信息与safe_eval一致"""
+        source = expr.replace('^', '**').replace('π', 'pi').strip()
+        try:
+            tree = ast.parse(source, mode='eval')
+            return self._eval(tree.body)
+        except _Unsupported:
+            return safe_eval(expr)
+        except SyntaxError as e:
+            raise ValueError(f'计算错误: {e.msg}')
+        except ValueError as e:
+            if str(e).startswith('计算错误'):
+                raise
+            raise ValueError(f'计算错误: {str(e)}')
+        except Exception as e:
+            raise ValueError(f'计算错误: {str(e)}')
+    
+    def _eval(self, node):
+        key = ast.dump(node)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+        value = self._compute(node)
+        self.misses += 1
+        if self._cacheable(value) and "attr='random'" not in key:
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            with self._lock:
+                self._cache[key] = value
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return value
+    
+    @staticmethod
+    def _cacheable(value):
+        if isinstance(value, np.ndarray):
+            return value.dtype.kind in 'biufc' and value.size <= KERNEL_CHUNK
+        return isinstance(value, (int, float, complex, np.number, np.bool_))
+    
+    def _compute(self, node):
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id not in SAFE_NAMES:
+                raise ValueError(f"name '{node.id}' is not defined")
+            return SAFE_NAMES[node.id]
+        if isinstance(node, ast.Attribute):
+            if node.attr.startswith('_'):
+                raise ValueError(f'不允许访问属性 {node.attr}')
+            return getattr(self._eval(node.value), node.attr)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            return _BINARY_OPS[type(node.op)](self._eval(node.left), self._eval(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+            return _UNARY_OPS[type(node.op)](self._eval(node.operand))
+        if isinstance(node, ast.Call) and not any(isinstance(a, ast.Starred) for a in node.args):
+            if any(k.arg is None for k in node.keywords):
+                raise _Unsupported()
+            func = self._eval(node.func)
+            args = [self._eval(a) for a in node.args]
+            kwargs = {k.arg: self._eval(k.value) for k in node.keywords}
+            return func(*args, **kwargs)
+        if isinstance(node, (ast.Tuple, ast.List)):
+            items = [self._eval(item) for item in node.elts]
+            return tuple(items) if isinstance(node, ast.Tuple) else items
+        raise _Unsupported()
+
+@lru_cache(maxsize=256)
+def parse_expression(expr_str):
+    """解析表达式字符串（带缓存，同一输入只解析一次），e为自然常数"""
+    expr_str = expr_str.strip().replace('^', '**').replace('π', 'pi')
+    return sp.sympify(expr_str, locals={'e': sp.E})
+
+def normalize_expression(expr_str):
+    """表达式的规范形式，用于判断两次输入是否等价；无法解析时退回去除空白的原文"""
+    try:
+        return sp.srepr(parse_expression(expr_str))
+    except Exception:
+        return re.sub(r'\s+', '', expr_str)
+
+def normalize_equations(eq_str):
+    """方程组的规范形式：逐个方程、逐侧规范化"""
+    return tuple(tuple(normalize_expression(side) for side in part.split('='))
+                 for part in eq_str.split(','))
+
+class SingleFlight:
+    """合并相同的并发计算
+    
+    同一键的计算在完成前只提交一次，后续请求直接拿到同一个Future，所有调用方共享结果；
+    计算完成后键即被移除，之后的请求重新计算。
+    """
+    
+    def __init__(self, max_workers=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='single_flight')
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.shared = 0  # 被合并的请求数
+    
+    def submit(self, key, func, *args):
+        """提交计算，返回concurrent.futures.Future"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.shared += 1
+                return future
+            future = self._executor.submit(func, *args)
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+    
+    def inflight(self):
+        """进行中的计算数"""
+        with self._lock:
+            return len(self._inflight)
+    
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
 def solve_equation(eq_str, var_str):
     """求解方程"""
     try:
@@ -44,15 +265,11 @@ def solve_equation(eq_str, var_str):
         # 处理方程
         equations = []
         for part in eq_str.split(','):
-            part = part.strip()
-            # 替换常见符号
-            part = part.replace('^', '**').replace('π', 'pi').replace('e', 'E')
-            
             if '=' in part:
                 lhs, rhs = part.split('=')
-                equations.append(sp.Eq(sp.sympify(lhs.strip()), sp.sympify(rhs.strip())))
+                equations.append(sp.Eq(parse_expression(lhs), parse_expression(rhs)))
             else:
-                equations.append(sp.sympify(part.strip()))
+                equations.append(parse_expression(part))
         
         # 求解方程
         if len(equations) == 1 and len(variables) == 1:
@@ -66,15 +283,167 @@ def solve_equation(eq_str, var_str):
     except Exception as e:
         raise ValueError(f'方程求解错误: {str(e)}')
 
-def compute_fft(freq, duration, sample_rate, noise_level):
-    """计算傅里叶变换"""
+# 非线性方程组变量数不超过该值时用稠密雅可比矩阵调用scipy.optimize.root，
+# 更大的方程组改用稀疏雅可比矩阵的信赖域最小二乘
+DENSE_JACOBIAN_LIMIT = 300
+
+def split_equations(text):
+    """拆分方程组文本：含换行或分号时按其拆分，否则按逗号拆分"""
+    separator = r'[;\n]' if re.search(r'[;\n]', text) else ','
+    return [part.strip() for part in re.split(separator, text) if part.strip() and not part.strip().startswith('#')]
+
+def parse_system(eq_str, var_str=None):
+    """解析方程组，返回 (lhs - rhs 表达式列表, 变量列表)
+    
+    var_str为空时按名称排序使用全部自由符号。
+    """
+    equations = split_equations(eq_str)
+    if var_str:
+        variables = [sp.Symbol(v.strip()) for v in var_str.split(',') if v.strip()]
+    else:
+        variables = None
+    # 预先创建符号表，大型方程组解析时复用同一批符号对象
+    names = {v.name: v for v in variables or []}
+    names['e'] = sp.E
+    
+    exprs = []
+    for part in equations:
+        part = part.replace('^', '**').replace('π', 'pi')
+        if '=' in part:
+            lhs, rhs = part.split('=')
+            part = f'({lhs}) - ({rhs})'
+        exprs.append(sp.sympify(part, locals=names))
+    if variables is None:
+        variables = sorted(set().union(*(e.free_symbols for e in exprs)), key=lambda s: s.name)
+    return exprs, variables
+
+def _linear_system(exprs, variables):
+    """若方程组关于变量线性，组装稀疏矩阵 A 和向量 b（A·x = b），否则返回None"""
+    index = {v: j for j, v in enumerate(variables)}
+    rows, cols, data = [], [], []
+    b = np.zeros(len(exprs))
+    for i, expr in enumerate(exprs):
+        terms = expr.as_coefficients_dict()
+        # 只有形如 c·x 的项时无需展开
+        if any(term != 1 and term not in index for term in terms):
+            terms = sp.expand(expr).as_coefficients_dict()
+        for term, coeff in terms.items():
+            if term == 1:
+                b[i] = -float(coeff)
+            elif term in index:
+                rows.append(i)
+                cols.append(index[term])
+                data.append(float(coeff))
+            else:
+                return None
+    A = sparse.csr_matrix((data, (rows, cols)), shape=(len(exprs), len(variables)))
+    return A, b
+
+def solve_system_numeric(eq_str, var_str=None, x0=None):
+    """数值求解大型方程组
+    
+    线性方程组组装为SciPy稀疏矩阵，方阵用spsolve，非方阵或奇异时用lsqr最小二乘；
+    非线性方程组自动生成稀疏雅可比矩阵，用scipy.optimize.root（大型方程组用least_squares）。
+    返回 {'solution': {变量: 值}, 'method': 方法, 'residual': 残差范数}。
+    """
+    try:
+        exprs, variables = parse_system(eq_str, var_str)
+        if not variables:
+            raise ValueError('方程组中没有变量')
+        n = len(variables)
+        
+        linear = _linear_system(exprs, variables)
+        if linear is not None:
+            A, b = linear
+            x = None
+            if A.shape[0] == A.shape[1]:
+                with np.errstate(all='ignore'):
+                    x = spsolve(A.tocsc(), b)
+                method = '稀疏LU (spsolve)'
+            if x is None or not np.all(np.isfinite(x)):
+                x = lsqr(A, b, atol=1e-12, btol=1e-12)[0]
+                method = '稀疏最小二乘 (lsqr)'
+            residual = np.linalg.norm(A @ x - b)
+        else:
+            extra = set().union(*(e.free_symbols for e in exprs)) - set(variables)
+            if extra:
+                raise ValueError(f'存在未声明的符号: {", ".join(sorted(s.name for s in extra))}')
+            # 残差函数与雅可比矩阵非零元各生成一次
+            residuals = sp.lambdify(variables, exprs, modules=['numpy', 'scipy'])
+            index = {v: j for j, v in enumerate(variables)}
+            rows, cols, entries = [], [], []
+            for i, expr in enumerate(exprs):
+                # 逐项求导，只对含该变量的项调用diff，大型稀疏方程组快数倍
+                terms = expr.args if expr.is_Add else (expr,)
+                for symbol in expr.free_symbols:
+                    rows.append(i)
+                    cols.append(index[symbol])
+                    entries.append(sp.Add(*[t.diff(symbol) for t in terms if t.has(symbol)]))
+            jac_values = sp.lambdify(variables, entries, modules=['numpy', 'scipy'])
+            shape = (len(exprs), n)
+            
+            def fun(x):
+                return np.asarray(residuals(*x), dtype=float)
+            
+            def jac(x):
+                values = np.broadcast_to(np.asarray(jac_values(*x), dtype=float), (len(entries),))
+                return sparse.csr_matrix((values, (rows, cols)), shape=shape)
+            
+            x0 = np.ones(n) if x0 is None else np.broadcast_to(np.asarray(x0, dtype=float), (n,))
+            if len(exprs) == n and n <= DENSE_JACOBIAN_LIMIT:
+                result = root(fun, x0, jac=lambda x: jac(x).toarray(), method='hybr')
+                method = '非线性求根 (root/hybr)'
+            else:
+                result = least_squares(fun, x0, jac=jac, method='trf', tr_solver='lsmr', xtol=1e-12, ftol=1e-12)
+                method = '稀疏信赖域最小二乘 (least_squares)'
+            x = result.x
+            residual = np.linalg.norm(fun(x))
+            if not np.isfinite(residual) or residual > 1e-6 * max(1.0, np.linalg.norm(x)):
+                raise ValueError(f'未收敛 (残差 {residual:.3g})，请尝试其他初值')
+        
+        return {
+            'solution': dict(zip(variables, x.tolist())),
+            'method': method,
+            'residual': float(residual),
+        }
+    except Exception as e:
+        raise ValueError(f'方程求解错误: {str(e)}')
+
+# 傅里叶变换面板可选的波形与噪声颜色（功率谱指数）
+WAVEFORMS = {
+    'sine': '正弦波',
+    'square': '方波',
+    'harmonics': '谐波叠加',
+    'chirp': '线性扫频 (f→2f)',
+}
+NOISE_COLORS = {0: '白噪声', 1: '粉红噪声', 2: '布朗噪声'}
+
+def compute_fft(freq, duration, sample_rate, noise_level, seed=None, waveform='sine', noise_exponent=0):
+    """计算傅里叶变换
+    
+    seed为None时噪声不可复现；给定seed时结果确定，并按参数缓存（返回只读数组）。
+    """
+    if waveform not in WAVEFORMS:
+        raise ValueError(f'不支持的波形: {waveform}')
+    if seed is not None:
+        return _compute_fft_cached(freq, duration, sample_rate, noise_level, seed, waveform, noise_exponent)
+    return _compute_fft(freq, duration, sample_rate, noise_level, seed, waveform, noise_exponent)
+
+def _compute_fft(freq, duration, sample_rate, noise_level, seed, waveform, noise_exponent):
+    """生成含噪信号并计算FFT"""
     # 生成时间序列
-    t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
+    t = signals.time_axis(duration, sample_rate)
     
-    # 生成信号 (正弦波 + 噪声)
-    signal = np.sin(2 * np.pi * freq * t)
-    noise = noise_level * np.random.normal(size=t.size)
-    signal += noise
+    # 生成信号，噪声写入缓冲区后原地叠加
+    if waveform == 'square':
+        signal = signals.square(t, freq)
+    elif waveform == 'harmonics':
+        signal = signals.multi_tone(t, [freq, 2 * freq, 3 * freq], [1, 0.5, 0.25])
+    elif waveform == 'chirp':
+        signal = signals.chirp(t, freq, 2 * freq, duration)
+    else:
+        signal = signals.tone(t, freq)
+    signal += signals.colored_noise(t, noise_exponent, scale=noise_level, seed=seed)
     
     # 计算FFT
     yf = fft(signal)
@@ -82,13 +451,106 @@ def compute_fft(freq, duration, sample_rate, noise_level):
     
     return t, signal, xf, yf
 
+@lru_cache(maxsize=32)
+def _compute_fft_cached(*args):
+    """固定种子的FFT结果缓存"""
+    result = _compute_fft(*args)
+    for arr in result:
+        arr.flags.writeable = False
+    return result
+
+# 参数范围的最多取值个数，与参数扫描的总采样点数上限（含噪与无噪信号合计）
+MAX_RANGE_POINTS = 10_000
+MAX_SWEEP_SAMPLES = 2 * 10**7
+
+def parse_range(range_str):
+    """解析参数范围：'起点:终点:步长'（含终点）或逗号分隔的数值列表"""
+    try:
+        range_str = range_str.strip()
+        if ':' in range_str:
+            parts = [float(p) for p in range_str.split(':')]
+            if len(parts) != 3 or parts[2] <= 0:
+                raise ValueError('范围格式应为 起点:终点:步长，且步长为正')
+            start, stop, step = parts
+            if (stop - start) / step + 1 > MAX_RANGE_POINTS:
+                raise ValueError(f'范围内的取值超过{MAX_RANGE_POINTS}个')
+            return np.arange(start, stop + step / 2, step)
+        return parse_data(range_str)
+    except Exception as e:
+        raise ValueError(f'范围解析错误: {str(e)}')
+
+# 参数扫描结果表的列名
+SWEEP_PARAMS = ('频率', '持续时间', '采样率', '噪声水平')
+SWEEP_METRICS = ('峰值频率', '频率误差', 'SNR(dB)', '频谱泄漏')
+
+def compute_fft_sweep(freqs, durations, sample_rates, noise_levels, seed=0):
+    """傅里叶变换参数扫描
+    
+    采样点数相同（持续时间和采样率相同）的配置组成一个二维数组，
+    含噪信号与无噪信号一起用一次批量rfft变换，
+    报告峰值频率、信噪比（主瓣功率/其余功率）和频谱泄漏（无噪信号主瓣外功率占比）。
+    """
+    try:
+        n_configs = np.size(freqs) * np.size(noise_levels)
+        total = sum(2 * n_configs * int(sample_rate * duration)
+                    for duration, sample_rate in product(np.atleast_1d(durations), np.atleast_1d(sample_rates)))
+        if total > MAX_SWEEP_SAMPLES:
+            raise ValueError(f'扫描的总采样点数{total}超过上限{MAX_SWEEP_SAMPLES}，请减少配置数或缩短信号')
+        rng = signals.make_rng(seed)
+        rows = []
+        for duration, sample_rate in product(np.atleast_1d(durations), np.atleast_1d(sample_rates)):
+            n = int(sample_rate * duration)
+            if n < 4:
+                raise ValueError(f'持续时间{duration}秒、采样率{sample_rate}Hz的采样点太少')
+            configs = np.array(list(product(np.atleast_1d(freqs), np.atleast_1d(noise_levels))), dtype=float)
+            f, noise = configs[:, :1], configs[:, 1:]
+            t = signals.time_axis(duration, sample_rate)
+            
+            # 上半部分为含噪信号，下半部分为无噪信号，一起做一次批量FFT
+            batch = np.empty((2 * len(configs), n))
+            noisy, clean = batch[:len(configs)], batch[len(configs):]
+            signals.tone(t, f, out=clean)
+            signals.colored_noise(t, seed=rng, out=noisy)
+            noisy *= noise
+            noisy += clean
+            power = np.abs(rfft(batch, axis=1))**2
+            power[:, 0] = 0  # 忽略直流分量
+            noisy_power, clean_power = power[:len(configs)], power[len(configs):]
+            xf = rfftfreq(n, 1 / sample_rate)
+            
+            # 主瓣取峰值两侧各一个频点
+            peak = np.argmax(noisy_power, axis=1)
+            offsets = np.arange(-1, 2)
+            lobe = np.clip(peak[:, None] + offsets, 0, power.shape[1] - 1)
+            rows_idx = np.arange(len(configs))[:, None]
+            signal_power = noisy_power[rows_idx, lobe].sum(axis=1)
+            rest = noisy_power.sum(axis=1) - signal_power
+            clean_peak = np.argmax(clean_power, axis=1)
+            clean_lobe = np.clip(clean_peak[:, None] + offsets, 0, power.shape[1] - 1)
+            clean_total = clean_power.sum(axis=1)
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                snr = 10 * np.log10(signal_power / rest)
+                leakage = np.where(clean_total > 0, 1 - clean_power[rows_idx, clean_lobe].sum(axis=1) / clean_total, 0)
+            rows.append(pd.DataFrame({
+                '频率': f[:, 0],
+                '持续时间': duration,
+                '采样率': sample_rate,
+                '噪声水平': noise[:, 0],
+                '峰值频率': xf[peak],
+                '频率误差': np.abs(xf[peak] - f[:, 0]),
+                'SNR(dB)': snr,
+                '频谱泄漏': leakage,
+            }))
+        return pd.concat(rows, ignore_index=True)
+    except Exception as e:
+        raise ValueError(f'参数扫描错误: {str(e)}')
+
 def compute_derivative(func_str, var_str):
     """计算导数"""
     try:
         x = sp.Symbol(var_str)
-        # 替换常见符号
-        func_str = func_str.replace('^', '**').replace('π', 'pi').replace('e', 'E')
-        f = sp.sympify(func_str)
+        f = parse_expression(func_str)
         derivative = sp.diff(f, x)
         return derivative
     except Exception as e:
@@ -98,16 +560,12 @@ def compute_integral(func_str, var_str, lower_str=None, upper_str=None):
     """计算积分"""
     try:
         x = sp.Symbol(var_str)
-        # 替换常见符号
-        func_str = func_str.replace('^', '**').replace('π', 'pi').replace('e', 'E')
-        f = sp.sympify(func_str)
+        f = parse_expression(func_str)
         
         if lower_str is not None and upper_str is not None and lower_str != '' and upper_str != '':
             # 定积分
-            lower_str = lower_str.replace('π', 'pi').replace('e', 'E')
-            upper_str = upper_str.replace('π', 'pi').replace('e', 'E')
-            lower = sp.sympify(lower_str)
-            upper = sp.sympify(upper_str)
+            lower = parse_expression(lower_str)
+            upper = parse_expression(upper_str)
             integral = sp.integrate(f, (x, lower, upper))
             return integral
         else:
@@ -117,6 +575,440 @@ def compute_integral(func_str, var_str, lower_str=None, upper_str=None):
     except Exception as e:
         raise ValueError(f'积分计算错误: {str(e)}')
 
+def _nsimplify_floats(expr):
+    """将浮点系数识别为有理数或含π、e的常数，不含浮点数时原样返回"""
+    return sp.nsimplify(expr, [sp.pi, sp.E]) if expr.has(sp.Float) else expr
+
+# 化简流水线：依次尝试各阶段，每阶段在独立进程中运行并限时（秒），超时即放弃该阶段
+SIMPLIFY_STAGES = {
+    'cancel': sp.cancel,
+    'trigsimp': sp.trigsimp,
+    'nsimplify': _nsimplify_floats,
+    'cse': sp.cse,
+}
+SIMPLIFY_BUDGETS = {'cancel': 2.0, 'trigsimp': 2.0, 'nsimplify': 1.0, 'cse': 1.0}
+
+# 同时运行化简阶段（及其他限时符号计算）的工作进程数；每个阶段单独占用一个进程，不同请求互不排队
+SIMPLIFY_WORKERS = 4
+
+_simplify_pools = []  # 空闲的单进程池，超时的进程被终止后不再放回
+_simplify_pools_lock = threading.Lock()
+_simplify_slots = threading.BoundedSemaphore(SIMPLIFY_WORKERS)
+
+def _map_result(result, func):
+    """对求解/积分结果（表达式、列表、元组、字典）中的每个表达式应用func"""
+    if isinstance(result, dict):
+        return {k: _map_result(v, func) for k, v in result.items()}
+    if isinstance(result, (list, tuple)):
+        return type(result)(_map_result(v, func) for v in result)
+    if isinstance(result, sp.Expr):
+        return func(result)
+    return result
+
+def _result_size(result):
+    """结果大小：打印长度，相同时比较运算次数"""
+    ops = []
+    _map_result(result, lambda e: ops.append(sp.count_ops(e)))
+    return len(str(result)), sum(ops)
+
+def _simplify_stage(name, result):
+    """在工作进程中执行一个化简阶段"""
+    stage = SIMPLIFY_STAGES[name]
+    if name == 'cse':
+        leaves = []
+        _map_result(result, leaves.append)
+        return stage(leaves)
+    return _map_result(result, stage)
+
+def _reset_signal_handlers():
+    """工作进程恢复默认信号处理：fork继承的服务器SIGTERM处理函数会使terminate无法结束进程"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _run_limited(func, args, timeout):
+    """在工作进程中限时运行func(*args)，超时则终止所用的工作进程并返回None"""
+    with _simplify_slots:
+        with _simplify_pools_lock:
+            pool = _simplify_pools.pop() if _simplify_pools else None
+        if pool is None:
+            pool = multiprocessing.Pool(1, initializer=_reset_signal_handlers)
+        task = pool.apply_async(func, args)
+        try:
+            value = task.get(timeout)
+        except multiprocessing.TimeoutError:
+            # SymPy的计算无法中断，只能终止进程，下次使用时重新创建
+            pool.terminate()
+            return None
+        except Exception:
+            with _simplify_pools_lock:
+                _simplify_pools.append(pool)
+            raise
+        with _simplify_pools_lock:
+            _simplify_pools.append(pool)
+        return value
+
+def _run_simplify_stage(name, result, timeout):
+    """限时运行化简阶段，超时返回None"""
+    return _run_limited(_simplify_stage, (name, result), timeout)
+
+def simplify_result(result, budgets=None):
+    """符号结果后处理：cancel、trigsimp、nsimplify逐阶段化简，保留打印长度最短的结果
+    
+    每阶段作用于当前最优结果并有独立的时间预算；最后用cse提取公共子表达式，
+    仅当其总规模更小时给出。返回 {'result': 结果, 'cse': (替换列表, 化简后表达式) 或None,
+    'report': 各阶段的大小、用时与状态}。
+    """
+    budgets = {**SIMPLIFY_BUDGETS, **(budgets or {})}
+    best, best_size = result, _result_size(result)
+    cse_form = None
+    rows = [{'阶段': '原始结果', '长度': best_size[0], '用时(s)': 0.0, '状态': '—'}]
+    
+    for name in SIMPLIFY_STAGES:
+        start = time.perf_counter()
+        try:
+            candidate = _run_simplify_stage(name, best, budgets[name])
+        except Exception as e:
+            rows.append({'阶段': name, '长度': None, '用时(s)': time.perf_counter() - start, '状态': f'失败: {e}'})
+            continue
+        elapsed = time.perf_counter() - start
+        if candidate is None:
+            rows.append({'阶段': name, '长度': None, '用时(s)': elapsed, '状态': '超时'})
+            continue
+        
+        if name == 'cse':
+            replacements, reduced = candidate
+            size = (len(str(candidate)),
+                    sum(sp.count_ops(v) for _, v in replacements) + sum(sp.count_ops(e) for e in reduced))
+        else:
+            size = _result_size(candidate)
+        improved = size < best_size
+        rows.append({'阶段': name, '长度': size[0], '用时(s)': elapsed, '状态': '采用' if improved else '未改进'})
+        if not improved:
+            continue
+        if name == 'cse':
+            cse_form = candidate
+        else:
+            best, best_size = candidate, size
+    return {'result': best, 'cse': cse_form, 'report': pd.DataFrame(rows)}
+
+# 数值内核分块求值的块大小（元素个数），限制中间数组的内存
+KERNEL_CHUNK = 1 << 20
+
+KERNEL_BACKENDS = ('numpy', 'numexpr')
+
+class NumericKernel:
+    """由符号结果生成的数值内核，可在大数组上分块向量化求值"""
+    
+    def __init__(self, expressions, variables, backend='numpy', cse=True):
+        self.expressions = tuple(expressions)
+        self.variables = tuple(variables)
+        self.backend = backend
+        if backend == 'numexpr':
+            if numexpr is None:
+                raise ValueError('未安装numexpr，无法使用该后端')
+            # numexpr后端每个表达式生成一个内核
+            self._funcs = [sp.lambdify(self.variables, e, modules='numexpr') for e in self.expressions]
+        elif backend == 'numpy':
+            # 公共子表达式消除后多个表达式共享中间结果
+            self._funcs = [sp.lambdify(self.variables, list(self.expressions), modules=['numpy', 'scipy'], cse=cse)]
+        else:
+            raise ValueError(f'不支持的内核后端: {backend}')
+    
+    @property
+    def source(self):
+        """生成的内核源码"""
+        return '\n'.join(inspect.getsource(f) for f in self._funcs)
+    
+    def _evaluate(self, args):
+        if self.backend == 'numexpr':
+            return [f(*args) for f in self._funcs]
+        return self._funcs[0](*args)
+    
+    def __call__(self, *args, chunk_size=KERNEL_CHUNK):
+        """求值；单个表达式返回数组，多个表达式返回数组元组"""
+        if len(args) != len(self.variables):
+            raise ValueError(f'需要{len(self.variables)}个参数: {", ".join(map(str, self.variables))}')
+        arrays = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in args])
+        shape = arrays[0].shape if arrays else ()
+        flat = [a.reshape(-1) for a in arrays]
+        size = flat[0].size if flat else 1
+        
+        out = None
+        for start in range(0, size, chunk_size):
+            stop = min(start + chunk_size, size)
+            values = self._evaluate([a[start:stop] for a in flat])
+            if out is None:
+                out = np.empty((len(self.expressions), size), dtype=np.result_type(*values, float))
+            for row, value in zip(out, values):
+                row[start:stop] = value
+        out = out.reshape((len(self.expressions),) + shape)
+        return out[0] if len(self.expressions) == 1 else tuple(out)
+
+@lru_cache(maxsize=256)
+def _build_kernel(expressions, variables, backend, cse):
+    """按表达式哈希缓存数值内核"""
+    return NumericKernel(expressions, variables, backend, cse)
+
+def compile_kernel(result, variables=None, backend='numpy', cse=True):
+    """将符号结果（表达式、解列表或解字典）转换为数值内核
+    
+    variables为空时按名称排序使用全部自由符号。
+    """
+    try:
+        if isinstance(result, dict):
+            items = list(result.values())
+        elif isinstance(result, (list, tuple)):
+            items = []
+            for item in result:
+                # 方程组的解可能是元组或字典的列表
+                items.extend(item.values() if isinstance(item, dict) else item if isinstance(item, (list, tuple)) else [item])
+        else:
+            items = [result]
+        expressions = tuple(sp.sympify(e) for e in items)
+        if not expressions:
+            raise ValueError('没有可转换的表达式')
+        if variables is None:
+            free = set().union(*(e.free_symbols for e in expressions))
+            variables = sorted(free, key=lambda s: s.name)
+        variables = tuple(sp.Symbol(v.strip()) if isinstance(v, str) else v for v in variables)
+        return _build_kernel(expressions, variables, backend, cse)
+    except Exception as e:
+        raise ValueError(f'数值内核生成错误: {str(e)}')
+
+@lru_cache(maxsize=256)
+def lambdify_expression(expr, var_str='x'):
+    """将SymPy表达式转换为单变量向量化实函数（内核按表达式缓存，只生成一次）"""
+    kernel = compile_kernel(expr, (var_str,))
+    
+    def evaluate(x):
+        x = np.asarray(x, dtype=float)
+        with np.errstate(all='ignore'):
+            try:
+                y = np.asarray(kernel(x))
+            except TypeError:
+                # 含有NumPy/SciPy无对应实现的函数时逐点求值
+                y = np.vectorize(kernel, otypes=[complex])(x)
+        if np.iscomplexobj(y):
+            # 只保留实数部分有意义的点
+            y = np.where(np.abs(y.imag) < 1e-12, y.real, np.nan)
+        return np.broadcast_to(y.astype(float), x.shape)
+    
+    return evaluate
+
+# 判断间断点时对候选区间追加的二分次数
+DISCONTINUITY_PROBES = 8
+
+def adaptive_sample(func, a, b, n_initial=65, max_points=4000, tol=1e-3, max_depth=14):
+    """自适应采样：在曲率大或不连续处加密采样点
+    
+    每轮只对误差超限的区间取中点并一次性向量化求值，
+    区间中点与两端线性插值的偏差（相对于函数值范围）作为误差。
+    无法收敛、且跳变在继续二分下不缩小的区间视为间断点，插入NaN以断开曲线。
+    返回 (x, y, 求值次数)。
+    """
+    x = np.linspace(a, b, n_initial)
+    y = func(x)
+    evaluations = n_initial
+    refine = np.ones(n_initial - 1, dtype=bool)
+    
+    for _ in range(max_depth):
+        if not refine.any() or len(x) >= max_points:
+            break
+        left = np.flatnonzero(refine)
+        xm = (x[left] + x[left + 1]) / 2
+        ym = func(xm)
+        evaluations += len(xm)
+        
+        finite = y[np.isfinite(y)]
+        if finite.size:
+            low, high = np.percentile(finite, [2, 98])
+            scale = (high - low) or (np.max(np.abs(finite)) or 1.0)
+        else:
+            scale = 1.0
+        linear = (y[left] + y[left + 1]) / 2
+        with np.errstate(invalid='ignore'):
+            error = np.abs(ym - linear) / scale
+        mixed = np.isfinite(ym) != np.isfinite(linear)
+        bad = (error > tol) | mixed
+        
+        # 插入中点；超限区间的两半在下一轮继续检查
+        x = np.insert(x, left + 1, xm)
+        y = np.insert(y, left + 1, ym)
+        refine = np.zeros(len(x) - 1, dtype=bool)
+        new_left = left + np.arange(len(left))
+        refine[new_left[bad]] = True
+        refine[new_left[bad] + 1] = True
+    
+    # 仍未收敛且有明显跳变的区间：继续二分跳变所在的一半，跳变不随区间缩小的才是间断点
+    if refine.any():
+        finite = y[np.isfinite(y)]
+        scale = np.ptp(np.percentile(finite, [2, 98])) if finite.size else 1.0
+        with np.errstate(invalid='ignore'):
+            candidates = np.flatnonzero(refine & (np.abs(np.diff(y)) > 0.05 * (scale or 1.0)))
+        if candidates.size:
+            lo, hi = x[candidates], x[candidates + 1]
+            y_lo, y_hi = y[candidates], y[candidates + 1]
+            initial = np.abs(y_hi - y_lo)
+            # 连续函数的跳变每次二分约减半，真正的间断跳变基本不变或增大；已减半的区间不再检查
+            for _ in range(DISCONTINUITY_PROBES):
+                if not candidates.size:
+                    break
+                mid = (lo + hi) / 2
+                y_mid = func(mid)
+                evaluations += len(mid)
+                with np.errstate(invalid='ignore'):
+                    left = np.abs(y_mid - y_lo) >= np.abs(y_hi - y_mid)
+                    hi, y_hi = np.where(left, mid, hi), np.where(left, y_mid, y_hi)
+                    lo, y_lo = np.where(left, lo, mid), np.where(left, y_lo, y_mid)
+                    keep = np.abs(y_hi - y_lo) > 0.5 * initial
+                candidates, initial = candidates[keep], initial[keep]
+                lo, hi, y_lo, y_hi = lo[keep], hi[keep], y_lo[keep], y_hi[keep]
+            jumps = candidates
+            x = np.insert(x, jumps + 1, (x[jumps] + x[jumps + 1]) / 2)
+            y = np.insert(y, jumps + 1, np.nan)
+    return x, y, evaluations
+
+# 上传文件分块写入的块大小（字节）与读取表格时汇报进度、检查取消的行数间隔
+UPLOAD_CHUNK = 1 << 20
+# 上传文件大小上限：文件先流式写入临时文件再在后台解析，不再整体读入内存
+MAX_UPLOAD_BYTES = 500 * 2**20
+TABLE_PROGRESS_ROWS = 5000
+TABLE_SUFFIXES = ('.xlsx', '.xls', '.csv')
+
+def save_upload(source, suffix='', chunk_size=UPLOAD_CHUNK, cancel=None, max_bytes=None):
+    """将上传内容分块写入临时文件，返回文件路径（由调用方删除）；超过max_bytes时中止"""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            written = 0
+            while chunk := source.read(chunk_size):
+                if cancel is not None and cancel.is_set():
+                    raise ValueError('上传已取消')
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise ValueError(f'文件超过大小上限 {max_bytes // 2**20}MB')
+                f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+def _check_cancel(cancel):
+    """cancel已置位时中止（文件读取、微分方程求解等长时间任务）"""
+    if cancel is not None and cancel.is_set():
+        raise ValueError('操作已取消')
+
+def read_table(path, progress=None, cancel=None):
+    """读取Excel/CSV表格文件为DataFrame
+    
+    progress为可选回调，参数为已完成比例(0~1)；cancel为threading.Event，置位后中途停止读取。
+    .xlsx用openpyxl只读模式逐行读取，.csv分块读取，.xls一次读入。
+    """
+    report = progress or (lambda fraction: None)
+    suffix = os.path.splitext(path)[1].lower()
+    try:
+        if suffix == '.csv':
+            total = max(os.path.getsize(path), 1)
+            chunks = []
+            with open(path, 'rb') as f:
+                for chunk in pd.read_csv(f, chunksize=TABLE_PROGRESS_ROWS):
+                    _check_cancel(cancel)
+                    chunks.append(chunk)
+                    report(min(f.tell() / total, 1.0))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        elif suffix == '.xlsx' and openpyxl is not None:
+            workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+            try:
+                sheet = workbook.active
+                total = max(sheet.max_row or 1, 1)
+                rows = sheet.iter_rows(values_only=True)
+                header = next(rows, ())
+                columns = [name if name is not None else f'Unnamed: {i}' for i, name in enumerate(header)]
+                records = []
+                for i, row in enumerate(rows, 1):
+                    if i % TABLE_PROGRESS_ROWS == 0:
+                        _check_cancel(cancel)
+                        report(i / total)
+                    # 只读模式下工作表末尾可能带有全空行
+                    if any(value is not None for value in row):
+                        records.append(row)
+            finally:
+                workbook.close()
+            df = pd.DataFrame.from_records(records, columns=columns)
+        elif suffix in TABLE_SUFFIXES:
+            df = pd.read_excel(path)
+        else:
+            raise ValueError(f'不支持的文件格式: {suffix or "无扩展名"}')
+        _check_cancel(cancel)
+        report(1.0)
+        return df
+    except Exception as e:
+        raise ValueError(f'文件读取错误: {str(e)}')
+
+def _readonly(array):
+    """返回数组的只读视图（不复制数据）"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+class ColumnStore:
+    """表格数据的列式缓存
+    
+    加载时每列一次性转换为类型化的NumPy数组（数值列保持原数值类型，其余为object），
+    并预计算空值掩码；之后按列取数据返回只读视图，重复选择直接命中缓存。
+    """
+    
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        self.n_rows = len(df)
+        self._arrays = {}
+        self._valid = {}
+        self._cache = {}
+        for name in self.columns:
+            series = df[name]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                self._arrays[name] = series.to_numpy()
+            else:
+                self._arrays[name] = series.to_numpy(dtype=object)
+            self._valid[name] = series.notna().to_numpy()
+    
+    def _cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+    
+    def null_count(self, name):
+        """列中空值个数"""
+        return self._cached(('nulls', name), lambda: int(self.n_rows - self._valid[name].sum()))
+    
+    def values(self, name):
+        """去除空值后的列数据；列中无空值时直接返回底层数组的视图"""
+        def build():
+            array = self._arrays[name]
+            return _readonly(array if self.null_count(name) == 0 else array[self._valid[name]])
+        return self._cached(('values', name), build)
+    
+    def numeric(self, name):
+        """列数据转换为float64，无法转换的值与空值一并去除"""
+        def build():
+            values = self.values(name)
+            if values.dtype.kind in 'iuf':
+                # float64列不复制
+                return _readonly(values.astype(float, copy=False))
+            converted = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+            return _readonly(converted[~np.isnan(converted)])
+        return self._cached(('numeric', name), build)
+    
+    def text(self, name, numeric=False):
+        """列数据格式化为逗号分隔文本（用于填入输入框）"""
+        def build():
+            values = self.values(name)
+            # 整数列保持原样输出，避免显示为 1.0, 2.0, …
+            if numeric and values.dtype.kind not in 'iuf':
+                values = self.numeric(name)
+            return ', '.join(map(str, values.tolist()))
+        return self._cached(('text', name, numeric), build)
+
 def compute_statistics(data_str):
     """计算统计量"""
     # 转换数据为浮点数列表
@@ -137,24 +1029,743 @@ def compute_statistics(data_str):
     }
     return stats_dict
 
+def compute_table_statistics(df, percentiles=(25, 50, 75), group_by=None):
+    """一次性计算所有数值列（可按分类列分组）的统计量表
+    
+    所有统计量都由pandas的分组向量化归约得到，不逐列循环。
+    偏度与峰度（超额峰度）采用总体矩，与compute_statistics的总体标准差一致。
+    """
+    try:
+        if group_by is not None and group_by not in df.columns:
+            raise ValueError(f'分组列不存在: {group_by}')
+        numeric = df.select_dtypes(include=['number']).drop(columns=[group_by], errors='ignore')
+        if numeric.columns.empty:
+            raise ValueError('没有数值列')
+        percentiles = sorted(set(float(p) for p in percentiles))
+        if any(p < 0 or p > 100 for p in percentiles):
+            raise ValueError('百分位数必须在0到100之间')
+        
+        # 无分组时用常量键，统一走分组归约
+        keys = df[group_by] if group_by is not None else np.zeros(len(df), dtype=int)
+        grouped = numeric.groupby(keys, sort=True)
+        mean = grouped.mean()
+        centered = numeric - grouped.transform('mean')
+        squared = centered**2
+        m2 = squared.groupby(keys, sort=True).mean()
+        m3 = (squared * centered).groupby(keys, sort=True).mean()
+        m4 = (squared**2).groupby(keys, sort=True).mean()
+        
+        frames = {
+            'count': grouped.count(),
+            'mean': mean,
+            'median': grouped.median(),
+            'std': np.sqrt(m2),
+            'var': m2,
+            'min': grouped.min(),
+            'max': grouped.max(),
+            'skew': m3 / m2**1.5,
+            'kurtosis': m4 / m2**2 - 3,
+        }
+        if percentiles:
+            quantiles = grouped.quantile([p / 100 for p in percentiles])
+            # 按分位数值取结果，不依赖索引层级的顺序
+            levels = quantiles.index.get_level_values(-1)
+            for p in percentiles:
+                frames[f'p{p:g}'] = quantiles[np.isclose(levels, p / 100)].droplevel(-1)
+        
+        # 每个统计量是 分组×列 的矩阵，展平后拼成长表
+        groups, columns = mean.index, mean.columns
+        table = pd.DataFrame(
+            {name: frame.reindex(index=groups, columns=columns).to_numpy().ravel() for name, frame in frames.items()},
+            index=pd.MultiIndex.from_product([groups, columns], names=[group_by, '列'])
+        )
+        table['count'] = table['count'].astype(int)
+        if group_by is None:
+            table = table.droplevel(0)
+        return table
+    except Exception as e:
+        raise ValueError(f'统计计算错误: {str(e)}')
+
+CORRELATION_METHODS = {'pearson': 'Pearson', 'spearman': 'Spearman'}
+
+def correlation_matrix(df, method='pearson'):
+    """所有数值列的相关系数矩阵
+    
+    各列标准化（Spearman先转为秩）后由一次矩阵乘法得到全部相关系数。
+    含空值的行整体去除，所有系数基于同一组样本。
+    """
+    try:
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f'不支持的相关系数: {method}')
+        numeric = df.select_dtypes(include=['number'])
+        if numeric.shape[1] < 2:
+            raise ValueError('至少需要两个数值列')
+        values = numeric.dropna().to_numpy(dtype=float, copy=True)
+        if len(values) < 3:
+            raise ValueError('有效数据行太少')
+        if method == 'spearman':
+            values = rankdata(values, axis=0)
+        values -= values.mean(axis=0)
+        norms = np.linalg.norm(values, axis=0)
+        # 常数列的相关系数无定义，结果为NaN
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values /= norms
+        corr = np.clip(values.T @ values, -1, 1)
+        np.fill_diagonal(corr, np.where(norms > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=numeric.columns, columns=numeric.columns)
+    except Exception as e:
+        raise ValueError(f'相关分析错误: {str(e)}')
+
+def lag_correlation(x_data, y_data=None, max_lag=None):
+    """自相关（y为None）或互相关随滞后的变化，用FFT计算，复杂度 O(n log n)
+    
+    返回 (滞后, 相关系数)；滞后k的系数为 Σ(x[t+k]-x̄)(y[t]-ȳ) / (n·σx·σy)（有偏估计）。
+    """
+    try:
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = x_data if y_data is None else np.asarray(y_data, dtype=float)
+        n = len(x_data)
+        if x_data.ndim != 1 or x_data.shape != y_data.shape:
+            raise ValueError('X和Y数据数量不一致')
+        if n < 3:
+            raise ValueError('数据点太少')
+        if not (np.all(np.isfinite(x_data)) and np.all(np.isfinite(y_data))):
+            raise ValueError('数据中包含空值或无穷值')
+        max_lag = n - 1 if max_lag is None else min(int(max_lag), n - 1)
+        if max_lag < 0:
+            raise ValueError('最大滞后必须为非负整数')
+        x_centered = x_data - x_data.mean()
+        y_centered = y_data - y_data.mean()
+        scale = n * x_centered.std() * y_centered.std()
+        if scale == 0:
+            raise ValueError('常数序列的相关系数无定义')
+        values = correlate(x_centered, y_centered, mode='full', method='fft') / scale
+        lags = correlation_lags(n, n, mode='full')
+        keep = slice(n - 1 - max_lag, n + max_lag)
+        return lags[keep], values[keep]
+    except Exception as e:
+        raise ValueError(f'滞后相关计算错误: {str(e)}')
+
+# 每个并行任务处理的重采样次数（与进程数无关，保证结果可复现）
+BOOTSTRAP_CHUNK = 500
+
+# 工作进程中的共享数据，由进程池初始化函数设置，避免每个任务重复传输
+_bootstrap_arrays = None
+
+def _bootstrap_init(*arrays):
+    """初始化bootstrap工作进程的共享数据"""
+    global _bootstrap_arrays
+    _bootstrap_arrays = arrays
+
+def _bootstrap_stats_chunk(seed_seq, n_resamples, batch_size, percentiles):
+    """在一个任务块内用索引矩阵批量重采样，计算均值、中位数、标准差和分位数"""
+    data, = _bootstrap_arrays
+    rng = np.random.default_rng(seed_seq)
+    results = []
+    for start in range(0, n_resamples, batch_size):
+        idx = rng.integers(0, len(data), size=(min(batch_size, n_resamples - start), len(data)))
+        sample = data[idx]
+        # 中位数与其他分位数一次求出
+        q = np.percentile(sample, [50] + list(percentiles), axis=1)
+        results.append(np.column_stack([sample.mean(axis=1), q[0], sample.std(axis=1), *q[1:]]))
+    return np.vstack(results)
+
+def _bootstrap_fit_chunk(seed_seq, n_resamples, batch_size, degree):
+    """在一个任务块内批量求解重采样数据的多项式拟合（切比雪夫基正规方程）"""
+    t, y = _bootstrap_arrays
+    rng = np.random.default_rng(seed_seq)
+    results = []
+    for start in range(0, n_resamples, batch_size):
+        idx = rng.integers(0, len(t), size=(min(batch_size, n_resamples - start), len(t)))
+        A = np.polynomial.chebyshev.chebvander(t[idx], degree)
+        Y = y[idx]
+        gram = np.einsum('bni,bnj->bij', A, A)
+        moment = np.einsum('bni,bn->bi', A, Y)
+        coef = np.einsum('bij,bj->bi', np.linalg.pinv(gram), moment)
+        ss_res = np.sum((np.einsum('bni,bi->bn', A, coef) - Y)**2, axis=1)
+        ss_tot = np.sum((Y - Y.mean(axis=1, keepdims=True))**2, axis=1)
+        r_squared = np.where(ss_tot > 0, 1 - ss_res / np.where(ss_tot > 0, ss_tot, 1), 0)
+        results.append(np.column_stack([coef, r_squared]))
+    return np.vstack(results)
+
+def _run_bootstrap(chunk_func, arrays, n_resamples, seed, n_workers, batch_size, *args):
+    """按固定块大小拆分重采样，用确定性种子序列在进程池中并行计算"""
+    n_chunks = -(-n_resamples // BOOTSTRAP_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes = [min(BOOTSTRAP_CHUNK, n_resamples - i * BOOTSTRAP_CHUNK) for i in range(n_chunks)]
+    n_workers = min(n_workers or os.cpu_count() or 1, n_chunks)
+    
+    if n_workers == 1:
+        _bootstrap_init(*arrays)
+        try:
+            return np.vstack([chunk_func(s, size, batch_size, *args) for s, size in zip(seeds, sizes)])
+        finally:
+            _bootstrap_init()
+    
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_bootstrap_init, initargs=arrays) as pool:
+        futures = [pool.submit(chunk_func, s, size, batch_size, *args) for s, size in zip(seeds, sizes)]
+        return np.vstack([f.result() for f in futures])
+
+def _bootstrap_batch_size(n, bytes_per_point, max_memory_mb, n_workers):
+    """根据内存预算计算每批重采样次数（预算由所有工作进程均分）"""
+    budget = max_memory_mb * 2**20 / max(n_workers or os.cpu_count() or 1, 1)
+    return int(max(1, min(BOOTSTRAP_CHUNK, budget // (n * bytes_per_point))))
+
+def _confidence_table(names, estimates, samples, confidence):
+    """由bootstrap样本计算百分位置信区间表"""
+    alpha = (1 - confidence) / 2 * 100
+    low, high = np.nanpercentile(samples, [alpha, 100 - alpha], axis=0)
+    return pd.DataFrame({
+        '估计值': estimates,
+        '下限': low,
+        '上限': high,
+        '标准误': np.nanstd(samples, axis=0, ddof=1),
+    }, index=names)
+
+def bootstrap_statistics(data, percentiles=(25, 75), n_resamples=10000, confidence=0.95,
+                         seed=0, n_workers=None, max_memory_mb=256):
+    """计算均值、中位数、标准差和分位数的bootstrap置信区间"""
+    try:
+        data = np.asarray(data, dtype=float)
+        if data.size < 2:
+            raise ValueError('至少需要2个数据点')
+        if not 0 < confidence < 1:
+            raise ValueError('置信水平必须在0到1之间')
+        percentiles = [float(p) for p in percentiles]
+        # 每个数据点: 索引(8字节) + 重采样值(8字节) + 分位数排序副本(8字节)
+        batch_size = _bootstrap_batch_size(data.size, 24, max_memory_mb, n_workers)
+        samples = _run_bootstrap(_bootstrap_stats_chunk, (data,), int(n_resamples), seed,
+                                 n_workers, batch_size, percentiles)
+        
+        names = ['mean', 'median', 'std'] + [f'p{p:g}' for p in percentiles]
+        estimates = [np.mean(data), np.median(data), np.std(data), *np.percentile(data, percentiles)]
+        return _confidence_table(names, estimates, samples, confidence)
+    except Exception as e:
+        raise ValueError(f'Bootstrap计算错误: {str(e)}')
+
+def bootstrap_fit(x_data, y_data, degree, n_resamples=2000, confidence=0.95,
+                  seed=0, n_workers=None, max_memory_mb=256):
+    """计算多项式系数和R平方的bootstrap置信区间（系数按高次在前）"""
+    try:
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        degree = int(degree)
+        if x_data.shape != y_data.shape:
+            raise ValueError('X和Y数据数量不一致')
+        if len(x_data) <= degree:
+            raise ValueError(f'至少需要{degree + 1}个数据点')
+        if not 0 < confidence < 1:
+            raise ValueError('置信水平必须在0到1之间')
+        
+        # 在[-1, 1]上用切比雪夫基求解，再线性变换为x的幂基系数
+        domain = [np.min(x_data), np.max(x_data)]
+        t = 2 * (x_data - domain[0]) / (np.ptp(x_data) or 1.0) - 1
+        basis = [np.polynomial.Chebyshev(e, domain=domain).convert(kind=np.polynomial.Polynomial).coef
+                 for e in np.eye(degree + 1)]
+        to_power = np.column_stack([np.pad(c, (0, degree + 1 - len(c))) for c in basis])[::-1]
+        # 每个数据点: 索引 + x + y + 设计矩阵一行 + 预测值
+        batch_size = _bootstrap_batch_size(len(x_data), 8 * (degree + 5), max_memory_mb, n_workers)
+        samples = _run_bootstrap(_bootstrap_fit_chunk, (t, y_data), int(n_resamples), seed,
+                                 n_workers, batch_size, degree)
+        samples = np.column_stack([samples[:, :-1] @ to_power.T, samples[:, -1]])
+        
+        fit = fit_curve(x_data, y_data, degree, basis='chebyshev')
+        names = [f'x^{degree - i}' for i in range(degree + 1)] + ['R²']
+        estimates = list(fit['model'].coeffs) + [fit['r_squared']]
+        return _confidence_table(names, estimates, samples, confidence)
+    except Exception as e:
+        raise ValueError(f'Bootstrap计算错误: {str(e)}')
+
+def parse_data(data_str):
+    """将逗号分隔的数据字符串转换为浮点数组"""
+    # 一次性批量转换，避免逐个元素调用float()
+    return np.array(data_str.split(','), dtype=float)
+
 def curve_fitting(x_str, y_str, degree):
     """曲线拟合"""
     # 转换数据
-    x_data = np.array([float(x.strip()) for x in x_str.split(',')])
-    y_data = np.array([float(y.strip()) for y in y_str.split(',')])
+    x_data = parse_data(x_str)
+    y_data = parse_data(y_str)
     
     # 多项式拟合
-    coeffs = np.polyfit(x_data, y_data, degree)
-    poly = np.poly1d(coeffs)
+    fit = fit_curve(x_data, y_data, degree, basis='power')
     
-    # 计算R平方
-    residuals = y_data - poly(x_data)
-    ss_res = np.sum(residuals**2)
+    # 返回拟合结果
+    return fit['model'], fit['r_squared'], x_data, y_data
+
+# 多项式次数达到该值时自动切换到正交基（切比雪夫）拟合
+ORTHOGONAL_DEGREE = 6
+
+# 多项式基函数: (范德蒙德矩阵构造函数, 多项式类)
+POLY_BASES = {
+    'power': (np.polynomial.polynomial.polyvander, np.polynomial.Polynomial),
+    'chebyshev': (np.polynomial.chebyshev.chebvander, np.polynomial.Chebyshev),
+    'legendre': (np.polynomial.legendre.legvander, np.polynomial.Legendre),
+}
+
+ROBUST_LOSSES = ('linear', 'huber', 'soft_l1', 'cauchy', 'arctan')
+
+@lru_cache(maxsize=128)
+def compile_expression(expr_str, var_str='x'):
+    """编译模型表达式为向量化函数及雅可比矩阵（带缓存）"""
+    try:
+        x = sp.Symbol(var_str)
+        expr = parse_expression(expr_str)
+        # 除自变量外的自由符号均视为待拟合参数
+        params = tuple(sorted((s for s in expr.free_symbols if s != x), key=lambda s: s.name))
+        if not params:
+            raise ValueError('表达式中没有待拟合参数')
+        func = sp.lambdify((x,) + params, expr, modules='numpy')
+        jac = sp.lambdify((x,) + params, [sp.diff(expr, p) for p in params], modules='numpy')
+        return expr, params, func, jac
+    except Exception as e:
+        raise ValueError(f'模型表达式错误: {str(e)}')
+
+def _r_squared(y_data, y_pred):
+    """计算R平方"""
+    ss_res = np.sum((y_data - y_pred)**2)
     ss_tot = np.sum((y_data - np.mean(y_data))**2)
-    r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+    return 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+
+def _robust_scale(residuals):
+    """用中位数绝对偏差估计稳健损失的尺度"""
+    scale = 1.4826 * np.median(np.abs(residuals - np.median(residuals)))
+    return scale if scale > 0 else 1.0
+
+def fit_curve(x_data, y_data, degree=1, weights=None, loss='linear', basis='auto', model=None, p0=None):
+    """加权/稳健曲线拟合
     
-    # 返回拟合结果
-    return poly, r_squared, x_data, y_data
+    model为空时进行多项式拟合，否则拟合自定义模型表达式（如 a*exp(b*x)+c）。
+    weights作用于残差（与np.polyfit的w相同），loss为scipy.optimize.least_squares的损失函数。
+    """
+    try:
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        if x_data.shape != y_data.shape:
+            raise ValueError('X和Y数据数量不一致')
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+            if weights.shape != x_data.shape:
+                raise ValueError('权重与数据数量不一致')
+            if np.any(weights < 0):
+                raise ValueError('权重不能为负数')
+        if loss not in ROBUST_LOSSES:
+            raise ValueError(f'不支持的损失函数: {loss}')
+        
+        if model:
+            return _fit_expression(x_data, y_data, model, weights, loss, p0)
+        return _fit_polynomial(x_data, y_data, int(degree), weights, loss, basis)
+    except Exception as e:
+        raise ValueError(f'拟合错误: {str(e)}')
+
+def _fit_polynomial(x_data, y_data, degree, weights, loss, basis):
+    """多项式拟合（支持正交基、权重与稳健损失）"""
+    if basis == 'auto':
+        basis = 'chebyshev' if degree >= ORTHOGONAL_DEGREE else 'power'
+    if basis not in POLY_BASES:
+        raise ValueError(f'不支持的多项式基: {basis}')
+    vander, poly_class = POLY_BASES[basis]
+    
+    # 线性最小二乘作为初值（内部将x映射到[-1, 1]以保持数值稳定）
+    series = poly_class.fit(x_data, y_data, degree, w=weights)
+    
+    if loss != 'linear':
+        # 稳健拟合：设计矩阵即为常数雅可比矩阵，只需构造一次
+        t = series.mapparms()[0] + series.mapparms()[1] * x_data
+        A = vander(t, degree)
+        b = y_data
+        if weights is not None:
+            A = A * weights[:, None]
+            b = y_data * weights
+        coef0 = series.coef
+        f_scale = _robust_scale(A @ coef0 - b)
+        result = least_squares(lambda c: A @ c - b, coef0, jac=lambda c: A,
+                               loss=loss, f_scale=f_scale)
+        series = poly_class(result.x, domain=series.domain, window=series.window)
+    
+    # 转换为幂基系数以便显示
+    power = series.convert(kind=np.polynomial.Polynomial)
+    poly = np.poly1d(power.coef[::-1])
+    y_pred = series(x_data)
+    
+    return {
+        'model': poly,
+        'predict': series,
+        'params': poly.coeffs,
+        'r_squared': _r_squared(y_data, y_pred),
+        'residuals': y_data - y_pred,
+        'basis': basis,
+        'loss': loss,
+    }
+
+def _fit_expression(x_data, y_data, model, weights, loss, p0):
+    """自定义模型表达式拟合（向量化雅可比矩阵）"""
+    expr, params, func, jac = compile_expression(model)
+    p0 = np.ones(len(params)) if p0 is None else np.asarray(p0, dtype=float)
+    w = np.ones_like(x_data) if weights is None else weights
+    
+    def residuals(p):
+        return w * (func(x_data, *p) - y_data)
+    
+    def jacobian(p):
+        # 常数偏导数需要广播到数据长度
+        columns = [np.broadcast_to(col, x_data.shape) for col in jac(x_data, *p)]
+        return np.column_stack(columns) * w[:, None]
+    
+    f_scale = 1.0 if loss == 'linear' else _robust_scale(residuals(p0))
+    result = least_squares(residuals, p0, jac=jacobian, loss=loss, f_scale=f_scale)
+    if not result.success:
+        raise ValueError(result.message)
+    
+    fitted = expr.xreplace({p: sp.Float(v, 6) for p, v in zip(params, result.x)})
+    y_pred = np.broadcast_to(func(x_data, *result.x), x_data.shape)
+    
+    return {
+        'model': fitted,
+        'predict': lambda x: np.broadcast_to(func(np.asarray(x, dtype=float), *result.x), np.shape(x)),
+        'params': dict(zip((p.name for p in params), result.x.tolist())),
+        'r_squared': _r_squared(y_data, y_pred),
+        'residuals': y_data - y_pred,
+        'basis': None,
+        'loss': loss,
+    }
+
+class OnlinePolyFit:
+    """在线多项式拟合：增量更新[A | y]的QR分解中的R，每批新数据的代价为O(batch·degree²)
+    
+    x在内部按首批数据的范围缩放到[-1, 1]附近；R的最后一个对角元即残差范数，
+    y的均值与离差平方和用Welford算法累积，均不受y的大偏移量影响。
+    """
+    
+    def __init__(self, degree):
+        self.degree = int(degree)
+        self.n = 0
+        self._center = None
+        self._scale = None
+        self._r = np.zeros((self.degree + 2, self.degree + 2))
+        self._mean_y = 0.0
+        self._ss_y = 0.0
+        self._coef = None
+    
+    def update(self, x_new, y_new):
+        """加入新的数据点"""
+        x_new = np.atleast_1d(np.asarray(x_new, dtype=float))
+        y_new = np.atleast_1d(np.asarray(y_new, dtype=float))
+        if x_new.shape != y_new.shape:
+            raise ValueError('X和Y数据数量不一致')
+        if len(x_new) == 0:
+            return self
+        if self._center is None:
+            self._min, self._max = np.min(x_new), np.max(x_new)
+            self._center = (self._max + self._min) / 2
+            self._scale = (self._max - self._min) / 2 or 1.0
+        else:
+            self._min = min(self._min, np.min(x_new))
+            self._max = max(self._max, np.max(x_new))
+            # 数据范围超出缩放窗口两倍时重新缩放，保持R良态
+            if self._min < self._center - 2 * self._scale or self._max > self._center + 2 * self._scale:
+                self._rescale((self._max + self._min) / 2, (self._max - self._min) / 2)
+        
+        A = np.polynomial.polynomial.polyvander((x_new - self._center) / self._scale, self.degree)
+        self._r = np.linalg.qr(np.vstack([self._r, np.column_stack([A, y_new])]), mode='r')
+        # Welford合并：批内离差平方和加上均值差的修正项
+        m = len(y_new)
+        batch_mean = np.mean(y_new)
+        delta = batch_mean - self._mean_y
+        total = self.n + m
+        self._ss_y += np.sum((y_new - batch_mean)**2) + delta**2 * self.n * m / total
+        self._mean_y += delta * m / total
+        self.n = total
+        self._coef = None
+        return self
+    
+    def _rescale(self, center, scale):
+        """将R变换到新的缩放变量 t' = (x - center) / scale"""
+        # t' = a + b*t，于是 t'^j = sum_i C(j,i) a^(j-i) b^i t^i，即 A' = A M^T
+        a = (self._center - center) / scale
+        b = self._scale / scale
+        k = self.degree + 1
+        j, i = np.indices((k, k))
+        M = np.eye(k + 1)
+        M[:k, :k] = np.where(i <= j, comb(j, i) * a**np.maximum(j - i, 0) * b**i, 0.0)
+        self._r = np.linalg.qr(self._r @ M.T, mode='r')
+        self._center, self._scale = center, scale
+    
+    def _scaled_coefficients(self):
+        """缩放变量下的系数（低次在前），结果缓存到下次更新"""
+        if self.n <= self.degree:
+            raise ValueError(f'至少需要{self.degree + 1}个数据点')
+        if self._coef is None:
+            k = self.degree + 1
+            self._coef = np.linalg.lstsq(self._r[:k, :k], self._r[:k, k], rcond=None)[0]
+        return self._coef
+    
+    def coefficients(self):
+        """多项式系数（高次在前，与np.polyfit一致）"""
+        domain = [self._center - self._scale, self._center + self._scale]
+        series = np.polynomial.Polynomial(self._scaled_coefficients(), domain=domain)
+        coef = series.convert().coef
+        return np.pad(coef, (0, self.degree + 1 - len(coef)))[::-1]
+    
+    def poly(self):
+        """拟合多项式"""
+        return np.poly1d(self.coefficients())
+    
+    def predict(self, x):
+        """在缩放变量下求值，避免高次幂基系数的精度损失"""
+        t = (np.asarray(x, dtype=float) - self._center) / self._scale
+        return np.polynomial.polynomial.polyval(t, self._scaled_coefficients())
+    
+    def r_squared(self):
+        """由R与y的离差平方和计算R平方，无需保留原始数据"""
+        k = self.degree + 1
+        c = self._scaled_coefficients()
+        # R满秩时残差平方和即R[k, k]²；秩亏时加上最小二乘解未能消去的部分
+        ss_res = self._r[k, k]**2 + np.sum((self._r[:k, :k] @ c - self._r[:k, k])**2)
+        return 1 - (ss_res / self._ss_y) if self._ss_y > 0 else 0
+
+# 自动模型选择的候选模型族
+FIT_FAMILIES = {
+    '指数': 'a*exp(b*x) + c',
+    '对数': 'a*log(x) + b',
+    '幂函数': 'a*x**b',
+    '正弦': 'a*sin(b*x + c) + d',
+}
+
+SELECTION_CRITERIA = ('cv', 'aic', 'bic')
+
+def _information_criteria(rss, n, k):
+    """根据残差平方和计算AIC和BIC"""
+    log_likelihood = n * np.log(np.maximum(rss, np.finfo(float).tiny) / n)
+    return log_likelihood + 2 * k, log_likelihood + k * np.log(n)
+
+def _kfold_indices(n, k_folds, seed):
+    """生成打乱后的K折测试集索引"""
+    order = np.random.default_rng(seed).permutation(n)
+    return np.array_split(order, k_folds)
+
+def _qr_degree_sweep(A, y, max_degree):
+    """单次QR分解同时求出所有次数的拟合系数
+    
+    A的前d+1列的QR分解即为Q的前d+1列和R的左上角块，
+    因此一次分解即可得到1..max_degree次的全部最小二乘解。
+    """
+    Q, R = qr(A, mode='economic', check_finite=False)
+    qty = Q.T @ y
+    coeffs = [solve_triangular(R[:d + 1, :d + 1], qty[:d + 1]) for d in range(1, max_degree + 1)]
+    # 残差平方和 = 全模型残差 + 被舍弃的正交分量
+    base = np.sum((y - Q @ qty)**2)
+    tail = np.cumsum((qty**2)[::-1])[::-1]
+    rss = np.array([base + (tail[d + 1] if d + 1 < len(qty) else 0.0) for d in range(1, max_degree + 1)])
+    return coeffs, rss
+
+def _poly_cv_fold(A, y, test, max_degree):
+    """计算单折上所有次数的测试误差平方和"""
+    train = np.ones(len(y), dtype=bool)
+    train[test] = False
+    coeffs, _ = _qr_degree_sweep(A[train], y[train], max_degree)
+    return np.array([np.sum((A[test, :d + 1] @ c - y[test])**2) for d, c in enumerate(coeffs, start=1)])
+
+def _family_cv_fold(x_data, y_data, test, model):
+    """计算单折上自定义模型的测试误差平方和"""
+    train = np.ones(len(y_data), dtype=bool)
+    train[test] = False
+    fit = fit_curve(x_data[train], y_data[train], model=model)
+    return np.sum((fit['predict'](x_data[test]) - y_data[test])**2)
+
+def select_model(x_data, y_data, max_degree=8, families=(), criterion='cv', k_folds=5, n_workers=None, seed=0):
+    """自动模型选择：并行扫描多项式次数与模型族，按交叉验证/AIC/BIC排序
+    
+    返回按准则排序的结果表和最优模型的说明 ('poly', 次数) 或 ('expr', 表达式)。
+    """
+    try:
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        n = len(x_data)
+        if x_data.shape != y_data.shape:
+            raise ValueError('X和Y数据数量不一致')
+        if criterion not in SELECTION_CRITERIA:
+            raise ValueError(f'不支持的选择准则: {criterion}')
+        k_folds = min(int(k_folds), n)
+        if k_folds < 2:
+            raise ValueError('数据点太少，无法进行模型选择')
+        folds = _kfold_indices(n, k_folds, seed)
+        # 每折训练集都必须能确定最高次多项式的全部系数
+        min_train = n - max(len(test) for test in folds)
+        max_degree = min(int(max_degree), n - 2, min_train - 1)
+        if max_degree < 1:
+            raise ValueError('数据点太少，无法进行模型选择')
+        
+        # 切比雪夫范德蒙德矩阵只构造一次，各次数共享同一QR分解
+        t = 2 * (x_data - x_data.min()) / (np.ptp(x_data) or 1.0) - 1
+        A = np.polynomial.chebyshev.chebvander(t, max_degree)
+        _, rss = _qr_degree_sweep(A, y_data, max_degree)
+        
+        rows = []
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            poly_cv = pool.map(lambda test: _poly_cv_fold(A, y_data, test, max_degree), folds)
+            family_jobs = {
+                model: [pool.submit(_family_cv_fold, x_data, y_data, test, model) for test in folds]
+                for model in families
+            }
+            family_fits = {model: pool.submit(fit_curve, x_data, y_data, model=model) for model in families}
+            
+            cv_sse = np.sum(list(poly_cv), axis=0)
+            ss_tot = np.sum((y_data - np.mean(y_data))**2)
+            for d in range(1, max_degree + 1):
+                aic, bic = _information_criteria(rss[d - 1], n, d + 1)
+                rows.append({
+                    '模型': f'{d}次多项式',
+                    'spec': ('poly', d),
+                    '参数个数': d + 1,
+                    'R²': 1 - rss[d - 1] / ss_tot if ss_tot != 0 else 0,
+                    'CV均方误差': cv_sse[d - 1] / n,
+                    'AIC': aic,
+                    'BIC': bic,
+                })
+            
+            for model in families:
+                # 拟合失败（如定义域不满足）的模型族不参与排序
+                try:
+                    fit = family_fits[model].result()
+                    sse = sum(job.result() for job in family_jobs[model])
+                except ValueError:
+                    continue
+                k = len(fit['params'])
+                aic, bic = _information_criteria(np.sum(fit['residuals']**2), n, k)
+                rows.append({
+                    '模型': model,
+                    'spec': ('expr', model),
+                    '参数个数': k,
+                    'R²': fit['r_squared'],
+                    'CV均方误差': sse / n if np.isfinite(sse) else np.inf,
+                    'AIC': aic,
+                    'BIC': bic,
+                })
+        
+        sort_key = {'cv': 'CV均方误差', 'aic': 'AIC', 'bic': 'BIC'}[criterion]
+        table = pd.DataFrame(rows).sort_values(sort_key, kind='stable').reset_index(drop=True)
+        best = table.loc[0, 'spec']
+        return table.drop(columns='spec'), best
+    except Exception as e:
+        raise ValueError(f'模型选择错误: {str(e)}')
+
+INTERPOLATION_METHODS = {'linear': '线性', 'cubic': '三次样条', 'pchip': 'PCHIP（保单调）', 'akima': 'Akima'}
+INTERPOLANT_CACHE_SIZE = 32
+INTERPOLATION_CHUNK = 1 << 20
+# 未指定查询网格时在数据范围内均匀取的点数
+INTERPOLATION_POINTS = 1000
+
+def _interpolation_data(x_data, y_data):
+    """整理插值数据：去除非有限值，按x排序，重复的x取y的平均值"""
+    x_data = np.asarray(x_data, dtype=float)
+    y_data = np.asarray(y_data, dtype=float)
+    if x_data.ndim != 1 or x_data.shape != y_data.shape:
+        raise ValueError('X和Y数据数量不一致')
+    finite = np.isfinite(x_data) & np.isfinite(y_data)
+    x_data, y_data = x_data[finite], y_data[finite]
+    x, inverse, counts = np.unique(x_data, return_inverse=True, return_counts=True)
+    if len(x) < 2:
+        raise ValueError('插值至少需要两个不同的X值')
+    return x, np.bincount(inverse, weights=y_data) / counts
+
+class Interpolant:
+    """在一组数据上构造一次的插值模型，可在任意大的网格上分块向量化求值"""
+    
+    def __init__(self, x_data, y_data, method='cubic'):
+        if method not in INTERPOLATION_METHODS:
+            raise ValueError(f'不支持的插值方法: {method}')
+        self.method = method
+        self.x, self.y = _interpolation_data(x_data, y_data)
+        if method == 'linear':
+            self._func = make_interp_spline(self.x, self.y, k=1)
+        elif method == 'cubic':
+            self._func = CubicSpline(self.x, self.y)
+        elif method == 'pchip':
+            self._func = PchipInterpolator(self.x, self.y)
+        else:
+            self._func = Akima1DInterpolator(self.x, self.y)
+    
+    @property
+    def domain(self):
+        return self.x[0], self.x[-1]
+    
+    def __call__(self, x_new, extrapolate=False, out=None, chunk_size=INTERPOLATION_CHUNK):
+        """求值；extrapolate为False时数据范围外为NaN，out为可选的输出缓冲区"""
+        x_new = np.asarray(x_new, dtype=float)
+        if out is None:
+            out = np.empty(x_new.shape)
+        flat, target = x_new.reshape(-1), out.reshape(-1)
+        for start in range(0, flat.size, chunk_size):
+            stop = min(start + chunk_size, flat.size)
+            target[start:stop] = self._func(flat[start:stop], extrapolate=extrapolate)
+        return out
+
+class InterpolantCache:
+    """按数据内容哈希缓存插值模型（LRU），同一数据的重复查询只需求值"""
+    
+    def __init__(self, maxsize=INTERPOLANT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(x_data, y_data, method):
+        digest = hashlib.sha1()
+        for array in (x_data, y_data):
+            array = np.ascontiguousarray(array, dtype=float)
+            digest.update(np.int64(array.size).tobytes())
+            digest.update(array.tobytes())
+        return method, digest.hexdigest()
+    
+    def get(self, x_data, y_data, method='cubic'):
+        """取得插值模型，不存在时构造并缓存"""
+        key = self.key(x_data, y_data, method)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+        # 构造在锁外进行，不阻塞其他数据的查询
+        model = Interpolant(x_data, y_data, method)
+        with self._lock:
+            self._models[key] = model
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+        return model
+
+# 所有会话共享
+INTERPOLANTS = InterpolantCache()
+
+def interpolate(x_data, y_data, x_new, method='cubic', extrapolate=False, out=None):
+    """在新网格上插值，插值模型按数据内容缓存"""
+    try:
+        return INTERPOLANTS.get(x_data, y_data, method)(x_new, extrapolate, out)
+    except Exception as e:
+        raise ValueError(f'插值错误: {str(e)}')
+
+def parse_ratio(ratio_str):
+    """解析重采样比例，如 '3/2' 或 '0.5'，返回 (up, down)"""
+    try:
+        ratio = Fraction(ratio_str.strip()).limit_denominator(signals.RESAMPLE_MAX_DENOMINATOR)
+        return signals.resample_ratio(1, ratio)
+    except Exception as e:
+        raise ValueError(f'重采样比例格式错误: {str(e)}')
+
+def resample_data(x_data, y_data, up, down):
+    """对等间距采样的数据做多相有理重采样，返回 (新x, 新y)"""
+    try:
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        if x_data.shape != y_data.shape or len(x_data) < 2:
+            raise ValueError('X和Y数据数量不一致或数据太少')
+        dx = (x_data[-1] - x_data[0]) / (len(x_data) - 1)
+        if dx <= 0 or not np.allclose(np.diff(x_data), dx, rtol=1e-6, atol=0):
+            raise ValueError('重采样需要递增且等间距的X数据，可先插值到等间距网格')
+        y_new = signals.resample(y_data, up, down)
+        return x_data[0] + np.arange(len(y_new)) * (dx * down / up), y_new
+    except Exception as e:
+        raise ValueError(f'重采样错误: {str(e)}')
 
 def plot_to_base64(fig):
     """将matplotlib图像转换为base64字符串"""
@@ -163,12 +1774,24 @@ def plot_to_base64(fig):
     buf.seek(0)
     img_base64 = base64.b64encode(buf.read()).decode('utf-8')
     plt.close(fig)
+    # 关闭后的图像仍可重新渲染，供导出其他格式和分辨率
+    record_figure(fig)
     return img_base64
 
-def create_fft_plot(freq, duration, sample_rate, noise_level):
+def create_fft_plot(freq, duration, sample_rate, noise_level, seed=None, waveform='sine', noise_exponent=0):
     """创建FFT图表并返回base64图像"""
-    t, signal, xf, yf = compute_fft(freq, duration, sample_rate, noise_level)
-    
+    t, signal, xf, yf = compute_fft(freq, duration, sample_rate, noise_level, seed, waveform, noise_exponent)
+    half = len(xf) // 2
+    return _draw_fft(t, signal, xf[:half], 2.0/len(t) * np.abs(yf[:half]), np.angle(yf[:half]))
+
+def replot_fft(tables):
+    """由保存的FFT频谱与时域信号数据表重新绘图（不重新计算）"""
+    spectrum, signal = tables['FFT频谱'], tables['时域信号']
+    return _draw_fft(signal['时间(s)'].to_numpy(), signal['信号'].to_numpy(),
+                     spectrum['频率(Hz)'].to_numpy(), spectrum['幅度'].to_numpy(), spectrum['相位'].to_numpy())
+
+def _draw_fft(t, signal, freqs, magnitude, phase):
+    """绘制时域信号与单边幅度谱"""
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
     
     # 原始信号
@@ -179,37 +1802,470 @@ def create_fft_plot(freq, duration, sample_rate, noise_level):
     ax1.grid(True, alpha=0.3)
     
     # FFT结果
-    ax2.plot(xf[:len(xf)//2], 2.0/len(t) * np.abs(yf[:len(yf)//2]), 'r-', linewidth=2)
+    ax2.plot(freqs, magnitude, 'r-', linewidth=2)
     ax2.set_title('傅里叶变换频谱', fontsize=14, fontweight='bold')
     ax2.set_xlabel('频率 [Hz]')
     ax2.set_ylabel('幅度')
     ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
+    record_table('FFT频谱', lambda: pd.DataFrame({'频率(Hz)': freqs, '幅度': magnitude, '相位': phase}))
+    record_table('时域信号', lambda: pd.DataFrame({'时间(s)': t, '信号': signal}))
+    return plot_to_base64(fig)
+
+def create_comparison_plot(series, title='结果对比'):
+    """将多组数据表叠加绘制，series为 (标签, DataFrame) 列表，以第一列为横轴、第二列为纵轴"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for label, table in series:
+        ax.plot(table.iloc[:, 0], table.iloc[:, 1], linewidth=1.5, label=label)
+    first = series[0][1]
+    ax.set_xlabel(first.columns[0], fontsize=12)
+    ax.set_ylabel(first.columns[1], fontsize=12)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
     return plot_to_base64(fig)
 
-def create_fitting_plot(x_str, y_str, degree):
+def filter_fft_signal(fft_result, sample_rate, design, zero_phase=True, method='overlap-add'):
+    """对compute_fft的信号滤波，返回 (滤波后信号, 滤波后频谱)
+
+    滤波后的频谱由原FFT乘以滤波器频率响应得到，不再重新计算FFT。
+    """
+    t, signal, xf, yf = fft_result
+    filtered = signals.apply_filter(signal, design, zero_phase, method)
+    return filtered, yf * signals.frequency_response(design, xf, sample_rate, zero_phase)
+
+def create_filter_plot(freq, duration, sample_rate, noise_level, seed=None, waveform='sine', noise_exponent=0,
+                       family='butter', band='lowpass', cutoff=(10,), order=4, zero_phase=True, method='overlap-add'):
+    """设计滤波器并作用于FFT面板的信号，绘制滤波前后的信号、频谱及频率响应"""
+    try:
+        design = signals.design_filter(family, band, cutoff, sample_rate, order)
+        fft_result = compute_fft(freq, duration, sample_rate, noise_level, seed, waveform, noise_exponent)
+        t, signal, xf, yf = fft_result
+        filtered, filtered_yf = filter_fft_signal(fft_result, sample_rate, design, zero_phase, method)
+        half = len(xf) // 2
+        scale = 2.0 / len(t)
+        response = np.abs(signals.frequency_response(design, xf[:half], sample_rate, zero_phase))
+        
+        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 11))
+        ax1.plot(t, signal, color='gray', linewidth=1, alpha=0.7, label='滤波前')
+        ax1.plot(t, filtered, 'b-', linewidth=1.5, label='滤波后')
+        ax1.set_title('时域信号', fontsize=14, fontweight='bold')
+        ax1.set_xlabel('时间 [s]')
+        ax1.legend()
+        ax1.grid(True, alpha=0.3)
+        
+        ax2.plot(xf[:half], scale * np.abs(yf[:half]), color='gray', linewidth=1, label='滤波前')
+        ax2.plot(xf[:half], scale * np.abs(filtered_yf[:half]), 'r-', linewidth=1.5, label='滤波后')
+        ax2.set_title('幅度谱', fontsize=14, fontweight='bold')
+        ax2.set_xlabel('频率 [Hz]')
+        ax2.legend()
+        ax2.grid(True, alpha=0.3)
+        
+        ax3.plot(xf[:half], 20 * np.log10(np.maximum(response, 1e-12)), 'g-', linewidth=1.5)
+        ax3.set_ylim(-100, 5)
+        ax3.set_title('滤波器频率响应', fontsize=14, fontweight='bold')
+        ax3.set_xlabel('频率 [Hz]')
+        ax3.set_ylabel('增益 [dB]')
+        ax3.grid(True, alpha=0.3)
+        fig.tight_layout()
+        
+        record_table('滤波前后信号', lambda: pd.DataFrame({'时间(s)': t, '滤波前': signal, '滤波后': filtered}))
+        record_table('滤波前后频谱', lambda: pd.DataFrame({
+            '频率(Hz)': xf[:half], '滤波前': scale * np.abs(yf[:half]), '滤波后': scale * np.abs(filtered_yf[:half])}))
+        record_table('频率响应', lambda: pd.DataFrame({'频率(Hz)': xf[:half], '增益': response}))
+        return plot_to_base64(fig)
+    except Exception as e:
+        raise ValueError(f'滤波错误: {str(e)}')
+
+def filter_signal_file(in_path, out_path, sample_rate, family, band, cutoff, order=4, zero_phase=True,
+                       method='overlap-add'):
+    """逐块滤波.npy格式的一维信号文件，输入输出均为内存映射，内存占用与文件大小无关
+    
+    超过上传上限的文件可在服务器上直接调用，如
+    filter_signal_file('in.npy', 'out.npy', 48000, 'butter', 'lowpass', (1000,))
+    """
+    try:
+        design = signals.design_filter(family, band, cutoff, sample_rate, order)
+        x = np.load(in_path, mmap_mode='r', allow_pickle=False)
+        if x.ndim != 1 or x.dtype.kind not in 'iuf':
+            raise ValueError(f'需要一维实数信号，实际为 {x.ndim} 维 {x.dtype}')
+        out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float64, shape=x.shape)
+        signals.apply_filter(x, design, zero_phase, method, out=out)
+        out.flush()
+        return len(x)
+    except Exception as e:
+        raise ValueError(f'滤波错误: {str(e)}')
+
+# 散点图最多绘制的点数，超过时等间隔抽样显示
+MAX_SCATTER_POINTS = 5000
+
+def create_fft_sweep_plot(table, x_param='频率', y_param='噪声水平', metric='SNR(dB)'):
+    """将参数扫描结果绘制为热力图（其余参数取平均）并返回base64图像"""
+    if x_param == y_param:
+        raise ValueError('热力图的两个坐标参数不能相同')
+    # 无噪声时SNR为无穷大，绘图时按缺失值处理
+    values = table.replace([np.inf, -np.inf], np.nan)
+    grid = values.pivot_table(index=y_param, columns=x_param, values=metric, aggfunc='mean', dropna=False)
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    image = ax.imshow(grid.to_numpy(), aspect='auto', origin='lower', cmap='viridis')
+    fig.colorbar(image, ax=ax, label=metric)
+    # 刻度过多时只标注部分
+    x_step = max(1, len(grid.columns) // 10)
+    y_step = max(1, len(grid.index) // 10)
+    ax.set_xticks(range(0, len(grid.columns), x_step))
+    ax.set_xticklabels([f'{v:g}' for v in grid.columns[::x_step]])
+    ax.set_yticks(range(0, len(grid.index), y_step))
+    ax.set_yticklabels([f'{v:g}' for v in grid.index[::y_step]])
+    ax.set_xlabel(x_param, fontsize=12)
+    ax.set_ylabel(y_param, fontsize=12)
+    ax.set_title(f'参数扫描: {metric}', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    
+    return plot_to_base64(fig)
+
+def create_fitting_plot(x_str, y_str, degree, weights_str=None, loss='linear', basis='auto', model_expr=None):
     """创建曲线拟合图表并返回base64图像和结果"""
-    poly, r_squared, x_data, y_data = curve_fitting(x_str, y_str, degree)
-    x_fit = np.linspace(min(x_data), max(x_data), 100)
-    y_fit = poly(x_fit)
+    x_data = parse_data(x_str)
+    y_data = parse_data(y_str)
+    weights = parse_data(weights_str) if weights_str else None
+    fit = fit_curve(x_data, y_data, degree, weights=weights, loss=loss, basis=basis, model=model_expr)
+    img_base64 = _draw_fitting_plot(x_data, y_data, fit['predict'], model_expr or f'{degree}次多项式拟合')
+    return img_base64, fit['model'], fit['r_squared']
+
+def create_online_fitting_plot(fitter, x_data, y_data):
+    """用在线拟合器的当前结果创建曲线拟合图表"""
+    img_base64 = _draw_fitting_plot(x_data, y_data, fitter.predict, f'{fitter.degree}次多项式拟合（在线）')
+    return img_base64, fitter.poly(), fitter.r_squared()
+
+def _draw_fitting_plot(x_data, y_data, predict, label):
+    """绘制原始数据与拟合曲线"""
+    x_fit = np.linspace(np.min(x_data), np.max(x_data), 400)
+    y_fit = predict(x_fit)
+    step = max(1, len(x_data) // MAX_SCATTER_POINTS)
     
     fig, ax = plt.subplots(figsize=(10, 6))
-    ax.scatter(x_data, y_data, color='blue', s=50, alpha=0.7, label='原始数据')
-    ax.plot(x_fit, y_fit, 'r-', linewidth=2, label=f'{degree}次多项式拟合')
+    ax.scatter(x_data[::step], y_data[::step], color='blue', s=50 if step == 1 else 5, alpha=0.7, label='原始数据')
+    ax.plot(x_fit, y_fit, 'r-', linewidth=2, label=label)
     ax.set_xlabel('X', fontsize=12)
     ax.set_ylabel('Y', fontsize=12)
     ax.set_title('曲线拟合结果', fontsize=14, fontweight='bold')
     ax.legend()
     ax.grid(True, alpha=0.3)
     
-    return plot_to_base64(fig), poly, r_squared
+    record_table('拟合残差', lambda: pd.DataFrame({
+        'x': x_data, 'y': y_data, '拟合值': predict(x_data), '残差': y_data - predict(x_data)}))
+    return plot_to_base64(fig)
+
+def create_model_selection_plot(x_str, y_str, max_degree=8, criterion='cv', families=()):
+    """自动选择模型并返回base64图像、排序结果表和最优模型"""
+    x_data = parse_data(x_str)
+    y_data = parse_data(y_str)
+    table, (kind, spec) = select_model(x_data, y_data, max_degree, families, criterion)
+    if kind == 'poly':
+        fit = fit_curve(x_data, y_data, spec)
+        label = f'{spec}次多项式拟合'
+    else:
+        fit = fit_curve(x_data, y_data, model=spec)
+        label = spec
+    
+    x_fit = np.linspace(np.min(x_data), np.max(x_data), 400)
+    step = max(1, len(x_data) // MAX_SCATTER_POINTS)
+    sort_key = {'cv': 'CV均方误差', 'aic': 'AIC', 'bic': 'BIC'}[criterion]
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6), gridspec_kw={'width_ratios': [3, 2]})
+    ax1.scatter(x_data[::step], y_data[::step], color='blue', s=50 if step == 1 else 5, alpha=0.7, label='原始数据')
+    ax1.plot(x_fit, fit['predict'](x_fit), 'r-', linewidth=2, label=label)
+    ax1.set_xlabel('X', fontsize=12)
+    ax1.set_ylabel('Y', fontsize=12)
+    ax1.set_title('最优模型拟合结果', fontsize=14, fontweight='bold')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+    
+    ax2.barh(table['模型'][::-1], table[sort_key][::-1], color='skyblue')
+    ax2.set_xlabel(sort_key, fontsize=12)
+    ax2.set_title('模型评分', fontsize=14, fontweight='bold')
+    ax2.grid(True, alpha=0.3, axis='x')
+    fig.tight_layout()
+    
+    return plot_to_base64(fig), table, fit
+
+# 折线图最多绘制的点数
+MAX_LINE_POINTS = 20000
+
+def create_interpolation_plot(x_str, y_str, grid_str='', method='cubic', extrapolate=False):
+    """在查询网格上插值并绘图，返回base64图像和查询点数；网格为空时在数据范围内均匀取点"""
+    x_data = parse_data(x_str)
+    y_data = parse_data(y_str)
+    try:
+        model = INTERPOLANTS.get(x_data, y_data, method)
+    except Exception as e:
+        raise ValueError(f'插值错误: {str(e)}')
+    x_new = parse_range(grid_str) if grid_str and grid_str.strip() else np.linspace(*model.domain, INTERPOLATION_POINTS)
+    y_new = model(x_new, extrapolate)
+    step = max(1, len(x_data) // MAX_SCATTER_POINTS)
+    line_step = max(1, len(x_new) // MAX_LINE_POINTS)
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(x_data[::step], y_data[::step], color='blue', s=50 if step == 1 else 5, alpha=0.7, label='原始数据')
+    ax.plot(x_new[::line_step], y_new[::line_step], 'r-', linewidth=2, label=f'{INTERPOLATION_METHODS[method]}插值')
+    ax.set_xlabel('X', fontsize=12)
+    ax.set_ylabel('Y', fontsize=12)
+    ax.set_title('插值结果', fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    
+    record_table('插值结果', lambda: pd.DataFrame({'x': x_new, 'y': y_new}))
+    return plot_to_base64(fig), len(x_new)
+
+def create_resample_plot(x_str, y_str, ratio_str):
+    """多相有理重采样并绘图，返回base64图像和 (up, down, 新点数)"""
+    x_data = parse_data(x_str)
+    y_data = parse_data(y_str)
+    up, down = parse_ratio(ratio_str)
+    x_new, y_new = resample_data(x_data, y_data, up, down)
+    step = max(1, len(x_data) // MAX_LINE_POINTS)
+    new_step = max(1, len(x_new) // MAX_LINE_POINTS)
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(x_data[::step], y_data[::step], 'o-', color='blue', alpha=0.5, markersize=4 if step == 1 else 0, label='原始数据')
+    ax.plot(x_new[::new_step], y_new[::new_step], '.-', color='red', alpha=0.8, label=f'重采样 ×{up}/{down}')
+    ax.set_xlabel('X', fontsize=12)
+    ax.set_ylabel('Y', fontsize=12)
+    ax.set_title('多相重采样结果', fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    
+    record_table('重采样结果', lambda: pd.DataFrame({'x': x_new, 'y': y_new}))
+    return plot_to_base64(fig), (up, down, len(x_new))
+
+# 相关矩阵热图中标注数值的最大列数
+MAX_ANNOTATED_COLUMNS = 15
+
+def create_correlation_plot(df, method='pearson'):
+    """绘制所有数值列的相关矩阵热图，返回base64图像和相关矩阵"""
+    corr = correlation_matrix(df, method)
+    k = len(corr)
+    size = min(4 + 0.6 * k, 16)
+    
+    fig, ax = plt.subplots(figsize=(size + 2, size))
+    im = ax.imshow(corr.to_numpy(), cmap='RdBu_r', vmin=-1, vmax=1)
+    labels = [str(c) for c in corr.columns]
+    ax.set_xticks(range(k))
+    ax.set_yticks(range(k))
+    ax.set_xticklabels(labels, rotation=45, ha='right')
+    ax.set_yticklabels(labels)
+    if k <= MAX_ANNOTATED_COLUMNS:
+        for i in range(k):
+            for j in range(k):
+                value = corr.iat[i, j]
+                ax.text(j, i, '' if np.isnan(value) else f'{value:.2f}', ha='center', va='center',
+                        color='white' if abs(value) > 0.6 else 'black', fontsize=9)
+    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    ax.set_title(f'{CORRELATION_METHODS[method]}相关矩阵', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    
+    record_table('相关矩阵', lambda: corr)
+    return plot_to_base64(fig), corr
+
+def create_lag_correlation_plot(x_data, y_data=None, max_lag=None, names=('X', 'Y')):
+    """绘制自相关/互相关随滞后的变化，返回base64图像和 (相关最强的滞后, 相关系数)"""
+    lags, values = lag_correlation(x_data, y_data, max_lag)
+    auto = y_data is None
+    if auto:
+        # 自相关关于零滞后对称，只画非负滞后
+        lags, values = lags[lags >= 0], values[lags >= 0]
+    # 自相关在零滞后恒为1，峰值取其余滞后中绝对值最大者
+    search = values[1:] if auto and len(values) > 1 else values
+    peak = int(np.argmax(np.abs(search))) + (1 if auto and len(values) > 1 else 0)
+    step = max(1, len(lags) // MAX_LINE_POINTS)
+    bound = 1.96 / np.sqrt(len(x_data))
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if len(lags) <= 100:
+        ax.vlines(lags, 0, values, color='blue', linewidth=1.5)
+        ax.plot(lags, values, 'o', color='blue', markersize=4)
+    else:
+        ax.plot(lags[::step], values[::step], '-', color='blue', linewidth=1)
+    ax.axhline(0, color='black', linewidth=0.8)
+    ax.axhspan(-bound, bound, color='gray', alpha=0.2, label='95%置信带（白噪声）')
+    ax.plot(lags[peak], values[peak], 'r*', markersize=12, label=f'滞后 {lags[peak]}: {values[peak]:.3f}')
+    ax.set_xlabel('滞后', fontsize=12)
+    ax.set_ylabel('相关系数', fontsize=12)
+    ax.set_title(f'{names[0]} 自相关' if auto else f'{names[0]} 与 {names[1]} 互相关', fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    
+    record_table('滞后相关', lambda: pd.DataFrame({'滞后': lags, '相关系数': values}))
+    return plot_to_base64(fig), (int(lags[peak]), float(values[peak]))
+
+# 函数绘图中符号求原函数的时间预算（秒）
+ANTIDERIVATIVE_TIMEOUT = 2.0
 
-def create_visualization_plot(x_data, y_data, chart_type):
+def create_function_plot(func_str, var_str, a=-10, b=10):
+    """绘制函数、导函数与原函数，返回base64图像和各曲线的求值次数"""
+    try:
+        # 上下限可为符号表达式（如 pi、2*pi），与积分上下限一致
+        a, b = (float(parse_expression(v).evalf()) if isinstance(v, str) else float(v) for v in (a, b))
+        if not a < b:
+            raise ValueError('绘图区间下限必须小于上限')
+        x = sp.Symbol(var_str)
+        f = parse_expression(func_str)
+        undefined = f.free_symbols - {x}
+        if undefined:
+            raise ValueError(f'表达式含有未定义的变量: {", ".join(sorted(map(str, undefined)))}')
+        curves = [('f', f'f({var_str})', f), ('df', f"f'({var_str})", sp.diff(f, x))]
+        # 符号积分可能极慢，在工作进程中限时求原函数，超时则改用数值积分
+        antiderivative = _run_limited(sp.integrate, (f, x), ANTIDERIVATIVE_TIMEOUT)
+        
+        fig, ax = plt.subplots(figsize=(10, 6))
+        evaluations = {}
+        samples = []
+        for key, label, expr in curves:
+            xs, ys, evaluations[key] = adaptive_sample(lambdify_expression(expr, var_str), a, b)
+            samples.append((xs, ys))
+            ax.plot(xs, ys, linewidth=2, label=label)
+        
+        xs = None
+        if antiderivative is not None and not antiderivative.has(sp.Integral):
+            try:
+                xs, ys, evaluations['integral'] = adaptive_sample(lambdify_expression(antiderivative, var_str), a, b)
+                label = f'∫f d{var_str}'
+            except (NameError, TypeError):
+                # 原函数含无法数值化的特殊函数
+                xs = None
+        if xs is None:
+            # 符号积分超时、无初等原函数或无法数值化时，沿f的采样点数值累积积分
+            xs, ys = samples[0]
+            finite = np.isfinite(ys)
+            ys = np.full_like(ys, np.nan)
+            ys[finite] = cumulative_trapezoid(samples[0][1][finite], xs[finite], initial=0)
+            evaluations['integral'] = 0
+            label = f'∫f d{var_str} (数值)'
+        samples.append((xs, ys))
+        ax.plot(xs, ys, linewidth=2, linestyle='--', label=label)
+        
+        # 纵轴范围取各曲线在均匀网格上的稳健范围（自适应采样在极点附近过密），避免极点压扁曲线
+        grid = np.linspace(a, b, 512)
+        finite = np.concatenate([np.interp(grid, xs[np.isfinite(ys)], ys[np.isfinite(ys)])
+                                 for xs, ys in samples if np.isfinite(ys).any()])
+        if finite.size:
+            low, high = np.percentile(finite, [2, 98])
+            margin = 0.1 * (high - low) or 1.0
+            ax.set_ylim(low - margin, high + margin)
+        ax.axhline(0, color='gray', linewidth=0.8)
+        ax.set_xlabel(var_str, fontsize=12)
+        ax.set_ylabel('y', fontsize=12)
+        ax.set_title(f'f({var_str}) = {f}', fontsize=14, fontweight='bold')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        
+        return plot_to_base64(fig), evaluations
+    except Exception as e:
+        raise ValueError(f'函数绘图错误: {str(e)}')
+
+# 基于分箱聚合的图表：绘制开销只取决于分箱数，与数据行数无关
+BINNED_CHARTS = ('直方图', '二维密度图', '核密度估计', '箱线图')
+DEFAULT_BINS = 50
+KDE_GRID = 1024
+# 箱线图最多的分组数与绘制的离群点数
+MAX_BOX_GROUPS = 50
+MAX_FLIERS = 1000
+
+def kde_fft(values, grid_size=KDE_GRID, bandwidth=None):
+    """基于FFT的高斯核密度估计，返回 (网格, 密度)
+    
+    数据先分箱到等距网格，再在频域与高斯核相乘完成卷积；bandwidth默认按Silverman法则。
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n < 2:
+        raise ValueError('核密度估计至少需要2个数据点')
+    if bandwidth is None:
+        std = values.std(ddof=1)
+        iqr = np.subtract(*np.percentile(values, [75, 25]))
+        sigma = min(std, iqr / 1.34) if iqr > 0 else std
+        bandwidth = 0.9 * sigma * n ** -0.2
+    if not bandwidth > 0:
+        raise ValueError('数据没有离散度，无法估计密度')
+    
+    lo, hi = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=grid_size, range=(lo, hi))
+    dx = edges[1] - edges[0]
+    # 补零到2倍长度，避免循环卷积首尾相接；高斯核的傅里叶变换为 exp(-2π²f²h²)
+    m = 2 * grid_size
+    kernel = np.exp(-2 * (np.pi * rfftfreq(m, d=dx) * bandwidth)**2)
+    density = irfft(rfft(counts, m) * kernel, m)[:grid_size] / (n * dx)
+    return (edges[:-1] + edges[1:]) / 2, np.clip(density, 0, None)
+
+def box_statistics(values, label=''):
+    """计算箱线图统计量（四分位数、1.5倍IQR须线、离群点），可直接传给Axes.bxp"""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        raise ValueError(f'{label or "数据"}为空')
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    fliers = values[~inside]
+    if len(fliers) > MAX_FLIERS:
+        fliers = np.sort(fliers)[np.linspace(0, len(fliers) - 1, MAX_FLIERS).astype(int)]
+    return {
+        'label': label, 'med': med, 'q1': q1, 'q3': q3, 'mean': values.mean(),
+        'whislo': values[inside].min(), 'whishi': values[inside].max(), 'fliers': fliers,
+    }
+
+def _draw_binned_chart(ax, x_data, y_data, chart_type, bins):
+    """绘制基于分箱聚合的图表，Y为主数据，X用于二维密度图的横轴或箱线图的分组"""
+    y = np.asarray(y_data, dtype=float)
+    if chart_type == '直方图':
+        counts, edges = np.histogram(y, bins=bins)
+        ax.stairs(counts, edges, fill=True, color='skyblue', alpha=0.7)
+        ax.stairs(counts, edges, color='steelblue')
+        ax.set_xlabel('Y', fontsize=12)
+        ax.set_ylabel('频数', fontsize=12)
+    elif chart_type == '二维密度图':
+        if x_data is None or len(x_data) != len(y):
+            raise ValueError('二维密度图需要与Y等长的数值X数据')
+        counts, x_edges, y_edges = np.histogram2d(np.asarray(x_data, dtype=float), y, bins=bins)
+        mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap='viridis')
+        ax.figure.colorbar(mesh, ax=ax, label='计数')
+        ax.set_xlabel('X', fontsize=12)
+        ax.set_ylabel('Y', fontsize=12)
+    elif chart_type == '核密度估计':
+        grid, density = kde_fft(y)
+        ax.plot(grid, density, color='blue', linewidth=2)
+        ax.fill_between(grid, density, color='blue', alpha=0.15)
+        ax.set_xlabel('Y', fontsize=12)
+        ax.set_ylabel('概率密度', fontsize=12)
+    elif chart_type == '箱线图':
+        x = None if x_data is None else np.asarray(x_data)
+        if x is not None and len(x) == len(y) and x.dtype.kind in 'OUS':
+            # X为类别数据时按其取值分组，每组一个箱体
+            labels, inverse = np.unique(x.astype(str), return_inverse=True)
+            if len(labels) > MAX_BOX_GROUPS:
+                raise ValueError(f'分组过多（{len(labels)}组），箱线图最多支持{MAX_BOX_GROUPS}组')
+            order = np.argsort(inverse, kind='stable')
+            groups = np.split(y[order], np.cumsum(np.bincount(inverse, minlength=len(labels)))[:-1])
+            stats = [box_statistics(g, label) for label, g in zip(labels, groups)]
+        else:
+            stats = [box_statistics(y, 'Y')]
+        ax.bxp(stats, showmeans=True, patch_artist=True, boxprops={'facecolor': 'skyblue', 'alpha': 0.7})
+        ax.set_ylabel('Y', fontsize=12)
+    ax.set_title(chart_type, fontsize=14, fontweight='bold')
+
+def create_visualization_plot(x_data, y_data, chart_type, bins=DEFAULT_BINS):
     """创建数据可视化图表并返回base64图像"""
     try:
         fig, ax = plt.subplots(figsize=(10, 6))
         
+        if chart_type in BINNED_CHARTS:
+            _draw_binned_chart(ax, x_data, y_data, chart_type, int(bins))
+            ax.grid(True, alpha=0.3)
+            fig.tight_layout()
+            return plot_to_base64(fig)
+        
         # 处理x_data，确保数据类型正确
         if isinstance(x_data[0], str):
             # 如果是字符串数据，使用索引作为x轴
@@ -244,8 +2300,366 @@ def create_visualization_plot(x_data, y_data, chart_type):
         ax.set_xlabel('X', fontsize=12)
         ax.set_ylabel('Y', fontsize=12)
         ax.grid(True, alpha=0.3)
-        plt.tight_layout()
+        fig.tight_layout()
         
         return plot_to_base64(fig)
     except Exception as e:
         raise ValueError(f'图表绘制错误: {str(e)}')
+
+# 线性代数运算（键为运算名称，值为显示名称）
+LINALG_OPERATIONS = {
+    'det': '行列式', 'inv': '逆矩阵', 'eig': '特征分解', 'svd': '奇异值分解',
+    'solve': '线性方程组 AX=B', 'lstsq': '最小二乘 min‖AX-B‖'
+}
+# 不超过该阶数且元素均为整数的矩阵使用SymPy精确计算
+SYMBOLIC_MATRIX_LIMIT = 6
+# 自动选择精确计算的运算：结果为有理数；特征值一般为根式或CRootOf，只在指定精确计算时使用
+EXACT_AUTO_OPERATIONS = ('det', 'inv', 'solve', 'lstsq')
+MATRIX_SUFFIXES = ('.npy', '.csv', '.txt', '.xlsx', '.xls')
+
+def parse_matrix(text):
+    """解析粘贴的矩阵：行以换行或分号分隔，元素以逗号或空格分隔；空行分隔的多个矩阵组成批量（三维数组）"""
+    try:
+        text = text.replace('[', ' ').replace(']', ' ')
+        blocks = [b for b in re.split(r'\n\s*\n', text.strip()) if b.strip()]
+        matrices = []
+        for block in blocks:
+            rows = [r for r in re.split(r'[;\n]', block) if r.strip()]
+            matrices.append([[float(v) for v in re.split(r'[,\s]+', r.strip())] for r in rows])
+        if not matrices:
+            raise ValueError('矩阵为空')
+        array = np.array(matrices, dtype=float)
+        return array[0] if len(array) == 1 else array
+    except Exception as e:
+        raise ValueError(f'矩阵解析错误: {str(e)}')
+
+def load_matrix(path):
+    """从文件读取矩阵：.npy以内存映射方式打开（不整体读入内存），.csv/.txt/.xlsx读为二维数组"""
+    try:
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix == '.npy':
+            array = np.load(path, mmap_mode='r', allow_pickle=False)
+        elif suffix in ('.csv', '.txt'):
+            array = np.loadtxt(path, delimiter=',' if suffix == '.csv' else None, ndmin=2)
+        elif suffix in ('.xlsx', '.xls'):
+            array = read_table(path).select_dtypes(include=['number']).to_numpy(dtype=float)
+        else:
+            raise ValueError(f'不支持的文件类型: {suffix}')
+        if array.ndim not in (1, 2, 3) or array.dtype.kind not in 'biuf':
+            raise ValueError(f'需要一至三维的实数数组，实际为 {array.ndim} 维 {array.dtype}')
+        return array
+    except Exception as e:
+        raise ValueError(f'矩阵读取错误: {str(e)}')
+
+def _blas_threads(threads):
+    """限制BLAS线程数（需要threadpoolctl，未安装时不限制）"""
+    if threads is None or threadpool_limits is None:
+        return nullcontext()
+    return threadpool_limits(limits=int(threads), user_api='blas')
+
+def _is_exact(*arrays):
+    """小规模且元素均为整数的矩阵可以精确计算"""
+    return all(a is None or (a.ndim <= 2 and max(a.shape) <= SYMBOLIC_MATRIX_LIMIT and np.all(a == np.round(a)))
+               for a in arrays)
+
+def _exact_matrix(a):
+    """数值矩阵转换为SymPy有理数矩阵（小数按十进制值转换，如0.1为1/10）"""
+    return sp.Matrix(a.tolist()).applyfunc(lambda v: sp.nsimplify(v, rational=True))
+
+def _symbolic_matrix_operation(op, a, b):
+    """SymPy精确计算（元素转换为有理数，结果为有理数或代数数）"""
+    if a.ndim != 2:
+        raise ValueError('精确计算不支持批量矩阵，请使用数值计算')
+    A = _exact_matrix(a)
+    B = None if b is None else _exact_matrix(b.reshape(len(b), -1))
+    if op == 'det':
+        return {'行列式': A.det()}
+    if op == 'inv':
+        if A.det() == 0:
+            raise ValueError('矩阵奇异，不可逆')
+        return {'逆矩阵': A.inv()}
+    if op == 'eig':
+        return {'特征值(重数)': A.eigenvals(), '特征向量': [vectors for _, _, vectors in A.eigenvects()]}
+    if op == 'solve':
+        if A.det() == 0:
+            raise ValueError('矩阵奇异，方程组没有唯一解')
+        return {'解': A.LUsolve(B)}
+    if op == 'lstsq':
+        if A.rank() < A.cols:
+            raise ValueError('矩阵列不满秩，最小二乘解不唯一')
+        X = A.solve_least_squares(B)
+        return {'解': X, '残差平方和': ((A * X - B).T * (A * X - B)).trace()}
+    raise ValueError(f'不支持精确计算: {LINALG_OPERATIONS[op]}')
+
+def _numeric_matrix_operation(op, a, b):
+    """LAPACK数值计算，a可带前导批量维度"""
+    if op == 'det':
+        sign, logdet = np.linalg.slogdet(a)
+        return {'行列式': sign * np.exp(logdet), 'ln|det|': logdet}
+    if op == 'inv':
+        return {'逆矩阵': np.linalg.inv(a), '条件数': np.linalg.cond(a)}
+    if op in ('eig', 'eigh'):
+        values, vectors = (np.linalg.eigh if op == 'eigh' else np.linalg.eig)(a)
+        return {'特征值': values, '特征向量': vectors}
+    if op == 'svd':
+        u, s, vh = np.linalg.svd(a, full_matrices=False)
+        return {'奇异值': s, 'U': u, 'Vh': vh}
+    if op == 'solve':
+        return {'解': np.linalg.solve(a, b)}
+    if op == 'lstsq':
+        # scipy的lstsq不支持批量，逐个矩阵求解
+        batch = a.reshape(-1, *a.shape[-2:])
+        rhs = b.reshape(len(batch), *b.shape[a.ndim - 2:]) if b.ndim == a.ndim else [b] * len(batch)
+        solutions, ranks = [], []
+        for a_i, b_i in zip(batch, rhs):
+            x, _, rank, _ = scipy.linalg.lstsq(a_i, b_i, lapack_driver='gelsd')
+            solutions.append(x)
+            ranks.append(rank)
+        x = np.array(solutions).reshape(*a.shape[:-2], *solutions[0].shape)
+        residual = np.linalg.norm(a @ (x if x.ndim == a.ndim else x[..., None]) - (b if b.ndim >= 2 else b[:, None]),
+                                  axis=(-2, -1))
+        return {'解': x, '秩': np.array(ranks).reshape(a.shape[:-2]), '残差范数': residual}
+    raise ValueError(f'不支持的运算: {op}')
+
+def matrix_operation(op, a, b=None, threads=None, exact=None):
+    """执行线性代数运算，返回 {'method', 'results', 'batch'}
+
+    a为二维矩阵或三维批量矩阵（n×m×m），b为右端项（与a同维时按批量对应，否则各矩阵共用）。
+    exact为None时对小规模整数矩阵的行列式、求逆与解方程（EXACT_AUTO_OPERATIONS）自动使用SymPy精确计算，
+    特征分解只在exact=True时精确计算；奇异值分解始终数值计算。
+    批量运算且threads>1时将批量分给多个线程（每个线程BLAS单线程），否则BLAS使用threads个线程。
+    """
+    try:
+        if op not in LINALG_OPERATIONS:
+            raise ValueError(f'不支持的运算: {op}')
+        a = np.asarray(a)
+        if a.ndim == 1:
+            a = a[None, :]
+        if a.ndim not in (2, 3):
+            raise ValueError(f'矩阵需为二维或三维（批量），实际为 {a.ndim} 维')
+        if op in ('det', 'inv', 'eig', 'solve') and a.shape[-1] != a.shape[-2]:
+            raise ValueError(f'{LINALG_OPERATIONS[op]}需要方阵，实际为 {a.shape[-2]}×{a.shape[-1]}')
+        if op in ('solve', 'lstsq'):
+            if b is None:
+                raise ValueError('请输入右端项B')
+            b = np.asarray(b, dtype=float)
+            rows = b.shape[-2] if b.ndim == a.ndim else b.shape[0]
+            if rows != a.shape[-2]:
+                raise ValueError(f'B的行数 {rows} 与A的行数 {a.shape[-2]} 不一致')
+        else:
+            b = None
+        
+        if exact is None:
+            exact = op in EXACT_AUTO_OPERATIONS and a.ndim == 2 and _is_exact(a, b)
+            # 列不满秩时最小二乘解不唯一，改用数值计算取最小范数解
+            if exact and op == 'lstsq' and np.linalg.matrix_rank(a) < a.shape[1]:
+                exact = False
+        if exact:
+            return {'method': 'SymPy精确计算', 'results': _symbolic_matrix_operation(op, a, b), 'batch': None}
+        
+        if op == 'eig' and np.allclose(a, np.swapaxes(a, -1, -2)):
+            op = 'eigh'
+        batch = a.shape[0] if a.ndim == 3 else None
+        if batch and threads and threads > 1 and batch > 1:
+            bounds = np.linspace(0, batch, min(int(threads), batch) + 1).astype(int)
+            chunks = [(a[lo:hi], b[lo:hi] if b is not None and b.ndim == 3 else b) for lo, hi in zip(bounds[:-1], bounds[1:])]
+            with _blas_threads(1), ThreadPoolExecutor(len(chunks)) as executor:
+                parts = list(executor.map(lambda chunk: _numeric_matrix_operation(op, *chunk), chunks))
+            results = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+            method = f'LAPACK，{len(chunks)} 线程分批'
+        else:
+            with _blas_threads(threads):
+                results = _numeric_matrix_operation(op, a, b)
+            method = 'LAPACK' + (f'，BLAS {int(threads)} 线程' if threads and threadpool_limits is not None else '')
+        if op == 'eigh':
+            method += '（对称矩阵，eigh）'
+        return {'method': method, 'results': results, 'batch': batch}
+    except Exception as e:
+        raise ValueError(f'线性代数计算错误: {str(e)}')
+
+def matrix_table(value):
+    """将运算结果转为可导出的数据表，批量结果增加“批次”列"""
+    if isinstance(value, sp.MatrixBase):
+        value = np.array(value.evalf(), dtype=complex if any(not v.is_real for v in value) else float)
+    array = np.asarray(value)
+    if array.ndim == 0:
+        return pd.DataFrame({'值': [array.item()]})
+    if array.ndim == 1:
+        return pd.DataFrame({'值': array})
+    table = pd.DataFrame(array.reshape(-1, array.shape[-1]), columns=[f'列{j + 1}' for j in range(array.shape[-1])])
+    if array.ndim > 2:
+        table.insert(0, '批次', np.repeat(np.arange(len(array)), array.shape[-2]))
+    return table
+
+# 常微分方程求解方法（值为是否适用于刚性问题）
+ODE_METHODS = {'RK45': False, 'RK23': False, 'DOP853': False, 'Radau': True, 'BDF': True, 'LSODA': True}
+_ODE_SOLVERS = {'RK45': RK45, 'RK23': RK23, 'DOP853': DOP853, 'Radau': Radau, 'BDF': BDF, 'LSODA': LSODA}
+# 绘图输出的采样点数、最大积分步数与进度回调间隔（秒）
+ODE_POINTS = 2000
+MAX_ODE_STEPS = 1_000_000
+ODE_PROGRESS_INTERVAL = 0.25
+
+class OdeSystem:
+    """编译后的常微分方程组 y' = f(t, y)
+
+    右端项与雅可比矩阵各用lambdify编译一次；右端项支持向量化调用（y为 状态数×k 数组）。
+    """
+
+    def __init__(self, names, states, t, exprs):
+        self.names = names  # 显示名称，如 x、x'
+        self.states = states
+        self.t = t
+        self.exprs = exprs
+        self._rhs = sp.lambdify((t, *states), exprs, 'numpy')
+        self._jac = sp.lambdify((t, *states), sp.Matrix(exprs).jacobian(states), 'numpy')
+
+    def rhs(self, t, y):
+        shape = np.shape(y[0])
+        return np.array([np.broadcast_to(v, shape) for v in self._rhs(t, *y)], dtype=float)
+
+    def jac(self, t, y):
+        return np.array(self._jac(t, *y), dtype=float)
+
+def _state_name(name, order):
+    return f'{name}_d{order}' if order else name
+
+@lru_cache(maxsize=32)
+def compile_ode(eq_str, t_name='t'):
+    """解析并编译方程组
+
+    每行一个方程，左边为 x' 或 dx/dt，高阶导数写作 x''（自动降为一阶方程组）；
+    不含导数的 a = 1.5 定义参数。方程以换行或分号分隔。
+    """
+    try:
+        derivative = re.compile(r"^\s*(?:([A-Za-z_]\w*)('+)|d([A-Za-z_]\w*)\s*/\s*d" + re.escape(t_name) + r")\s*$")
+        t = sp.Symbol(t_name)
+        locals_ = {'e': sp.E, t_name: t}
+        params, equations = {}, []
+        for line in re.split(r'[;\n]', eq_str):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if '=' not in line:
+                raise ValueError(f'缺少等号: {line}')
+            lhs, rhs = line.split('=', 1)
+            match = derivative.match(lhs)
+            if match is None:
+                params[lhs.strip()] = rhs
+                continue
+            name = match.group(1) or match.group(3)
+            equations.append((name, len(match.group(2) or "'"), rhs))
+        if not equations:
+            raise ValueError('没有微分方程（左边应为 x\' 或 dx/dt）')
+        
+        orders = {}
+        for name, order, _ in equations:
+            if name in orders:
+                raise ValueError(f'{name} 的方程重复')
+            orders[name] = order
+        states, names = [], []
+        for name, order in orders.items():
+            for k in range(order):
+                states.append(sp.Symbol(_state_name(name, k)))
+                names.append(name + "'" * k)
+        locals_.update({s.name: s for s in states})
+        for name, value in params.items():
+            locals_[name] = sp.sympify(value.replace('^', '**'), locals=dict(locals_))
+        
+        # 右端项中的 x' 替换为对应的状态变量
+        def substitute(text):
+            return re.sub(r"\b([A-Za-z_]\w*)('+)", lambda m: _state_name(m.group(1), len(m.group(2))), text)
+        
+        exprs = []
+        for name, order, rhs in equations:
+            exprs.extend(sp.Symbol(_state_name(name, k)) for k in range(1, order))
+            exprs.append(sp.sympify(substitute(rhs).replace('^', '**').replace('π', 'pi'), locals=locals_))
+        unknown = set().union(*(sp.sympify(e).free_symbols for e in exprs)) - set(states) - {t}
+        if unknown:
+            raise ValueError(f'未定义的符号: {", ".join(sorted(s.name for s in unknown))}')
+        return OdeSystem(names, states, t, exprs)
+    except Exception as e:
+        raise ValueError(f'微分方程解析错误: {str(e)}')
+
+def parse_initial_values(text, names):
+    """解析初值：按名称（x=1, x'=0）或按状态顺序（1, 0）给出，值可以是表达式"""
+    parts = [p.strip() for p in text.split(',') if p.strip()]
+    if parts and all('=' in p for p in parts):
+        given = {k.strip(): float(parse_expression(v)) for k, v in (p.split('=', 1) for p in parts)}
+        missing = [n for n in names if n not in given]
+        if missing:
+            raise ValueError(f'缺少初值: {", ".join(missing)}')
+        return np.array([given[n] for n in names])
+    if len(parts) != len(names):
+        raise ValueError(f'需要 {len(names)} 个初值（{", ".join(names)}），实际为 {len(parts)} 个')
+    return np.array([float(parse_expression(p)) for p in parts])
+
+def solve_ode(eq_str, initial, t_span, method='RK45', t_name='t', rtol=1e-6, atol=1e-9,
+              n_points=ODE_POINTS, progress=None, cancel=None):
+    """求解初值问题，返回 {'t', 'y', 'names', 'method', 'steps', 'nfev', 'njev'}
+
+    逐步推进求解器，用每一步的稠密输出在均匀网格（n_points个点）上取值，
+    只保留绘图所需的点；progress(完成比例, t, y) 定期收到已完成部分的结果。
+    """
+    system = compile_ode(eq_str, t_name)
+    try:
+        y0 = parse_initial_values(initial, system.names) if isinstance(initial, str) else np.asarray(initial, dtype=float)
+        t0, t1 = map(float, t_span)
+        if not t1 > t0:
+            raise ValueError('终止时间必须大于起始时间')
+        if method not in _ODE_SOLVERS:
+            raise ValueError(f'不支持的求解方法: {method}')
+        options = {'jac': system.jac} if ODE_METHODS[method] else {}
+        if method != 'LSODA':
+            options['vectorized'] = True
+        solver = _ODE_SOLVERS[method](system.rhs, t0, y0, t1, rtol=rtol, atol=atol, **options)
+        
+        grid = np.linspace(t0, t1, int(n_points))
+        y = np.empty((len(y0), len(grid)))
+        y[:, 0] = y0
+        filled, steps = 1, 0
+        reported = time.perf_counter()
+        while solver.status == 'running':
+            _check_cancel(cancel)
+            message = solver.step()
+            if solver.status == 'failed':
+                raise ValueError(message)
+            steps += 1
+            if steps > MAX_ODE_STEPS:
+                raise ValueError(f'积分步数超过 {MAX_ODE_STEPS}，可尝试刚性求解方法或放宽容差')
+            end = np.searchsorted(grid, solver.t, side='right')
+            if end > filled:
+                y[:, filled:end] = solver.dense_output()(grid[filled:end])
+                filled = end
+            if progress is not None and time.perf_counter() - reported > ODE_PROGRESS_INTERVAL:
+                reported = time.perf_counter()
+                progress((solver.t - t0) / (t1 - t0), grid[:filled].copy(), y[:, :filled].copy())
+        if progress is not None:
+            progress(1.0, grid, y)
+        return {'t': grid, 'y': y, 'names': system.names, 'method': method,
+                'steps': steps, 'nfev': solver.nfev, 'njev': solver.njev}
+    except Exception as e:
+        raise ValueError(f'微分方程求解错误: {str(e)}')
+
+def create_ode_plot(t, y, names, partial=False):
+    """绘制微分方程的解：各状态随时间变化，两个以上状态时附加前两个状态的相图"""
+    phase = len(names) >= 2
+    fig, axes = plt.subplots(1, 2 if phase else 1, figsize=(12 if phase else 10, 5), squeeze=False)
+    ax = axes[0, 0]
+    for name, values in zip(names, y):
+        ax.plot(t, values, linewidth=1.5, label=name)
+    ax.set_xlabel('t', fontsize=12)
+    ax.set_title('解曲线' + ('（计算中…）' if partial else ''), fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    if phase:
+        ax = axes[0, 1]
+        ax.plot(y[0], y[1], 'b-', linewidth=1)
+        ax.plot(y[0][:1], y[1][:1], 'go', label='起点')
+        ax.set_xlabel(names[0], fontsize=12)
+        ax.set_ylabel(names[1], fontsize=12)
+        ax.set_title('相图', fontsize=14, fontweight='bold')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    record_table('解', lambda: pd.DataFrame({'t': t, **dict(zip(names, y))}))
+    return plot_to_base64(fig)